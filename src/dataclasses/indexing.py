@@ -0,0 +1,13 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class IndexResult:
+    """Результат индексации файла."""
+    document_uuid: Optional[str]
+    point_ids: List[str]
+    content_hash: Optional[str] = None
+    skipped: bool = False  # Документ с таким содержимым уже был проиндексирован
+    performance: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None  # Причина, по которой файл не проиндексирован
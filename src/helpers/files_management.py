@@ -0,0 +1,83 @@
+import hashlib
+
+from pathlib import Path
+from typing import Optional, Tuple
+
+from fastapi import UploadFile
+
+
+# Размер блока чтения файлов
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def get_file_hash(path: Path) -> str:
+    """Вычисление хеша содержимого файла.
+
+    Файл читается блоками, поэтому целиком в память не загружается.
+
+    Args:
+        path: Путь к файлу.
+
+    Returns:
+        str: SHA-256 содержимого файла в шестнадцатеричном виде.
+    """
+
+    file_hash = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        while block := f.read(READ_CHUNK_SIZE):
+            file_hash.update(block)
+
+    return file_hash.hexdigest()
+
+
+class FileTooLargeError(Exception):
+    """Размер загружаемого файла превышает допустимый."""
+
+    def __init__(self, file_name: str, max_size: int):
+        self.file_name = file_name
+        self.max_size = max_size
+        super().__init__(f"Файл {file_name} больше допустимых {max_size} байт.")
+
+
+async def save_upload(upload_file: UploadFile, path: Path, max_size: Optional[int] = None) -> Tuple[str, int]:
+    """Потоковое сохранение загруженного файла на диск.
+
+    Файл копируется блоками по ``READ_CHUNK_SIZE``, хеш и размер считаются во время копирования,
+    поэтому файл не загружается в память целиком и не перечитывается для хеширования.
+
+    Args:
+        upload_file: Загруженный файл.
+        path: Путь сохранения.
+        max_size: Максимальный размер файла в байтах. По умолчанию не ограничен.
+
+    Returns:
+        Tuple[str, int]: SHA-256 содержимого (как в ``get_file_hash``) и размер файла в байтах.
+
+    Raises:
+        FileTooLargeError: Если файл больше ``max_size``; частично записанный файл удаляется.
+    """
+
+    # Размер известен заранее, если тело запроса уже разобрано: отклоняем файл без копирования
+    if max_size is not None and upload_file.size is not None and upload_file.size > max_size:
+        raise FileTooLargeError(upload_file.filename, max_size)
+
+    file_hash = hashlib.sha256()
+    file_size = 0
+
+    try:
+        with open(path, "wb") as buffer:
+            while block := await upload_file.read(READ_CHUNK_SIZE):
+                file_size += len(block)
+
+                if max_size is not None and file_size > max_size:
+                    raise FileTooLargeError(upload_file.filename, max_size)
+
+                file_hash.update(block)
+                buffer.write(block)
+
+    except FileTooLargeError:
+        path.unlink(missing_ok=True)
+        raise
+
+    return file_hash.hexdigest(), file_size
@@ -3,11 +3,12 @@ import requests
 
 from typing import Dict
 from functools import lru_cache
-from sentence_transformers import SentenceTransformer
+from sentence_transformers import CrossEncoder, SentenceTransformer
 
 from src.logging.logger import logger
 from src.helpers.configs_hub import ollama_config
 from src.helpers.configs_hub import embedding_config
+from src.helpers.configs_hub import querier_config
 
 
 def get_model_name(_model_info):
@@ -106,6 +107,13 @@ def get_embedding_model() -> SentenceTransformer:
     return model
 
 
+@lru_cache(maxsize=1)
+def get_reranker_model() -> CrossEncoder:
+    """Возвращает единственный экземпляр модели реранкера (singleton)."""
+
+    return CrossEncoder(querier_config.reranker.model, device="cpu")
+
+
 async def check_embedding_model():
     """Проверяет наличие экземпляра модели эмбеддингов в кэше.
     
@@ -1,10 +1,22 @@
-from typing import List, Dict
+from typing import Any, List, Dict
 
+from qdrant_client.models import PayloadSchemaType
+
+from src.managers.execution import execution_manager
 from src.managers.qdrant import qdrant_manager
 from src.logging.logger import logger
 from src.helpers.configs_hub import qdrant_config
 
 
+# Поля payload точек, по которым создаются индексы
+PAYLOAD_INDEXES = {
+    "content_hash": PayloadSchemaType.KEYWORD,
+    "document_uuid": PayloadSchemaType.KEYWORD,
+    "file_path": PayloadSchemaType.KEYWORD,
+    "chunk_index": PayloadSchemaType.INTEGER,
+}
+
+
 async def check_collections() -> Dict:
     """Проверка наличия коллекций qdrant в соответствии с конфигом.
     
@@ -26,6 +38,18 @@ async def check_collections() -> Dict:
     return report
 
 
+def _collection_options(collection) -> Dict[str, Any]:
+    """Параметры хранения коллекции из её секции конфига: on_disk, hnsw и quantization."""
+
+    options = {"on_disk": getattr(collection, "on_disk", False)}
+
+    for section in ("hnsw", "quantization"):
+        if hasattr(collection, section):
+            options[section] = getattr(collection, section).as_dict()
+
+    return options
+
+
 async def create_collections() -> Dict:
     """Создание коллекций, которых ещё нет в qdrant."""
 
@@ -35,10 +59,81 @@ async def create_collections() -> Dict:
 
     for collection_name in collections.__dict__.keys():
         if collection_name not in existing_collections:
+            collection = getattr(collections, collection_name)
             qdrant_manager.create_collection(
                 collection_name,
-                getattr(collections, collection_name).vector_size,
+                collection.vector_size,
+                **_collection_options(collection),
             )
             created_collections.append(collection_name)
 
+        # Индексы полей, по которым фильтруются точки: поиск уже проиндексированных файлов,
+        # удаление и обновление документов, сбор контекста вокруг найденных чанков
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            qdrant_manager.create_payload_index(collection_name, field_name, field_schema)
+
+    # Каталог документов
+    if qdrant_manager.catalog_collection not in existing_collections:
+        qdrant_manager.create_catalog()
+        created_collections.append(qdrant_manager.catalog_collection)
+
     return {"created_collections": created_collections}
+
+
+async def rebuild_catalog() -> Dict:
+    """Заполнение каталога документов в пуле исполнения ``ingest``, не блокируя цикл событий.
+
+    Raises:
+        ExecutorSaturatedError: Если пул индексации перегружен.
+    """
+
+    return await execution_manager.run("ingest", rebuild_catalog_sync)
+
+
+def rebuild_catalog_sync() -> Dict:
+    """Заполнение каталога документов по точкам коллекции по умолчанию.
+
+    Нужно один раз для документов, проиндексированных до появления каталога: проходит все точки
+    коллекции, поэтому стоимость пропорциональна количеству чанков.
+    """
+
+    collection_name = qdrant_config.defaults.default_collection
+    documents: Dict[str, Dict[str, Any]] = {}
+    offset = None
+
+    while True:
+        points, offset = qdrant_manager.client.scroll(
+            collection_name=collection_name,
+            limit=1000,
+            offset=offset,
+            with_payload=["document_uuid", "file_path", "file_format", "file_size", "content_hash"],
+            with_vectors=False,
+        )
+
+        for point in points:
+            document_uuid = point.payload.get("document_uuid")
+
+            if not document_uuid:
+                continue
+
+            if document_uuid not in documents:
+                documents[document_uuid] = {
+                    "document": point.payload.get("file_path", "").split('/')[-1],
+                    "file_format": point.payload.get("file_format"),
+                    "file_size": point.payload.get("file_size"),
+                    "content_hash": point.payload.get("content_hash"),
+                    "chunks": 0,
+                    "indexed_at": None,
+                }
+
+            documents[document_uuid]["chunks"] += 1
+
+        if offset is None:
+            break
+
+    for document_uuid, record in documents.items():
+        qdrant_manager.upsert_catalog_record(document_uuid, record)
+
+    logger.info(f"Каталог документов перестроен: {len(documents)} документов.")
+
+    return {"documents": len(documents)}
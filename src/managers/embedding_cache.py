@@ -0,0 +1,201 @@
+import hashlib
+import sqlite3
+import threading
+import time
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.helpers.configs_hub import embedding_config
+from src.logging.logger import logger
+
+
+# Максимальное количество ключей в одном SQL-запросе
+SQLITE_BATCH_SIZE = 500
+
+
+class EmbeddingCache:
+    """Двухуровневый кэш эмбеддингов: LRU в памяти процесса и SQLite на диске.
+
+    Ключ кэша - имя модели эмбеддингов и md5 текста. Дисковый уровень общий для всех процессов
+    (воркеров uvicorn), работающих с одним файлом базы, и ограничен по количеству записей:
+    при переполнении удаляются давно не использованные эмбеддинги.
+    """
+
+    def __init__(
+            self,
+            path: str = embedding_config.cache.path,
+            model_name: str = embedding_config.models.embedding,
+            memory_size: int = embedding_config.cache.memory_size,
+            disk_size: int = embedding_config.cache.disk_size,
+    ):
+        self.path = Path(path)
+        self.model_name = model_name
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+
+        self.memory: OrderedDict[str, List[float]] = OrderedDict()
+        self.lock = threading.Lock()
+        # Соединения SQLite нельзя разделять между потоками, у каждого потока своё
+        self.local = threading.local()
+        # Количество вставок с последней проверки размера дискового кэша
+        self.inserts_since_eviction = 0
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """Хеш текста, используемый как ключ кэша."""
+
+        return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+    def get(self, text_hash: str) -> Optional[List[float]]:
+        """Получение эмбеддинга по хешу текста или None, если его нет в кэше."""
+
+        return self.get_many([text_hash]).get(text_hash)
+
+    def set(self, text_hash: str, embedding: List[float]):
+        """Сохранение эмбеддинга в кэш."""
+
+        self.set_many({text_hash: embedding})
+
+    def get_many(self, text_hashes: Iterable[str]) -> Dict[str, List[float]]:
+        """Получение эмбеддингов по хешам текстов.
+
+        Args:
+            text_hashes: Хеши текстов.
+
+        Returns:
+            Dict[str, List[float]]: Найденные эмбеддинги по хешам; отсутствующие в кэше хеши пропускаются.
+        """
+
+        found = {}
+        missing = []
+
+        with self.lock:
+            for text_hash in text_hashes:
+                if text_hash in self.memory:
+                    self.memory.move_to_end(text_hash)
+                    found[text_hash] = self.memory[text_hash]
+                else:
+                    missing.append(text_hash)
+
+        if not missing:
+            return found
+
+        rows = []
+
+        try:
+            connection = self._get_connection()
+
+            # Запрашиваем порциями, чтобы не упереться в лимит параметров SQLite
+            for start in range(0, len(missing), SQLITE_BATCH_SIZE):
+                batch = missing[start:start + SQLITE_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows.extend(connection.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [self.model_name, *batch],
+                ).fetchall())
+
+            if rows:
+                # Отмечаем использование, чтобы запись не была вытеснена
+                connection.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(time.time(), self.model_name, text_hash) for text_hash, _ in rows],
+                )
+                connection.commit()
+
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка при чтении кэша эмбеддингов: {e}")
+            return found
+
+        disk_found = {text_hash: np.frombuffer(vector, dtype=np.float32).tolist() for text_hash, vector in rows}
+        self._remember(disk_found)
+        found.update(disk_found)
+
+        return found
+
+    def set_many(self, embeddings: Dict[str, List[float]]):
+        """Сохранение эмбеддингов в кэш.
+
+        Args:
+            embeddings: Эмбеддинги по хешам текстов.
+        """
+
+        if not embeddings:
+            return
+
+        self._remember(embeddings)
+
+        try:
+            connection = self._get_connection()
+            now = time.time()
+            connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                [
+                    (self.model_name, text_hash, np.asarray(embedding, dtype=np.float32).tobytes(), now)
+                    for text_hash, embedding in embeddings.items()
+                ],
+            )
+            connection.commit()
+
+            self.inserts_since_eviction += len(embeddings)
+
+            if self.inserts_since_eviction >= max(1, self.disk_size // 100):
+                self.inserts_since_eviction = 0
+                self._evict(connection)
+
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка при записи в кэш эмбеддингов: {e}")
+
+    def _remember(self, embeddings: Dict[str, List[float]]):
+        """Добавление эмбеддингов в LRU-кэш в памяти с вытеснением самых старых записей."""
+
+        with self.lock:
+            for text_hash, embedding in embeddings.items():
+                self.memory[text_hash] = embedding
+                self.memory.move_to_end(text_hash)
+
+            while len(self.memory) > self.memory_size:
+                self.memory.popitem(last=False)
+
+    def _evict(self, connection: sqlite3.Connection):
+        """Удаление давно не использованных записей, если дисковый кэш превысил ``disk_size``."""
+
+        count = connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+        if count > self.disk_size:
+            connection.execute(
+                "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                (count - self.disk_size,),
+            )
+            connection.commit()
+            logger.debug(f"Из кэша эмбеддингов удалено {count - self.disk_size} записей.")
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Соединение с базой кэша для текущего потока; при первом обращении создаёт таблицу."""
+
+        connection = getattr(self.local, "connection", None)
+
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            # WAL позволяет нескольким процессам читать кэш во время записи
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, "
+                "text_hash TEXT NOT NULL, "
+                "vector BLOB NOT NULL, "
+                "last_used REAL NOT NULL, "
+                "PRIMARY KEY (model, text_hash))"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+            connection.commit()
+            self.local.connection = connection
+
+        return connection
+
+
+embedding_cache = EmbeddingCache()
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from src.helpers.configs_hub import fastapi_config
+from src.logging.logger import logger
+
+
+class ExecutorSaturatedError(Exception):
+    """Пул исполнения заполнен: новая задача не может быть принята."""
+
+    def __init__(self, pool_name: str):
+        self.pool_name = pool_name
+        super().__init__(f"Пул '{pool_name}' перегружен, повторите запрос позже.")
+
+
+class ExecutionPool:
+    """Пул потоков с ограниченной очередью задач.
+
+    Одновременно принимается не больше ``workers + queue_size`` задач; задача сверх этого лимита
+    отклоняется сразу, а не ждёт в неограниченной очереди.
+    """
+
+    def __init__(self, name: str, workers: int, queue_size: int):
+        self.name = name
+        self.capacity = workers + queue_size
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-pool")
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Выполнение блокирующей функции в пуле без блокировки цикла событий.
+
+        Raises:
+            ExecutorSaturatedError: Если в пуле уже ``capacity`` задач.
+        """
+
+        with self.lock:
+            if self.pending >= self.capacity:
+                logger.warning(f"Пул {self.name} перегружен: {self.pending} задач.")
+                raise ExecutorSaturatedError(self.name)
+
+            self.pending += 1
+
+        try:
+            future = self.executor.submit(partial(func, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+
+        # Место освобождается, когда задача действительно завершилась в потоке: отмена ожидающего
+        # запроса (разрыв соединения клиентом) не останавливает уже запущенную функцию
+        future.add_done_callback(self._release)
+
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future: Optional[Future] = None):
+        """Освобождение места завершившейся задачи."""
+
+        with self.lock:
+            self.pending -= 1
+
+
+class ExecutionManager:
+    """Слой исполнения CPU-ёмких задач (парсинг, OCR, эмбеддинги) вне цикла событий.
+
+    Пулы и их размеры задаются в секции ``execution`` конфига FastAPI.
+    """
+
+    def __init__(self):
+        self.pools: Dict[str, ExecutionPool] = {
+            name: ExecutionPool(name, pool_config.workers, pool_config.queue_size)
+            for name, pool_config in fastapi_config.execution.as_dict().items()
+        }
+
+    async def run(self, pool_name: str, func: Callable, *args, **kwargs) -> Any:
+        """Выполнение функции в пуле ``pool_name``.
+
+        Args:
+            pool_name: Имя пула из конфига.
+            func: Блокирующая функция.
+
+        Returns:
+            Результат функции.
+
+        Raises:
+            ExecutorSaturatedError: Если пул перегружен.
+        """
+
+        return await self.pools[pool_name].run(func, *args, **kwargs)
+
+
+execution_manager = ExecutionManager()
@@ -1,12 +1,37 @@
-from typing import Optional, List, Any, Dict
+import hashlib
+
+from typing import Optional, List, Any, Dict, Tuple
 
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
     Distance,
     VectorParams,
     FieldCondition,
+    MatchAny,
     MatchValue,
     Filter,
+    FilterSelector,
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Fusion,
+    FusionQuery,
+    HnswConfigDiff,
+    Modifier,
+    PayloadSchemaType,
+    PointIdsList,
+    PointStruct,
+    Prefetch,
+    QuantizationSearchParams,
+    Range,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    ScoredPoint,
+    SearchParams,
+    SetPayload,
+    SetPayloadOperation,
+    SparseVector,
+    SparseVectorParams,
 )
 
 from src.dataclasses.embedding import SearchResult
@@ -19,14 +44,50 @@ class QdrantManager:
     """Менеджер для работы с Qdrant."""
 
     def __init__(self):
-        self.client: QdrantClient = QdrantClient(host=qdrant_config.qdrant.host, port=qdrant_config.qdrant.port)
+        self.client: QdrantClient = QdrantClient(
+            host=qdrant_config.qdrant.host,
+            port=qdrant_config.qdrant.port,
+            grpc_port=qdrant_config.qdrant.grpc_port,
+            # gRPC заметно дешевле REST на массовой записи точек
+            prefer_grpc=qdrant_config.qdrant.prefer_grpc,
+        )
+        # Наличие разреженного вектора в коллекциях, проверенных с момента запуска
+        self.hybrid_collections: Dict[str, bool] = {}
+        # Коллекция каталога проверена (или создана) с момента запуска
+        self.catalog_ready = False
 
     def get_collections(self):
         """Получение коллекций qdrant."""
         return self.client.get_collections()
 
-    def create_collection(self, name, size):
-        """Создание коллекции qdrant."""
+    def create_collection(
+            self,
+            name,
+            size,
+            on_disk: bool = False,
+            hnsw: Optional[Dict[str, Any]] = None,
+            quantization: Optional[Dict[str, Any]] = None,
+    ):
+        """Создание коллекции qdrant.
+
+        В гибридном режиме рядом с плотным вектором создаётся разреженный BM25-вектор,
+        IDF которого считает qdrant.
+
+        Args:
+            name: Имя коллекции.
+            size: Размерность плотного вектора.
+            on_disk: Хранить исходные векторы на диске, а не в RAM.
+            hnsw: Параметры HNSW-графа (``m``, ``ef_construct``, ``on_disk``).
+            quantization: Квантование векторов: ``type`` (scalar | binary), ``always_ram``,
+                для scalar - ``quantile``.
+        """
+
+        sparse_vectors_config = None
+
+        if qdrant_config.hybrid.enabled:
+            sparse_vectors_config = {
+                qdrant_config.hybrid.sparse_vector: SparseVectorParams(modifier=Modifier.IDF),
+            }
 
         try:
             self.client.create_collection(
@@ -34,32 +95,411 @@ class QdrantManager:
                 vectors_config=VectorParams(
                     size=size,
                     distance=Distance.COSINE,
+                    on_disk=on_disk,
                 ),
+                sparse_vectors_config=sparse_vectors_config,
+                hnsw_config=HnswConfigDiff(**hnsw) if hnsw else None,
+                quantization_config=self._quantization_config(quantization),
             )
+            self.hybrid_collections.pop(name, None)
             logger.debug(f"Коллекция {name} создана.")
         except Exception as e:
             logger.error(f"Ошибка при создании коллекции {name}: {e}")
 
+    @staticmethod
+    def _quantization_config(quantization: Optional[Dict[str, Any]]):
+        """Параметры квантования коллекции по секции ``quantization`` конфига."""
+
+        if not quantization or quantization.get("type", "none") == "none":
+            return None
+
+        always_ram = quantization.get("always_ram", True)
+
+        if quantization["type"] == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8,
+                    quantile=quantization.get("quantile"),
+                    always_ram=always_ram,
+                ),
+            )
+
+        if quantization["type"] == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=always_ram))
+
+        raise ValueError(f"Неизвестный тип квантования: {quantization['type']}")
+
+    @staticmethod
+    def _search_params(hnsw_ef: Optional[int] = None, oversampling: Optional[float] = None) -> SearchParams:
+        """Параметры поиска: точность HNSW и пересчёт квантованных оценок по исходным векторам.
+
+        Незаданные значения берутся из секции ``defaults.search`` конфига.
+        """
+
+        search_config = qdrant_config.defaults.search
+
+        return SearchParams(
+            hnsw_ef=hnsw_ef or search_config.hnsw_ef,
+            quantization=QuantizationSearchParams(
+                rescore=search_config.rescore,
+                oversampling=oversampling or search_config.oversampling,
+            ),
+        )
+
+    def is_hybrid(self, collection_name: Optional[str] = None) -> bool:
+        """Включён ли гибридный режим и есть ли в коллекции разреженный вектор.
+
+        Коллекции, созданные до включения гибридного режима, остаются только плотными.
+        """
+
+        if not qdrant_config.hybrid.enabled:
+            return False
+
+        collection_name = collection_name or qdrant_config.defaults.default_collection
+
+        if collection_name not in self.hybrid_collections:
+            try:
+                sparse_vectors = self.client.get_collection(collection_name).config.params.sparse_vectors or {}
+            except Exception as e:
+                logger.error(f"Ошибка при получении параметров коллекции {collection_name}: {e}")
+                return False
+
+            self.hybrid_collections[collection_name] = qdrant_config.hybrid.sparse_vector in sparse_vectors
+
+        return self.hybrid_collections[collection_name]
+
+    def create_payload_index(self, name, field_name, field_schema=PayloadSchemaType.KEYWORD):
+        """Создание индекса по полю payload коллекции qdrant."""
+
+        try:
+            self.client.create_payload_index(
+                collection_name=name,
+                field_name=field_name,
+                field_schema=field_schema,
+            )
+            logger.debug(f"Индекс {field_name} коллекции {name} создан.")
+        except Exception as e:
+            logger.error(f"Ошибка при создании индекса {field_name} коллекции {name}: {e}")
+
     def delete_collection(self, name):
         """Удаление коллекции qdrant."""
 
         try:
             self.client.delete_collection(name)
+            self.hybrid_collections.pop(name, None)
+
+            if name == self.catalog_collection:
+                self.catalog_ready = False
+
             logger.debug(f"Коллекция '{name}' удалена.")
 
         except Exception as e:
             logger.error(f"Ошибка при удалении коллекции: {e}")
             raise
 
+    def find_document_by_hash(
+            self,
+            content_hash: str,
+            collection_name: Optional[str] = None,
+            document_uuid: Optional[str] = None,
+    ) -> Optional[Tuple[str, List[str]]]:
+        """Поиск уже проиндексированного документа по хешу его содержимого.
+
+        Один хеш могут иметь несколько документов (одинаковые файлы, загруженные одновременно, или
+        новая версия документа, совпавшая с другим документом), поэтому точки собираются только
+        для одного документа: ``document_uuid`` или первого найденного документа с этим хешем.
+
+        Args:
+            content_hash: Хеш содержимого файла.
+            collection_name: Коллекция для поиска. По умолчанию - коллекция из конфига.
+            document_uuid: UUID документа, среди точек которого ищется хеш. По умолчанию - любой документ.
+
+        Returns:
+            UUID документа и ID всех его точек или None, если документ не найден.
+        """
+
+        collection_name = collection_name or qdrant_config.defaults.default_collection
+        conditions = [
+            FieldCondition(
+                key="content_hash",
+                match=MatchValue(value=content_hash),
+            ),
+        ]
+
+        if document_uuid is None:
+            points, _ = self.client.scroll(
+                collection_name=collection_name,
+                scroll_filter=Filter(must=conditions),
+                limit=1,
+                with_payload=["document_uuid"],
+                with_vectors=False,
+            )
+
+            if not points:
+                return None
+
+            document_uuid = points[0].payload.get("document_uuid")
+
+        # Точки без UUID документа (проиндексированные до его появления) ищутся только по хешу
+        if document_uuid:
+            conditions.append(FieldCondition(key="document_uuid", match=MatchValue(value=document_uuid)))
+
+        point_ids = []
+        offset = None
+
+        # Проходим все точки документа постранично
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=collection_name,
+                scroll_filter=Filter(must=conditions),
+                limit=1000,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False,
+            )
+
+            point_ids.extend(str(point.id) for point in points)
+
+            if offset is None:
+                break
+
+        if not point_ids:
+            return None
+
+        return document_uuid, point_ids
+
+    def delete_document(self, document_uuid: str, collection_name: Optional[str] = None) -> int:
+        """Удаление всех точек документа фильтром по ``document_uuid`` и его записи в каталоге.
+
+        Args:
+            document_uuid: UUID документа.
+            collection_name: Коллекция. По умолчанию - коллекция из конфига.
+
+        Returns:
+            int: Количество удалённых точек.
+        """
+
+        return self.delete_documents([document_uuid], collection_name)
+
+    def delete_documents(self, document_uuids: List[str], collection_name: Optional[str] = None) -> int:
+        """Удаление всех точек нескольких документов одним запросом по фильтру ``document_uuid``.
+
+        ID точек не запрашиваются: qdrant удаляет точки по фильтру на своей стороне.
+
+        Args:
+            document_uuids: UUID документов.
+            collection_name: Коллекция. По умолчанию - коллекция из конфига.
+
+        Returns:
+            int: Количество удалённых точек.
+        """
+
+        if not document_uuids:
+            return 0
+
+        collection_name = collection_name or qdrant_config.defaults.default_collection
+        documents_filter = Filter(
+            must=[
+                FieldCondition(
+                    key="document_uuid",
+                    match=MatchAny(any=document_uuids),
+                ),
+            ],
+        )
+
+        # Каталог проверяется до удаления точек: иначе удаление, которое уже произошло,
+        # завершилось бы ошибкой на записях каталога
+        self.ensure_catalog()
+
+        # Подсчёт по индексу document_uuid, без передачи ID точек по сети
+        points_count = self.client.count(
+            collection_name=collection_name,
+            count_filter=documents_filter,
+            exact=True,
+        ).count
+
+        self.client.delete(
+            collection_name=collection_name,
+            points_selector=FilterSelector(filter=documents_filter),
+        )
+        self.delete_catalog_records(document_uuids)
+
+        return points_count
+
+    @property
+    def catalog_collection(self) -> str:
+        """Коллекция каталога документов: одна точка без векторов на документ."""
+
+        return qdrant_config.defaults.catalog_collection
+
+    def create_catalog(self):
+        """Создание коллекции каталога документов."""
+
+        try:
+            self.client.create_collection(collection_name=self.catalog_collection, vectors_config={})
+            logger.debug(f"Коллекция каталога {self.catalog_collection} создана.")
+        except Exception as e:
+            logger.error(f"Ошибка при создании коллекции каталога {self.catalog_collection}: {e}")
+
+    def ensure_catalog(self):
+        """Создание коллекции каталога документов, если её ещё нет."""
+
+        if self.catalog_ready:
+            return
+
+        if not self.client.collection_exists(self.catalog_collection):
+            self.create_catalog()
+
+        self.catalog_ready = True
+
+    def upsert_catalog_record(self, document_uuid: str, record: Dict[str, Any]):
+        """Добавление или обновление записи документа в каталоге.
+
+        Args:
+            document_uuid: UUID документа, он же ID записи каталога.
+            record: Сведения о документе (имя файла, количество чанков, хеш и т.д.).
+        """
+
+        self.ensure_catalog()
+        self.client.upsert(
+            collection_name=self.catalog_collection,
+            points=[PointStruct(id=document_uuid, vector={}, payload={"document_uuid": document_uuid, **record})],
+        )
+
+    def delete_catalog_records(self, document_uuids: List[str]):
+        """Удаление записей документов из каталога."""
+
+        if not document_uuids:
+            return
+
+        self.client.delete(
+            collection_name=self.catalog_collection,
+            points_selector=PointIdsList(points=document_uuids),
+        )
+
+    def list_catalog(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Страница каталога документов.
+
+        Args:
+            limit: Количество документов на странице.
+            cursor: Курсор страницы из предыдущего ответа; None - первая страница.
+
+        Returns:
+            Записи документов страницы и курсор следующей страницы (None на последней).
+        """
+
+        records, next_offset = self.client.scroll(
+            collection_name=self.catalog_collection,
+            limit=limit,
+            offset=cursor,
+            with_payload=True,
+            with_vectors=False,
+        )
+
+        return [record.payload for record in records], str(next_offset) if next_offset is not None else None
+
+    def count_catalog(self) -> int:
+        """Количество документов в каталоге."""
+
+        return self.client.count(collection_name=self.catalog_collection, exact=True).count
+
+    def get_document_chunks(
+            self,
+            document_uuid: str,
+            collection_name: Optional[str] = None,
+    ) -> Dict[str, List[Tuple[str, int]]]:
+        """Точки документа, сгруппированные по хешу текста чанка.
+
+        Для точек, проиндексированных до появления ``chunk_hash`` в payload, хеш считается по тексту.
+
+        Args:
+            document_uuid: UUID документа.
+            collection_name: Коллекция. По умолчанию - коллекция из конфига.
+
+        Returns:
+            Хеш чанка -> список пар (ID точки, индекс чанка).
+        """
+
+        collection_name = collection_name or qdrant_config.defaults.default_collection
+        document_filter = Filter(
+            must=[
+                FieldCondition(
+                    key="document_uuid",
+                    match=MatchValue(value=document_uuid),
+                ),
+            ],
+        )
+
+        chunks: Dict[str, List[Tuple[str, int]]] = {}
+        offset = None
+
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=collection_name,
+                scroll_filter=document_filter,
+                limit=1000,
+                offset=offset,
+                with_payload=["chunk_hash", "chunk_index", "text"],
+                with_vectors=False,
+            )
+
+            for point in points:
+                chunk_hash = point.payload.get("chunk_hash") or self.chunk_hash(point.payload.get("text", ""))
+                chunks.setdefault(chunk_hash, []).append((str(point.id), point.payload.get("chunk_index", 0)))
+
+            if offset is None:
+                break
+
+        return chunks
+
+    @staticmethod
+    def chunk_hash(text: str) -> str:
+        """Хеш текста чанка, по которому сравниваются версии документа."""
+
+        return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+    def set_chunk_indexes(self, chunk_indexes: List[Tuple[str, int]], collection_name: Optional[str] = None):
+        """Обновление индексов чанков, сдвинувшихся в новой версии документа, одним запросом.
+
+        Args:
+            chunk_indexes: Пары (ID точки, новый индекс чанка).
+            collection_name: Коллекция. По умолчанию - коллекция из конфига.
+        """
+
+        if not chunk_indexes:
+            return
+
+        self.client.batch_update_points(
+            collection_name=collection_name or qdrant_config.defaults.default_collection,
+            update_operations=[
+                SetPayloadOperation(set_payload=SetPayload(payload={"chunk_index": chunk_index}, points=[point_id]))
+                for point_id, chunk_index in chunk_indexes
+            ],
+        )
+
+    def delete_points(self, point_ids: List[str], collection_name: Optional[str] = None):
+        """Удаление точек по ID."""
+
+        if not point_ids:
+            return
+
+        self.client.delete(
+            collection_name=collection_name or qdrant_config.defaults.default_collection,
+            points_selector=PointIdsList(points=point_ids),
+        )
+
     def search_similar(
         self,
         query_embedding: List[float],
         limit: int = 10,
         score_threshold: float = 0.7,
         file_types: Optional[List[FileType]] = None,
-        metadata_filter: Optional[Dict[str, Any]] = None
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        sparse_query: Optional[SparseVector] = None,
+        hnsw_ef: Optional[int] = None,
+        oversampling: Optional[float] = None,
     ) -> List[SearchResult]:
-        """Поиск похожих документов. # todo добавить реранкер!
+        """Поиск похожих документов с расширением контекста найденных чанков.
 
         Args:
             query_embedding: Вектор запроса
@@ -67,90 +507,228 @@ class QdrantManager:
             score_threshold: Порог схожести
             file_types: Фильтр по типам файлов
             metadata_filter: Фильтр по метаданным
+            sparse_query: Разреженный вектор запроса для гибридного поиска
+            hnsw_ef: Размер списка кандидатов HNSW при поиске
+            oversampling: Множитель кандидатов квантованного поиска для пересчёта оценок
 
         Returns:
             Список результатов поиска
         """
 
         try:
-            # Построение фильтра
-            filter_conditions = []
-
-            if file_types:
-                file_type_values = [ft.value for ft in file_types]
-
-                for file_type_value in file_type_values:
-                    filter_conditions.append(
-                        FieldCondition(
-                            key="file_type",
-                            match=MatchValue(value=file_type_value),
-                        ),
-                )
+            hits = self.search_hits(
+                query_embedding, limit, score_threshold, file_types, metadata_filter, sparse_query,
+                hnsw_ef, oversampling,
+            )
+
+            # Собираем +- shift чанков вокруг найденных одним запросом
+            return self.expand_context(hits)
+
+        except Exception as e:
+            logger.error(f"Ошибка при поиске: {e}", exc_info=True)
+            return []
+
+    def search_hits(
+        self,
+        query_embedding: List[float],
+        limit: int = 10,
+        score_threshold: float = 0.7,
+        file_types: Optional[List[FileType]] = None,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        sparse_query: Optional[SparseVector] = None,
+        hnsw_ef: Optional[int] = None,
+        oversampling: Optional[float] = None,
+    ) -> List[ScoredPoint]:
+        """Поиск чанков, похожих на запрос, без расширения контекста.
+
+        Если передан разреженный вектор запроса и коллекция гибридная, плотный и BM25-поиск
+        выполняются одним запросом, а их результаты объединяются через RRF. Порог схожести
+        в этом случае применяется только к плотному поиску.
+
+        Args:
+            query_embedding: Вектор запроса
+            limit: Максимальное количество чанков
+            score_threshold: Порог схожести
+            file_types: Фильтр по типам файлов
+            metadata_filter: Фильтр по метаданным
+            sparse_query: Разреженный вектор запроса для гибридного поиска
+            hnsw_ef: Размер списка кандидатов HNSW при поиске
+            oversampling: Множитель кандидатов квантованного поиска для пересчёта оценок
 
-            if metadata_filter:
-                for key, value in metadata_filter.items():
-                    filter_conditions.append(
-                        FieldCondition(
-                            key=key,
-                            match=MatchValue(value=value),
-                        ),
-                    )
+        Returns:
+            Найденные точки, отсортированные по убыванию релевантности
+        """
 
-            # Выполнение поиска
-            search_filter = Filter(should=filter_conditions) if filter_conditions else None
+        # Построение фильтра
+        filter_conditions = []
 
+        if file_types:
+            file_type_values = [ft.value for ft in file_types]
+
+            for file_type_value in file_type_values:
+                filter_conditions.append(
+                    FieldCondition(
+                        key="file_type",
+                        match=MatchValue(value=file_type_value),
+                    ),
+            )
+
+        if metadata_filter:
+            for key, value in metadata_filter.items():
+                filter_conditions.append(
+                    FieldCondition(
+                        key=key,
+                        match=MatchValue(value=value),
+                    ),
+                )
+
+        # Выполнение поиска
+        search_filter = Filter(should=filter_conditions) if filter_conditions else None
+        collection_name = qdrant_config.defaults.default_collection
+        search_params = self._search_params(hnsw_ef, oversampling)
+
+        if sparse_query is not None and sparse_query.indices and self.is_hybrid(collection_name):
+            prefetch_limit = limit * qdrant_config.hybrid.prefetch_factor
             search_results = self.client.query_points(
-                collection_name=qdrant_config.defaults.default_collection,
-                query=query_embedding,
+                collection_name=collection_name,
+                prefetch=[
+                    Prefetch(
+                        query=query_embedding,
+                        limit=prefetch_limit,
+                        score_threshold=score_threshold,
+                        filter=search_filter,
+                        params=search_params,
+                    ),
+                    Prefetch(
+                        query=sparse_query,
+                        using=qdrant_config.hybrid.sparse_vector,
+                        limit=prefetch_limit,
+                        filter=search_filter,
+                    ),
+                ],
+                query=FusionQuery(fusion=Fusion.RRF),
                 limit=limit,
-                score_threshold=score_threshold,
-                query_filter=search_filter,
             )
 
-            # Преобразование результатов
-            results = []
-
-            for _result in search_results:
-                result = _result[1][0]
-
-                if result.score >= score_threshold:
-                    # Собираем +- 10 результатов от полученного.
-                    chunk_index = result.payload.get('chunk_index')
-                    chunk_filter = Filter(
-                        must=[
-                            {
-                                "key": "chunk_index",  # путь к полю в payload
-                                "range": {
-                                    "gte": chunk_index - qdrant_config.defaults.shift,
-                                    "lte": chunk_index + qdrant_config.defaults.shift,
-                                },
-                            },
-                        ],
-                    )
-
-                    points, _ = self.client.scroll(
-                        collection_name=qdrant_config.defaults.default_collection,
-                        scroll_filter=chunk_filter,
-                        limit=100,
-                        with_payload=True,
-                    )
-
-                    search_result = SearchResult(
-                        ids=[point.id for point in points],
-                        chunks=sorted([point.payload.get("chunk_index") for point in points]),
-                        file_paths=list(set((point.payload.get("file_path", "") for point in points))),
-                        file_types=list(set((FileType(point.payload.get("file_type", "document")) for point in points))),
-                        texts=', '.join([point.payload.get("text", "") for point in points]),
-                        score=result.score,
-                    )
-                    results.append(search_result)
-
-            return results
+            return search_results.points
 
-        except Exception as e:
-            logger.error(f"Ошибка при поиске: {e}", exc_info=True)
+        search_results = self.client.query_points(
+            collection_name=collection_name,
+            query=query_embedding,
+            limit=limit,
+            score_threshold=score_threshold,
+            query_filter=search_filter,
+            search_params=search_params,
+        )
+
+        return [point for point in search_results.points if point.score >= score_threshold]
+
+    @staticmethod
+    def _document_key(payload: Dict[str, Any]) -> Tuple[str, str]:
+        """Поле и значение, по которым чанки относятся к одному документу."""
+
+        if payload.get("document_uuid"):
+            return "document_uuid", payload["document_uuid"]
+
+        return "file_path", payload.get("file_path", "")
+
+    def expand_context(self, hits: List[ScoredPoint], collection_name: Optional[str] = None) -> List[SearchResult]:
+        """Расширение найденных чанков соседними чанками того же документа.
+
+        Окна ``chunk_index +- shift`` строятся для каждого попадания, пересекающиеся и смежные окна
+        одного документа объединяются, после чего все окна запрашиваются одним вызовом scroll.
+
+        Args:
+            hits: Найденные точки в порядке релевантности.
+            collection_name: Коллекция поиска. По умолчанию - коллекция из конфига.
+
+        Returns:
+            Результаты поиска по объединённым окнам в порядке лучшего попадания каждого окна.
+        """
+
+        collection_name = collection_name or qdrant_config.defaults.default_collection
+        shift = qdrant_config.defaults.shift
+        windows_per_document: Dict[Tuple[str, str], List[List[Any]]] = {}
+
+        for rank, hit in enumerate(hits):
+            chunk_index = hit.payload.get("chunk_index", 0)
+            windows_per_document.setdefault(self._document_key(hit.payload), []).append(
+                [chunk_index - shift, chunk_index + shift, rank, hit.score],
+            )
+
+        # Объединяем пересекающиеся окна документа, окно наследует лучшее по рангу попадание
+        windows = []
+
+        for document_key, document_windows in windows_per_document.items():
+            document_windows.sort()
+            merged = [document_windows[0]]
+
+            for start, end, rank, score in document_windows[1:]:
+                if start <= merged[-1][1] + 1:
+                    merged[-1][1] = max(merged[-1][1], end)
+
+                    if rank < merged[-1][2]:
+                        merged[-1][2:] = [rank, score]
+                else:
+                    merged.append([start, end, rank, score])
+
+            windows.extend((document_key, start, end, rank, score) for start, end, rank, score in merged)
+
+        windows.sort(key=lambda window: window[3])
+
+        if not windows:
             return []
 
+        window_filter = Filter(
+            should=[
+                Filter(
+                    must=[
+                        FieldCondition(key=key, match=MatchValue(value=value)),
+                        FieldCondition(key="chunk_index", range=Range(gte=start, lte=end)),
+                    ],
+                )
+                for (key, value), start, end, _, _ in windows
+            ],
+        )
+
+        points, _ = self.client.scroll(
+            collection_name=collection_name,
+            scroll_filter=window_filter,
+            limit=sum(end - start + 1 for _, start, end, _, _ in windows),
+            with_payload=True,
+            with_vectors=False,
+        )
+
+        # Раскладываем полученные точки по окнам
+        window_points: List[List[Any]] = [[] for _ in windows]
+
+        for point in points:
+            document_key = self._document_key(point.payload)
+            chunk_index = point.payload.get("chunk_index", 0)
+
+            for i, (key, start, end, _, _) in enumerate(windows):
+                if key == document_key and start <= chunk_index <= end:
+                    window_points[i].append(point)
+                    break
+
+        results = []
+
+        for (_, _, _, _, score), points in zip(windows, window_points):
+            points.sort(key=lambda point: point.payload.get("chunk_index", 0))
+
+            results.append(
+                SearchResult(
+                    ids=[point.id for point in points],
+                    chunks=[point.payload.get("chunk_index") for point in points],
+                    file_paths=list(set((point.payload.get("file_path", "") for point in points))),
+                    file_types=list(set((FileType(point.payload.get("file_type", "document")) for point in points))),
+                    texts=', '.join([point.payload.get("text", "") for point in points]),
+                    score=score,
+                ),
+            )
+
+        return results
+
     def close(self):
         """Закрытие соединения с Qdrant."""
 
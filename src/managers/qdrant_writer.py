@@ -0,0 +1,117 @@
+import threading
+import time
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+
+from qdrant_client.models import PointStruct
+
+from src.helpers.configs_hub import qdrant_config
+from src.logging.logger import logger
+from src.managers.qdrant import QdrantManager, qdrant_manager as qm
+
+
+class QdrantWriter:
+    """Конвейерная запись батчей точек в Qdrant.
+
+    В асинхронном режиме батчи записываются пулом потоков, пока вызывающий код готовит следующие;
+    одновременно в записи не больше ``in_flight`` батчей, при превышении лимита ``submit`` ждёт
+    записи самого старого. В синхронном режиме батч записывается сразу в вызывающем потоке.
+    Неудачная запись повторяется ``retries`` раз с экспоненциальной паузой.
+    """
+
+    def __init__(
+            self,
+            collection_name: Optional[str] = None,
+            wait: Optional[bool] = None,
+            qdrant_manager: QdrantManager = qm,
+    ):
+        upsert_config = qdrant_config.processing.upsert
+
+        self.qdrant_manager = qdrant_manager
+        self.collection_name = collection_name or qdrant_config.defaults.default_collection
+        # wait=False - Qdrant подтверждает приём батча, не дожидаясь его индексации
+        self.wait: bool = upsert_config.wait if wait is None else wait
+        self.asynchronous: bool = upsert_config.mode == "async"
+        self.in_flight: int = upsert_config.in_flight
+        self.retries: int = upsert_config.retries
+        self.backoff: float = upsert_config.backoff
+
+        self.executor: Optional[ThreadPoolExecutor] = None
+        if self.asynchronous:
+            self.executor = ThreadPoolExecutor(max_workers=upsert_config.workers, thread_name_prefix="qdrant-writer")
+
+        self.pending: deque[Future] = deque()
+        self.written_count: int = 0
+        self.lock = threading.Lock()
+
+    def submit(self, points: List[PointStruct]):
+        """Отправка батча точек на запись.
+
+        Raises:
+            Exception: Ошибка записи одного из ранее отправленных батчей (в асинхронном режиме)
+                или этого батча (в синхронном), если исчерпаны повторы.
+        """
+
+        if not points:
+            return
+
+        if not self.asynchronous:
+            self._upsert(points)
+            return
+
+        self.pending.append(self.executor.submit(self._upsert, points))
+
+        while len(self.pending) > self.in_flight:
+            self.pending.popleft().result()
+
+    def flush(self):
+        """Ожидание записи всех отправленных батчей; первая ошибка записи пробрасывается."""
+
+        error = None
+
+        while self.pending:
+            try:
+                self.pending.popleft().result()
+            except Exception as e:
+                error = error or e
+
+        if error is not None:
+            raise error
+
+    def close(self):
+        """Ожидание записи и остановка потоков записи."""
+
+        try:
+            self.flush()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+
+    def _upsert(self, points: List[PointStruct]):
+        """Запись батча с повторами при ошибках."""
+
+        for attempt in range(self.retries + 1):
+            try:
+                self.qdrant_manager.client.upsert(
+                    collection_name=self.collection_name,
+                    points=points,
+                    wait=self.wait,
+                )
+                break
+
+            except Exception as e:
+                if attempt == self.retries:
+                    logger.error(f"Ошибка при отправке батча: {e}", exc_info=True)
+                    raise
+
+                delay = self.backoff * 2 ** attempt
+                logger.warning(f"Ошибка при отправке батча, повтор через {delay} с: {e}")
+                time.sleep(delay)
+
+        with self.lock:
+            self.written_count += len(points)
+
+        logger.debug(f"Записано {len(points)} элементов. Всего: {self.written_count}")
@@ -0,0 +1,139 @@
+import sqlite3
+import threading
+import time
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.helpers.configs_hub import fastapi_config
+from src.logging.logger import logger
+
+
+class QuarantineManager:
+    """Учёт файлов, которые не удаётся разобрать.
+
+    Неудачи разбора считаются по хешу содержимого файла. Файл, разбор которого не удался
+    ``max_failures`` раз, попадает в карантин: он больше не разбирается, пока его не снимут
+    с карантина. Успешная индексация сбрасывает счётчик неудач.
+    """
+
+    def __init__(
+            self,
+            db_path: str = fastapi_config.quarantine.db_path,
+            max_failures: int = fastapi_config.quarantine.max_failures,
+    ):
+        self.db_path = Path(db_path)
+        self.max_failures = max_failures
+
+        self.lock = threading.Lock()
+        self.connection: Optional[sqlite3.Connection] = None
+
+    def record_failure(self, content_hash: str, file_name: str, error: str) -> bool:
+        """Учёт неудачного разбора файла.
+
+        Args:
+            content_hash: Хеш содержимого файла.
+            file_name: Имя файла.
+            error: Причина неудачи.
+
+        Returns:
+            bool: Попал ли файл в карантин.
+        """
+
+        with self.lock:
+            connection = self._get_connection()
+            connection.execute(
+                "INSERT INTO quarantine (content_hash, file_name, failures, error, updated_at) "
+                "VALUES (?, ?, 1, ?, ?) "
+                "ON CONFLICT (content_hash) DO UPDATE SET "
+                "file_name = excluded.file_name, failures = failures + 1, "
+                "error = excluded.error, updated_at = excluded.updated_at",
+                (content_hash, file_name, error, time.time()),
+            )
+            failures = connection.execute(
+                "SELECT failures FROM quarantine WHERE content_hash = ?",
+                (content_hash,),
+            ).fetchone()[0]
+            connection.commit()
+
+        if failures >= self.max_failures:
+            logger.warning(f"Файл {file_name} ({content_hash}) помещён в карантин после {failures} неудач разбора.")
+            return True
+
+        return False
+
+    def record_success(self, content_hash: str):
+        """Сброс счётчика неудач успешно проиндексированного файла."""
+
+        with self.lock:
+            connection = self._get_connection()
+            connection.execute("DELETE FROM quarantine WHERE content_hash = ?", (content_hash,))
+            connection.commit()
+
+    def is_quarantined(self, content_hash: str) -> bool:
+        """Находится ли файл в карантине."""
+
+        with self.lock:
+            row = self._get_connection().execute(
+                "SELECT failures FROM quarantine WHERE content_hash = ?",
+                (content_hash,),
+            ).fetchone()
+
+        return row is not None and row[0] >= self.max_failures
+
+    def list_files(self) -> List[Dict[str, Any]]:
+        """Файлы в карантине, начиная с последних."""
+
+        with self.lock:
+            rows = self._get_connection().execute(
+                "SELECT content_hash, file_name, failures, error, updated_at FROM quarantine "
+                "WHERE failures >= ? ORDER BY updated_at DESC",
+                (self.max_failures,),
+            ).fetchall()
+
+        return [
+            {
+                "content_hash": row[0],
+                "file_name": row[1],
+                "failures": row[2],
+                "error": row[3],
+                "updated_at": row[4],
+            }
+            for row in rows
+        ]
+
+    def release(self, content_hash: str) -> bool:
+        """Снятие файла с карантина.
+
+        Returns:
+            bool: Был ли файл в карантине.
+        """
+
+        with self.lock:
+            connection = self._get_connection()
+            deleted = connection.execute(
+                "DELETE FROM quarantine WHERE content_hash = ? AND failures >= ?",
+                (content_hash, self.max_failures),
+            ).rowcount
+            connection.commit()
+
+        return deleted > 0
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Общее соединение с базой карантина; при первом обращении создаёт таблицу."""
+
+        if self.connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS quarantine ("
+                "content_hash TEXT PRIMARY KEY, file_name TEXT NOT NULL, failures INTEGER NOT NULL, "
+                "error TEXT, updated_at REAL NOT NULL)"
+            )
+            self.connection.commit()
+
+        return self.connection
+
+
+quarantine_manager = QuarantineManager()
@@ -0,0 +1,235 @@
+import re
+import zlib
+
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from src.helpers.configs_hub import qdrant_config
+
+
+# Количество предложений, токенизируемых одним вызовом токенизатора
+TOKENIZE_BATCH_SIZE = 64
+# В среднем каждое N-е предложение - опорное: после него чанк закрывается, если заполнен хотя бы наполовину
+ANCHOR_MODULUS = 4
+# Незаконченное предложение, переносимое на следующую страницу, отдаётся как есть, если в нём
+# больше N символов на токен чанка: текст без знаков конца предложения (таблицы) не копится
+TAIL_CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class _Piece:
+    """Предложение или его часть вместе с границами токенов в тексте."""
+    text: str
+    offsets: List[Tuple[int, int]]
+
+    @property
+    def tokens(self) -> int:
+        return len(self.offsets)
+
+    def starts_word(self, token: int) -> bool:
+        """Начинается ли с токена ``token`` новое слово."""
+
+        start = self.offsets[token][0]
+
+        # Часть токенизаторов включает ведущий пробел в границы токена
+        return start == 0 or self.text[start - 1].isspace() or self.text[start:start + 1].isspace()
+
+    def slice(self, start_token: int, end_token: int) -> "_Piece":
+        """Часть из токенов с ``start_token`` по ``end_token`` (не включая)."""
+
+        start_char = self.offsets[start_token][0]
+        end_char = self.offsets[end_token - 1][1]
+
+        return _Piece(
+            text=self.text[start_char:end_char],
+            offsets=[(start - start_char, end - start_char) for start, end in self.offsets[start_token:end_token]],
+        )
+
+    def suffix(self, start_token: int) -> "_Piece":
+        """Часть, начинающаяся с токена ``start_token``."""
+
+        return self.slice(start_token, self.tokens)
+
+
+class TokenChunker:
+    """Разбиение текста на чанки по токенам модели эмбеддингов.
+
+    Предложения упаковываются в чанк, пока их суммарная длина в токенах не превысит
+    ``chunk_tokens``, поэтому модель не обрезает текст чанка; чанк, заполненный хотя бы наполовину,
+    закрывается и после опорного предложения (см. ``ANCHOR_MODULUS``). Следующий чанк начинается с
+    последних ``overlap_tokens`` токенов предыдущего, граница перекрытия сдвигается к началу
+    слова. Каждое предложение токенизируется один раз, время работы линейно по длине текста.
+    """
+
+    def __init__(
+            self,
+            tokenizer,
+            chunk_tokens: int = qdrant_config.processing.chunk_tokens,
+            overlap_tokens: int = qdrant_config.processing.chunk_overlap_tokens,
+    ):
+        if overlap_tokens >= chunk_tokens:
+            raise ValueError("Перекрытие чанков должно быть меньше размера чанка.")
+
+        self.tokenizer = tokenizer
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+
+    def chunk(self, text: str) -> List[str]:
+        """Разбиение текста на чанки."""
+
+        return list(self.iter_chunks([text]))
+
+    def iter_chunks(self, pages: Iterable[str]) -> Iterator[str]:
+        """Потоковое разбиение текста страниц на чанки.
+
+        Args:
+            pages: Текст документа по страницам (или целиком одной строкой).
+
+        Returns:
+            Iterator[str]: Тексты чанков по порядку.
+        """
+
+        current: List[_Piece] = []
+        current_tokens = 0
+
+        for piece in self._iter_pieces(pages):
+            if current and current_tokens + piece.tokens > self.chunk_tokens:
+                yield self._join(current)
+                current = self._overlap(current)
+                current_tokens = sum(overlap_piece.tokens for overlap_piece in current)
+
+                # Перекрытие уступает место предложению, если вместе они не помещаются
+                while current and current_tokens + piece.tokens > self.chunk_tokens:
+                    current_tokens -= current.pop(0).tokens
+
+            current.append(piece)
+            current_tokens += piece.tokens
+
+            # Границы по опорным предложениям зависят только от текста рядом с ними, поэтому
+            # после правки документа разбиение быстро совпадает с прежним и чанки переиспользуются
+            if current_tokens >= self.chunk_tokens // 2 and self._is_anchor(piece):
+                yield self._join(current)
+                current = self._overlap(current)
+                current_tokens = sum(overlap_piece.tokens for overlap_piece in current)
+
+        if current:
+            yield self._join(current)
+
+    @staticmethod
+    def _is_anchor(piece: _Piece) -> bool:
+        return zlib.crc32(piece.text.strip().encode('utf-8')) % ANCHOR_MODULUS == 0
+
+    @staticmethod
+    def _join(pieces: List[_Piece]) -> str:
+        return " ".join(piece.text.strip() for piece in pieces)
+
+    def _overlap(self, pieces: List[_Piece]) -> List[_Piece]:
+        """Последние ``overlap_tokens`` токенов чанка, начиная с начала слова."""
+
+        overlap = []
+        remaining = self.overlap_tokens
+
+        for piece in reversed(pieces):
+            if remaining <= 0:
+                break
+
+            if piece.tokens <= remaining:
+                overlap.insert(0, piece)
+                remaining -= piece.tokens
+                continue
+
+            start = self._word_start(piece, piece.tokens - remaining)
+
+            if start is not None:
+                overlap.insert(0, piece.suffix(start))
+
+            break
+
+        return overlap
+
+    @staticmethod
+    def _word_start(piece: _Piece, token: int) -> Optional[int]:
+        """Первый токен не раньше ``token``, с которого начинается слово."""
+
+        for i in range(token, piece.tokens):
+            if piece.starts_word(i):
+                return i
+
+        return None
+
+    @staticmethod
+    def _last_word_start(piece: _Piece, token: int, lower: int = 0) -> int:
+        """Последний токен после ``lower`` и не позже ``token``, с которого начинается слово.
+
+        Если такого нет (слово длиннее чанка), часть режется ровно по ``token``.
+        """
+
+        for i in range(token, lower, -1):
+            if piece.starts_word(i):
+                return i
+
+        return token
+
+    def _iter_pieces(self, pages: Iterable[str]) -> Iterator[_Piece]:
+        """Токенизированные предложения; предложения длиннее чанка режутся на части по словам."""
+
+        max_tail = self.chunk_tokens * TAIL_CHARS_PER_TOKEN
+        sentences = (sentence for sentence in _iter_sentences(pages, max_tail) if sentence.strip())
+
+        while True:
+            batch = list(islice(sentences, TOKENIZE_BATCH_SIZE))
+
+            if not batch:
+                return
+
+            offset_mapping = self.tokenizer(
+                batch,
+                add_special_tokens=False,
+                return_offsets_mapping=True,
+            )["offset_mapping"]
+
+            for sentence, offsets in zip(batch, offset_mapping):
+                piece = _Piece(text=sentence, offsets=[tuple(offset) for offset in offsets])
+
+                if piece.tokens <= self.chunk_tokens:
+                    if piece.tokens:
+                        yield piece
+                    continue
+
+                # Длинное предложение режется по словам; части берутся по индексам токенов,
+                # без копирования остатка предложения после каждого разреза
+                start = 0
+
+                while piece.tokens - start > self.chunk_tokens:
+                    end = self._last_word_start(piece, start + self.chunk_tokens, start)
+
+                    yield piece.slice(start, end)
+                    start = end
+
+                yield piece.slice(start, piece.tokens)
+
+
+def _iter_sentences(pages: Iterable[str], max_tail: Optional[int] = None) -> Iterator[str]:
+    """Предложения текста страниц.
+
+    Последнее предложение страницы может продолжаться на следующей, поэтому оно
+    откладывается и склеивается с началом следующей страницы. Отложенный хвост длиннее
+    ``max_tail`` символов отдаётся сразу, чтобы текст без знаков конца предложения не копился.
+    """
+
+    tail = None
+
+    for page in pages:
+        text = page if tail is None else f"{tail} {page}"
+        sentences = re.split(r'(?<=[.!?])\s+', text)
+        tail = sentences.pop()
+
+        yield from sentences
+
+        if max_tail is not None and len(tail) >= max_tail:
+            yield tail
+            tail = None
+
+    if tail is not None:
+        yield tail
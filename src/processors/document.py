@@ -1,6 +1,8 @@
+import copy
 import uuid
 import re
-import hashlib
+import queue
+import threading
 import time
 import pdfplumber
 import sys
@@ -9,15 +11,28 @@ import os
 from tqdm import tqdm
 from abc import abstractmethod
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from qdrant_client.models import PointStruct
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, Callable
+from qdrant_client.models import PointStruct, SparseVector
 from sentence_transformers import SentenceTransformer
 
 from src.logging.logger import logger
-from src.helpers.configs_hub import qdrant_config
+from src.helpers.configs_hub import embedding_config, qdrant_config
 from src.managers.qdrant import qdrant_manager
+from src.managers.qdrant_writer import QdrantWriter
+from src.managers.embedding_cache import EmbeddingCache, embedding_cache
 from src.helpers.models_management import get_embedding_model
+from src.processors.chunker import TokenChunker
 from src.processors.parsers import PDFParser
+from src.processors.sparse import SparseEncoder, sparse_encoder
+from src.processors.supervisor import SupervisedPDFParser
+
+
+# Пространство имён детерминированных ID точек (UUIDv5)
+POINT_ID_NAMESPACE = uuid.UUID("5b0a8f4e-3c1d-4e2a-9f67-1d2c3b4a5e6f")
+
+
+class EmbeddingError(Exception):
+    """Модель эмбеддингов не смогла закодировать чанки документа."""
 
 
 class BaseProcessor:
@@ -29,6 +44,9 @@ class BaseProcessor:
         self.chunk_size: int = qdrant_config.processing.chunk_size
         self.batch_size = qdrant_config.processing.batch_size
 
+        # Запись в Qdrant, в асинхронном режиме - параллельно с созданием эмбеддингов
+        self.writer: Optional[QdrantWriter] = None
+
     @abstractmethod
     def process_file(self, suffix: str, path: Path) -> bool:
         """Обработка одного файла."""
@@ -36,13 +54,13 @@ class BaseProcessor:
     def _flush_batch(self):
         """Отправка накопленного батча в Qdrant."""
 
+        if self.writer is None:
+            self.writer = QdrantWriter()
+
         try:
-            qdrant_manager.client.upsert(
-                collection_name=qdrant_config.defaults.default_collection,
-                points=self.buffer,
-            )
+            self.writer.submit(self.buffer)
             self.processed_count += len(self.buffer)
-            logger.debug(f"Обработано {len(self.buffer)} элементов. Всего: {self.processed_count}")
+            logger.debug(f"Отправлено {len(self.buffer)} элементов. Всего: {self.processed_count}")
 
         except Exception as e:
             logger.error(f"Ошибка при отправке батча: {e}", exc_info=True)
@@ -50,17 +68,38 @@ class BaseProcessor:
         finally:
             self.buffer = []
 
+    @staticmethod
+    def _create_point_id(document_uuid: Optional[str], content_hash: str, chunk_index: int) -> str:
+        """Детерминированный ID точки по UUID документа, хешу файла, индексу чанка и модели эмбеддингов.
+
+        Повторная запись того же чанка (повтор батча, возобновлённое задание с тем же UUID)
+        перезаписывает точку, а не создаёт дубликат. UUID документа разделяет точки разных
+        документов с одинаковым содержимым.
+        """
+
+        return str(uuid.uuid5(
+            POINT_ID_NAMESPACE,
+            f"{document_uuid}:{content_hash}:{chunk_index}:{embedding_config.models.embedding}",
+        ))
+
     def _create_point(
             self,
             vector: List[float],
             payload: Dict[str, Any],
             point_id: Optional[str] = None,
+            sparse_vector: Optional[SparseVector] = None,
     ) -> PointStruct:
-        """Создание точки для Qdrant."""
+        """Создание точки для Qdrant.
+
+        Разреженный вектор, если передан, сохраняется рядом с плотным (безымянным) вектором.
+        """
 
         if point_id is None:
             point_id = str(uuid.uuid4())
 
+        if sparse_vector is not None:
+            vector = {"": vector, qdrant_config.hybrid.sparse_vector: sparse_vector}
+
         return PointStruct(
             id=point_id,
             vector=vector,
@@ -81,6 +120,9 @@ class BaseProcessor:
         if self.buffer:
             self._flush_batch()
 
+        if self.writer is not None:
+            self.writer.flush()
+
         logger.debug(f"Обработка завершена. Всего обработано: {self.processed_count}")
 
 
@@ -107,120 +149,276 @@ class DocumentProcessor(BaseProcessor):
         }
 
         self.embedding_model: SentenceTransformer = get_embedding_model()
-        self.embedding_cache: Dict[str, List[float]] = {}
+        self.embedding_cache: EmbeddingCache = embedding_cache
         self.embedding_dimension = self.embedding_model.get_sentence_embedding_dimension()
-
-    def process_file(self, suffix, path, document_uuid: str = None):
-        """Обработка документа."""
+        self.embedding_batch_tokens: int = qdrant_config.processing.embedding_batch_tokens
+        self.sparse_encoder: SparseEncoder = sparse_encoder
+        # Быстрый токенизатор HF меняет своё состояние при вызове с другими параметрами усечения и
+        # паддинга, а одновременные вызовы с разными параметрами падают с "Already borrowed".
+        # Токенизатор модели используется только в encode (всегда с одними параметрами), а чанкер
+        # (поток разбора) и расчёт бюджета батчей получают собственные копии
+        self.chunker: TokenChunker = TokenChunker(copy.deepcopy(self.embedding_model.tokenizer))
+        self.budget_tokenizer = copy.deepcopy(self.embedding_model.tokenizer)
+        # Сколько чанков парсер может подготовить впрок, пока идёт создание эмбеддингов
+        self.pipeline_queue_size: int = qdrant_config.processing.pipeline_queue_size
+
+        # Статистика последней обработки файла
+        self.performance: Dict[str, Any] = {}
+        # Обратный вызов прогресса обрабатываемого файла
+        self.progress: Optional[Callable[[str, int, int], None]] = None
+        # ID точек, записанных при обработке файла (без сохранённых точек обновляемого документа)
+        self.written_point_ids: List[str] = []
+        # Страницы, пропущенные при разборе обрабатываемого файла
+        self.skipped_pages: List[Dict[str, Any]] = []
+        # Разбор PDF в дочернем процессе с лимитами времени и памяти
+        self.supervised_parse: bool = qdrant_config.processing.pdf.supervisor.enabled
+
+    def process_file(
+            self,
+            suffix,
+            path,
+            document_uuid: str = None,
+            content_hash: str = None,
+            progress: Optional[Callable[[str, int, int], None]] = None,
+            upsert_wait: Optional[bool] = None,
+            existing_chunks: Optional[Dict[str, List[Tuple[str, int]]]] = None,
+    ):
+        """Обработка документа.
+
+        При обновлении документа передаются его текущие точки: чанки, текст которых не изменился,
+        не кодируются заново, а сохраняют свои точки (при сдвиге обновляется только индекс чанка);
+        точки чанков, которых нет в новой версии, удаляются.
+
+        Args:
+            suffix: Расширение файла.
+            path: Путь к файлу.
+            document_uuid: UUID документа, сохраняемый в payload точек.
+            content_hash: Хеш содержимого файла, сохраняемый в payload точек.
+            progress: Обратный вызов прогресса (этап "pages" или "chunks", обработано, всего).
+            upsert_wait: Ждать ли индексации каждого батча в Qdrant; False ускоряет массовую загрузку.
+                По умолчанию берётся из конфига.
+            existing_chunks: Точки текущей версии документа из ``QdrantManager.get_document_chunks``.
+
+        Returns:
+            List[str]: ID точек документа.
+
+        Raises:
+            DocumentParseError: Если документ не удалось разобрать в пределах лимитов.
+            Exception: Любая другая ошибка разбора, эмбеддингов или записи. Записанные точки
+                не удаляются: их ID остаются в ``written_point_ids``.
+        """
 
         point_ids = []
+        self.performance = {}
+        self.progress = progress
+        self.skipped_pages = []
+        self.written_point_ids = []
+        self.buffer = []
+        self.writer = QdrantWriter(wait=upsert_wait)
+
+        # Чанки из потока разбора: (индекс, текст), исключение разбора или None в конце
+        chunks_queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.pipeline_queue_size)
+        stop_parsing = threading.Event()
+
+        def put(item) -> bool:
+            """Передача элемента потребителю; False, если потребитель остановил разбор."""
+
+            while not stop_parsing.is_set():
+                try:
+                    chunks_queue.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+
+            return False
+
+        def produce_chunks():
+            # Все передачи в очередь проверяют остановку: если потребитель упал при полной очереди,
+            # поток разбора не блокируется навсегда вместе с открытым файлом
+            try:
+                pages = self._iter_pages(suffix, path)
+
+                # Разбиение на чанки с перекрытием по мере разбора страниц
+                for item in enumerate(self.chunker.iter_chunks(pages)):
+                    if not put(item):
+                        return
+
+                put(None)
+            except Exception as e:
+                put(e)
+
+        parser_thread = threading.Thread(target=produce_chunks, name="document-parser", daemon=True)
 
         try:
             logger.debug(f"Обработка документа: {path}")
-            # Извлечение текста
-            extractor = self.document_formats[suffix]
-            text = extractor(path)
-
-            # Разбиение на чанки с перекрытием
-            chunks = self._chunk_text(text, overlap=100)
-
-            # Фильтруем пустые чанки
-            non_empty_chunks = [chunk for chunk in chunks if chunk.strip()]
-
-            with tqdm(total=len(chunks), desc="Создание эмбедингов") as pbar:
-                # Обработка каждого чанка
-                for i, chunk in enumerate(chunks):
-                    if not chunk.strip():
-                        pbar.update(1)
-                        continue
-
-                    # Создаем эмбеддинг для текущего чанка
-                    embedding = self._create_embedding(chunk)
-
-                    # Создание точки для Qdrant
-                    payload = {
-                        "file_path": str(path),
-                        "file_type": "document",
-                        "file_format": suffix,
-                        "text": chunk,
-                        "chunk_index": i,
-                        "total_chunks": len(chunks),
-                        "file_size": path.stat().st_size,
-                    }
-
-                    # Добавляем UUID документа в payload, если он передан
-                    if document_uuid:
-                        payload["document_uuid"] = document_uuid
-
-                    point = self._create_point(embedding, payload)
-                    point_ids.append(point.id)
-                    self._add_to_buffer(point)
-                    pbar.update(1)
+            file_size = path.stat().st_size
+            # Разреженные BM25-векторы нужны только гибридной коллекции
+            hybrid = qdrant_manager.is_hybrid()
+            started_at = time.perf_counter()
+            embedding_time = 0.0
+            chunks_count = 0
+            embedded_count = 0
+            # Сохранённые точки неизменных чанков и сдвинувшиеся индексы этих чанков
+            reused_count = 0
+            moved_chunks: List[Tuple[str, int]] = []
+
+            parser_thread.start()
+
+            def chunk_groups():
+                """Группы непустых чанков, уже готовых к эмбеддингу."""
+
+                nonlocal chunks_count, reused_count
+
+                while True:
+                    items = [chunks_queue.get()]
+
+                    # Забираем всё, что парсер успел подготовить, не дожидаясь следующих чанков
+                    while len(items) < self.pipeline_queue_size:
+                        try:
+                            items.append(chunks_queue.get_nowait())
+                        except queue.Empty:
+                            break
+
+                    group = []
+
+                    for item in items:
+                        if isinstance(item, Exception):
+                            raise item
+
+                        if item is None:
+                            if group:
+                                yield group
+                            return
+
+                        chunks_count = item[0] + 1
+
+                        # Пустые чанки пропускаем, сохраняя исходные индексы
+                        if not item[1].strip():
+                            continue
+
+                        # Неизменный чанк обновляемого документа сохраняет свою точку
+                        chunk_points = existing_chunks.get(qdrant_manager.chunk_hash(item[1])) if existing_chunks else None
+
+                        if chunk_points:
+                            point_id, chunk_index = chunk_points.pop(0)
+                            point_ids.append(point_id)
+                            reused_count += 1
+
+                            if chunk_index != item[0]:
+                                moved_chunks.append((point_id, item[0]))
+
+                            continue
+
+                        group.append(item)
+
+                    if group:
+                        yield group
+
+            with tqdm(desc="Создание эмбедингов") as pbar:
+                # Обработка чанков батчами, ограниченными по количеству токенов
+                for batch in self._iter_token_batches(chunk_groups()):
+                    batch_started_at = time.perf_counter()
+                    embeddings = self._create_embeddings_batch([chunk for _, chunk in batch])
+                    embedding_time += time.perf_counter() - batch_started_at
+
+                    for (i, chunk), embedding in zip(batch, embeddings):
+                        # Создание точки для Qdrant
+                        payload = {
+                            "file_path": str(path),
+                            "file_type": "document",
+                            "file_format": suffix,
+                            "text": chunk,
+                            "chunk_index": i,
+                            "chunk_hash": qdrant_manager.chunk_hash(chunk),
+                            "file_size": file_size,
+                        }
+
+                        # Добавляем UUID документа в payload, если он передан
+                        if document_uuid:
+                            payload["document_uuid"] = document_uuid
+
+                        sparse_vector = self.sparse_encoder.encode(chunk) if hybrid else None
+                        point_id = self._create_point_id(document_uuid, content_hash, i) if content_hash else None
+                        point = self._create_point(embedding, payload, point_id, sparse_vector)
+                        point_ids.append(point.id)
+                        self.written_point_ids.append(point.id)
+                        self._add_to_buffer(point)
+
+                    embedded_count += len(batch)
+                    pbar.update(len(batch))
+
+                    if progress is not None:
+                        progress("chunks", embedded_count + reused_count, chunks_count)
 
             self.finalize()
-            logger.debug(f"Документ обработан: {path} ({len(chunks)} чанков)")
 
-            return point_ids
+            # Обновление документа: сдвигаем индексы сохранённых чанков
+            if existing_chunks:
+                qdrant_manager.set_chunk_indexes(moved_chunks)
+
+            # Количество чанков известно только после разбора всего документа. Хеш содержимого
+            # записывается последним, чтобы не пропускать повторную загрузку недоиндексированного файла
+            final_payload = {"total_chunks": chunks_count}
+
+            if content_hash:
+                final_payload["content_hash"] = content_hash
+
+            if point_ids:
+                qdrant_manager.client.set_payload(
+                    collection_name=qdrant_config.defaults.default_collection,
+                    payload=final_payload,
+                    points=point_ids,
+                )
+
+            # Устаревшие чанки удаляются последними: до этого ошибка оставляет прежнюю версию целой
+            stale_ids = []
+
+            if existing_chunks:
+                stale_ids = [point_id for chunk_points in existing_chunks.values() for point_id, _ in chunk_points]
+                qdrant_manager.delete_points(stale_ids)
+
+            elapsed = time.perf_counter() - started_at
+            self.performance = {
+                "chunks": embedded_count,
+                "reused_chunks": reused_count,
+                "deleted_chunks": len(stale_ids),
+                "embedding_time": round(embedding_time, 3),
+                "chunks_per_sec": round(embedded_count / embedding_time, 2) if embedding_time > 0 else 0.0,
+                "total_time": round(elapsed, 3),
+                "skipped_pages": self.skipped_pages,
+            }
+            logger.debug(f"Документ обработан: {path} ({chunks_count} чанков, {self.performance['chunks_per_sec']} чанков/с)")
 
-        except:
             return point_ids
 
-    def _chunk_text(self, text, chunk_size=None, overlap=50):
-        """Разбиение текста на чанки с перекрытием."""
-        
-        if chunk_size is None:
-            chunk_size = qdrant_config.processing.chunk_size
-        
-        # Разбиваем текст на предложения
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        
-        chunks = []
-        current_chunk = []
-        current_length = 0
-        
-        for sentence in sentences:
-            sentence_length = len(sentence)
-            
-            # Если предложение слишком большое, разбиваем его
-            if sentence_length > chunk_size:
-                # Разбиваем большое предложение на части
-                words = sentence.split()
-
-                for word in words:
-                    if current_length + len(word) + 1 > chunk_size and current_chunk:
-                        chunks.append(" ".join(current_chunk))
-                        current_chunk = [word]
-                        current_length = len(word)
-                    else:
-                        current_chunk.append(word)
-                        current_length += len(word) + 1
-                
-                if current_chunk:
-                    chunks.append(" ".join(current_chunk))
-                    current_chunk = []
-                    current_length = 0
-            
-            # Обычная обработка предложения
-            elif current_length + sentence_length + 1 > chunk_size and current_chunk:
-                chunks.append(" ".join(current_chunk))
-                # Добавляем перекрытие: берем последние overlap символов из предыдущего чанка
-
-                if overlap > 0 and len(chunks) > 0:
-                    last_chunk = chunks[-1]
-                    overlap_text = last_chunk[-overlap:] if len(last_chunk) > overlap else last_chunk
-                    current_chunk = [overlap_text, sentence]
-                    current_length = len(overlap_text) + len(sentence) + 1
-                else:
-                    current_chunk = [sentence]
-                    current_length = len(sentence)
-            else:
-                current_chunk.append(sentence)
-                current_length += len(sentence) + 1
+        finally:
+            stop_parsing.set()
+            self.buffer = []
+
+            # Дожидаемся уже отправленных батчей, чтобы они не смешались со следующим файлом
+            try:
+                self.writer.close()
+            except Exception:
+                pass
+
+            self.writer = None
+
+    def _iter_pages(self, suffix: str, path: Path) -> Iterator[str]:
+        """Текст документа по страницам; форматы без постраничного разбора отдаются целиком."""
+
+        if suffix == '.pdf':
+            yield from self._iter_pdf_pages(path)
+            return
 
-        if current_chunk:
-            chunks.append(" ".join(current_chunk))
+        text = self.document_formats[suffix](path)
 
-        return chunks
+        if text:
+            yield text
+
+    def _chunk_text(self, text):
+        """Разбиение текста на чанки с перекрытием по токенам модели эмбеддингов."""
+
+        return self.chunker.chunk(text)
 
     def _create_embedding(self, text: str) -> List[float]:
         """Создание эмбеддинга для текста с кэшированием."""
@@ -230,17 +428,19 @@ class DocumentProcessor(BaseProcessor):
                 return [0.0] * self.embedding_dimension  # Пустой вектор
 
             # Создаем хеш текста для кэширования
-            text_hash = hashlib.md5(text.encode('utf-8')).hexdigest()
+            text_hash = self.embedding_cache.text_hash(text)
             
             # Проверяем кэш
-            if text_hash in self.embedding_cache:
-                return self.embedding_cache[text_hash]
+            cached_embedding = self.embedding_cache.get(text_hash)
+
+            if cached_embedding is not None:
+                return cached_embedding
 
             embedding = self.embedding_model.encode(text, show_progress_bar=False)
             embedding_list = embedding.tolist()
             
             # Сохраняем в кэш
-            self.embedding_cache[text_hash] = embedding_list
+            self.embedding_cache.set(text_hash, embedding_list)
             
             return embedding_list
 
@@ -248,40 +448,111 @@ class DocumentProcessor(BaseProcessor):
             logger.error(f"Ошибка при создании эмбеддинга: {e}", exc_info=True)
             return [0.0] * self.embedding_dimension
 
+    def _iter_token_batches(
+            self,
+            chunk_groups: Iterable[List[Tuple[int, str]]],
+    ) -> Iterator[List[Tuple[int, str]]]:
+        """Разбиение чанков на батчи для эмбеддинга с ограничением по количеству токенов.
+
+        Модель дополняет все тексты батча до длины самого длинного, поэтому стоимость батча
+        оценивается как ``max_len * len(batch)`` и не превышает ``embedding_batch_tokens``.
+
+        Args:
+            chunk_groups: Группы пар (индекс чанка, текст чанка); каждая группа токенизируется
+                одним вызовом токенизатора.
+
+        Returns:
+            Итератор по батчам пар (индекс чанка, текст чанка) в исходном порядке.
+        """
+
+        batch = []
+        batch_max_length = 0
+
+        for chunks in chunk_groups:
+            if not chunks:
+                continue
+
+            lengths = [
+                len(input_ids) for input_ids in self.budget_tokenizer(
+                    [chunk for _, chunk in chunks],
+                    truncation=True,
+                    max_length=self.embedding_model.max_seq_length,
+                )["input_ids"]
+            ]
+
+            for item, length in zip(chunks, lengths):
+                max_length = max(batch_max_length, length)
+
+                if batch and max_length * (len(batch) + 1) > self.embedding_batch_tokens:
+                    yield batch
+                    batch = []
+                    max_length = length
+
+                batch.append(item)
+                batch_max_length = max_length
+
+        if batch:
+            yield batch
+
     def _create_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
-        """Создание эмбеддингов для пакета текстов."""
-        
+        """Создание эмбеддингов для пакета текстов с кэшированием.
+
+        Тексты, уже присутствующие в кэше, повторно не кодируются; остальные кодируются
+        одним вызовом модели.
+
+        Args:
+            texts: Тексты для кодирования.
+
+        Returns:
+            Эмбеддинги в порядке исходных текстов; для пустых текстов - нулевые векторы.
+
+        Raises:
+            EmbeddingError: Если модель не смогла закодировать тексты.
+        """
+
         if not texts:
             return []
-        
-        # Фильтруем пустые тексты
-        non_empty_texts = [text for text in texts if text.strip()]
-        
-        if not non_empty_texts:
-            return [[0.0] * self.embedding_dimension] * len(texts)
-        
-        try:
-            # Создаем эмбеддинги для пакета
-            embeddings = self.embedding_model.encode(non_empty_texts, show_progress_bar=False)
-            
-            # Преобразуем в список списков
-            embeddings_list = embeddings.tolist()
-            
-            # Добавляем пустые векторы для пустых текстов
-            result = []
-            text_index = 0
-            for text in texts:
-                if text.strip():
-                    result.append(embeddings_list[text_index])
-                    text_index += 1
-                else:
-                    result.append([0.0] * self.embedding_dimension)
-            
+
+        result: List[Optional[List[float]]] = []
+        missing: Dict[str, List[int]] = {}
+        text_hashes = [self.embedding_cache.text_hash(text) if text.strip() else None for text in texts]
+        cached = self.embedding_cache.get_many([text_hash for text_hash in text_hashes if text_hash])
+
+        for i, text_hash in enumerate(text_hashes):
+            if text_hash is None:
+                result.append([0.0] * self.embedding_dimension)
+            elif text_hash in cached:
+                result.append(cached[text_hash])
+            else:
+                result.append(None)
+                missing.setdefault(text_hash, []).append(i)
+
+        if not missing:
             return result
-            
+
+        # Создаем эмбеддинги для пакета одним проходом модели. Ошибка модели не подменяется нулевыми
+        # векторами: она прерывает индексацию, и записанные точки документа откатываются
+        missing_texts = [texts[positions[0]] for positions in missing.values()]
+
+        try:
+            embeddings = self.embedding_model.encode(
+                missing_texts,
+                batch_size=len(missing_texts),
+                show_progress_bar=False,
+            )
         except Exception as e:
-            logger.error(f"Ошибка при создании эмбеддингов для пакета: {e}", exc_info=True)
-            return [[0.0] * self.embedding_dimension] * len(texts)
+            raise EmbeddingError(f"Ошибка при создании эмбеддингов для пакета: {e}") from e
+
+        new_embeddings = dict(zip(missing, embeddings.tolist()))
+
+        for text_hash, positions in missing.items():
+            for position in positions:
+                result[position] = new_embeddings[text_hash]
+
+        # Сохраняем в кэш
+        self.embedding_cache.set_many(new_embeddings)
+
+        return result
 
     def _normalize_text(self, text: str) -> str:
         """Нормализация текста: удаление лишних пробелов, нормализация переносов и т.д."""
@@ -297,10 +568,28 @@ class DocumentProcessor(BaseProcessor):
     def _extract_pdf_text(self, path):
         """Извлечение текста из PDF файла с использованием pdfplumber."""
 
-        parser = PDFParser(path)
-        text = parser.parse()
+        return ' '.join(self._iter_pdf_pages(path))
+
+    def _iter_pdf_pages(self, path) -> Iterator[str]:
+        """Нормализованный текст страниц PDF файла по мере их разбора.
+
+        Raises:
+            DocumentParseError: Если превышен лимит документа или не разобрана ни одна страница.
+        """
+
+        if self.supervised_parse:
+            parser = SupervisedPDFParser(path, progress=self.progress)
+            # Список пополняется по ходу разбора и попадает в статистику файла
+            self.skipped_pages = parser.skipped_pages
+        else:
+            parser = PDFParser(path, progress=self.progress)
+            self.skipped_pages = parser.skipped_pages
+
+        for page_text in parser.iter_pages():
+            page_text = self._normalize_text(page_text)
 
-        return self._normalize_text(text)
+            if page_text:
+                yield page_text
 
     def _extract_docx_text(self, path):
         ...
@@ -1,153 +1,494 @@
 import PyPDF2
 import pdfplumber
 import pytesseract
-import os
-import tempfile
-
-from pdfminer.high_level import extract_pages
-from pdfminer.layout import LTTextContainer, LTChar, LTRect, LTFigure
+import math
+import multiprocessing
+import unicodedata
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from pdfminer.layout import LTTextContainer, LTChar, LTFigure, LTPage
 from PIL import Image
 from pdf2image import convert_from_path
 
+from src.helpers.configs_hub import qdrant_config
+from src.logging.logger import logger
+
+
+class DocumentParseError(Exception):
+    """Документ не удалось разобрать в пределах лимитов."""
+
+
+def _page_key(key: str) -> int:
+    """Номер страницы из ключа словаря ``text_per_page`` (``Page_<n>``)."""
+
+    return int(key.split('_')[1])
+
+
+# Категории Unicode, которые не встречаются в нормальном текстовом слое: управляющие символы,
+# символы частной области (глифы без таблицы ToUnicode), суррогаты и неназначенные коды
+GARBAGE_CATEGORIES = {'Cc', 'Co', 'Cs', 'Cn'}
+
+
+def _garbage_ratio(text: str) -> float:
+    """Доля мусорных символов среди непробельных символов текста."""
+
+    chars = [char for char in text if not char.isspace()]
+
+    if not chars:
+        return 1.0
+
+    garbage = sum(1 for char in chars if char == '\ufffd' or unicodedata.category(char) in GARBAGE_CATEGORIES)
+
+    return garbage / len(chars)
+
+
+def _parse_pages_shard(path, page_numbers: List[int]) -> Tuple[Dict[str, list], List[Dict[str, Any]]]:
+    """Парсинг шарда страниц в дочернем процессе.
+
+    Args:
+        path: Путь к PDF-файлу.
+        page_numbers: Номера страниц (с нуля) шарда.
+
+    Returns:
+        Результаты разбора страниц в формате ``text_per_page`` и пропущенные страницы шарда.
+    """
+
+    parser = PDFParser(path)
+
+    try:
+        parser._parse_pages(page_numbers)
+    finally:
+        parser.close()
+
+    return parser.text_per_page, parser.skipped_pages
+
 
 class PDFParser:
     """Парсер для PDF-файлов."""
 
-    def __init__(self, path):
+    def __init__(self, path, progress: Optional[Callable[[str, int, int], None]] = None):
         self.path = path
-        # Объект файла PDF
+        # Обратный вызов прогресса: (этап, обработано страниц, всего страниц)
+        self.progress = progress
+        # Объект файла PDF - единственный дескриптор документа, общий для PyPDF2 и pdfplumber
         self.pdfFileObj = open(path, 'rb')
-        # Объект считывателя PDF
+        # Объект считывателя PDF: количество страниц и текстовый слой
         self.pdfReaded = PyPDF2.PdfReader(self.pdfFileObj)
-        # Объект pdfplumber для повторного использования
-        self.pdfplumber_obj = pdfplumber.open(path)
+        # Объект pdfplumber: разметка страницы (параметры анализа как у pdfminer по умолчанию)
+        # разбирается один раз и используется для текста, таблиц и изображений
+        self.pdfplumber_obj = pdfplumber.open(self.pdfFileObj, laparams={})
 
         # Cловарь для извлечения текста из каждого изображения
         self.text_per_page = {}
+        # Кэш таблиц разбираемых страниц: номер страницы -> {bbox: строки таблицы}
+        self.tables_per_page: Dict[int, Dict[Tuple[float, float, float, float], list]] = {}
+        # Страницы, разбор которых упал: {"page": номер страницы с нуля, "reason": причина}
+        self.skipped_pages: List[Dict[str, Any]] = []
+
+        # Параметры параллельного парсинга
+        self.parse_workers: int = qdrant_config.processing.pdf.parse_workers
+        self.parallel_min_pages: int = qdrant_config.processing.pdf.parallel_min_pages
+
+        # Многоуровневый режим: страницы с качественным текстовым слоем не проходят анализ разметки
+        self.parse_mode: str = qdrant_config.processing.pdf.parse_mode
+        self.text_layer_min_chars: int = qdrant_config.processing.pdf.text_layer.min_chars
+        self.text_layer_max_garbage: float = qdrant_config.processing.pdf.text_layer.max_garbage_ratio
 
-    def parse(self):
-        """Парсинг файла."""
+        # Параметры распознавания изображений
+        self.ocr_dpi: int = qdrant_config.processing.pdf.ocr_dpi
+        self.ocr_lang: str = qdrant_config.processing.pdf.ocr_lang
+        self.ocr_workers: int = qdrant_config.processing.pdf.ocr_workers
+        # Пул потоков tesseract, создаётся при первом распознавании
+        self.ocr_executor: Optional[ThreadPoolExecutor] = None
+
+    def parse(self, workers: Optional[int] = None):
+        """Парсинг файла.
+
+        Args:
+            workers: Количество процессов для постраничного парсинга. По умолчанию берётся из конфига,
+                значение 1 включает последовательный режим.
+
+        Returns:
+            str: Текст документа.
+        """
+
+        return ''.join(self.iter_pages(workers))
+
+    def iter_pages(self, workers: Optional[int] = None) -> Iterator[str]:
+        """Постраничный парсинг файла: текст каждой страницы отдаётся сразу после её разбора.
+
+        Разобранные страницы не накапливаются, поэтому память не растёт с размером документа.
+        Документы, в которых не меньше ``parallel_min_pages`` страниц, разбираются параллельно:
+        шарды страниц распределяются по пулу процессов, а страницы отдаются в исходном порядке.
+
+        Args:
+            workers: Количество процессов для постраничного парсинга. По умолчанию берётся из конфига,
+                значение 1 включает последовательный режим.
+
+        Returns:
+            Iterator[str]: Текст страниц в порядке следования.
+
+        Raises:
+            DocumentParseError: Если не разобрана ни одна страница документа.
+        """
+
+        if workers is None:
+            workers = self.parse_workers
 
         try:
-            for page_num, page in enumerate(extract_pages(self.path)):
-                print(f"\rОбработка: {page_num}", end="", flush=True)
-
-                # Инициализируем переменные, необходимые для извлечения текста со страницы
-                lower_side = None
-                upper_side = None
-                pageObj = self.pdfReaded.pages[page_num]
-                page_text = []
-                line_format = []
-                text_from_images = []
-                text_from_tables = []
-                page_content = []
-                # Инициализируем количество исследованных таблиц
-                table_num = 0
-                first_element = True
-                table_extraction_flag = False
-                page_tables = self.pdfplumber_obj.pages[page_num]
-                # Находим количество таблиц на странице
-                tables = page_tables.find_tables()
-
-                # Находим все элементы
-                page_elements = [(element.y1, element) for element in page._objs]
-                # Сортируем все элементы по порядку нахождения на странице
-                page_elements.sort(key=lambda a: a[0], reverse=True)
-
-                # Находим элементы, составляющие страницу
-                for i, component in enumerate(page_elements):
-                    # Извлекаем положение верхнего края элемента в PDF
-                    pos = component[0]
-                    # Извлекаем элемент структуры страницы
-                    element = component[1]
-
-                    # Проверяем, является ли элемент текстовым
-                    if isinstance(element, LTTextContainer):
-                        # Проверяем, находится ли текст в таблице
-                        if table_extraction_flag == False:
-                            # Используем функцию извлечения текста и формата для каждого текстового элемента
-                            line_text, format_per_line = self.text_extraction(element)
-                            # Добавляем текст каждой строки к тексту страницы
-                            page_text.append(line_text)
-                            # Добавляем формат каждой строки, содержащей текст
-                            line_format.append(format_per_line)
-                            page_content.append(line_text)
-                        else:
-                            # Пропускаем текст, находящийся в таблице
-                            pass
-
-                    # Проверяем элементы на наличие изображений
-                    if isinstance(element, LTFigure):
-                        try:
-                            # Вырезаем изображение из PDF
-                            cropped_pdf_path = self.crop_image(element, pageObj)
-                            # Преобразуем обрезанный pdf в изображение
-                            image_path = self.convert_to_images(cropped_pdf_path)
-                            # Извлекаем текст из изображения
-                            image_text = self.image_to_text(image_path)
-                            text_from_images.append(image_text)
-                            page_content.append(image_text)
-                            # Добавляем условное обозначение в списки текста и формата
-                            page_text.append('image')
-                            line_format.append('image')
-                        finally:
-                            # Удаляем временные файлы
-                            if 'cropped_pdf_path' in locals() and os.path.exists(cropped_pdf_path):
-                                os.remove(cropped_pdf_path)
-                            if 'image_path' in locals() and os.path.exists(image_path):
-                                os.remove(image_path)
-
-                    # Проверяем элементы на наличие таблиц
-                    if isinstance(element, LTRect):
-                        # Если первый прямоугольный элемент
-                        if first_element == True and (table_num + 1) <= len(tables):
-                            # Находим ограничивающий прямоугольник таблицы
-                            lower_side = page.bbox[3] - tables[table_num].bbox[3]
-                            upper_side = element.y1
-                            # Извлекаем информацию из таблицы
-                            table = self.extract_table(page_num, table_num)
-                            # Преобразуем информацию таблицы в формат структурированной строки
-                            table_string = self.table_converter(table)
-                            # Добавляем строку таблицы в список
-                            text_from_tables.append(table_string)
-                            page_content.append(table_string)
-                            # Устанавливаем флаг True, чтобы избежать повторения содержимого
-                            table_extraction_flag = True
-                            # Преобразуем в другой элемент
-                            first_element = False
-                            # Добавляем условное обозначение в списки текста и формата
-                            page_text.append('table')
-                            line_format.append('table')
-    
-                        # Проверяем, извлекли ли мы уже таблицы из этой страницы
-                        if lower_side and upper_side and element.y0 >= lower_side and element.y1 <= upper_side:
-                            pass
-                        elif i + 1 < len(page_elements) and not isinstance(page_elements[i + 1][1], LTRect):
-                            table_extraction_flag = False
-                            first_element = True
-                            table_num += 1
-    
-                    # Проверяем, извлекли ли мы уже таблицы из этой страницы
-                    if lower_side and upper_side and element.y0 >= lower_side and element.y1 <= upper_side:
-                        pass
-                    elif i + 1 < len(page_elements) and not isinstance(page_elements[i + 1][1], LTRect):
-                        table_extraction_flag = False
-                        first_element = True
-                        table_num += 1
-
-                # Создаём ключ для словаря
-                dctkey = 'Page_' + str(page_num)
-                # Добавляем список списков как значение ключа страницы
-                self.text_per_page[dctkey] = [page_text, line_format, text_from_images, text_from_tables, page_content]
-
-        except Exception as e:
-            print(f"Ошибка при обработке страницы {page_num}: {e}")
+            pages_count = len(self.pdfReaded.pages)
+            parsed_count = 0
+
+            if workers > 1 and pages_count >= self.parallel_min_pages:
+                pages = self._iter_parallel(pages_count, workers)
+            else:
+                pages = self._iter_parsed_pages()
+
+            for page_num, parsed_page in pages:
+                parsed_count += 1
+                self._report_progress(page_num + 1)
+
+                yield ''.join(parsed_page[4])
+
+            if pages_count and not parsed_count:
+                raise DocumentParseError(f"Ни одна страница файла {self.path} не разобрана: {self.skipped_pages}")
+
         finally:
             print()
-            self.pdfFileObj.close()
-            self.pdfplumber_obj.close()
+            self.close()
+
+    def close(self):
+        """Закрытие открытых файлов документа."""
+
+        # pdfplumber не владеет общим дескриптором файла, поэтому файл закрывается после него
+        self.pdfplumber_obj.close()
+        self.pdfFileObj.close()
+
+        if self.ocr_executor is not None:
+            self.ocr_executor.shutdown()
+            self.ocr_executor = None
+
+    def _report_progress(self, pages_done: int):
+        """Передача прогресса разбора страниц в обратный вызов ``progress``, если он задан."""
+
+        if self.progress is not None:
+            self.progress("pages", pages_done, len(self.pdfReaded.pages))
+
+    def _parse_pages(self, page_numbers: Optional[List[int]] = None):
+        """Последовательный парсинг страниц документа в ``text_per_page``.
+
+        Args:
+            page_numbers: Номера страниц (с нуля) для разбора. По умолчанию разбираются все страницы.
+        """
+
+        for page_num, parsed_page in self._iter_parsed_pages(page_numbers):
+            # Создаём ключ для словаря и добавляем список списков как значение ключа страницы
+            self.text_per_page['Page_' + str(page_num)] = parsed_page
+
+    def _iter_parsed_pages(self, page_numbers: Optional[List[int]] = None) -> Iterator[Tuple[int, list]]:
+        """Последовательный разбор страниц документа.
 
-        return ''.join([''.join(self.text_per_page[f'Page_{i}'][4]) for i in range(len(self.text_per_page))])
+        Страница, разбор которой упал, пропускается и записывается в ``skipped_pages``, как при
+        разборе под наблюдением ``SupervisedPDFParser``; остальные страницы разбираются дальше.
+
+        Args:
+            page_numbers: Номера страниц (с нуля) для разбора. По умолчанию разбираются все страницы.
+
+        Returns:
+            Iterator: Пары (номер страницы, результат ``_parse_page``).
+        """
+
+        if page_numbers is None:
+            page_numbers = range(len(self.pdfReaded.pages))
+
+        for page_num in page_numbers:
+            print(f"\rОбработка: {page_num}", end="", flush=True)
+
+            try:
+                parsed_page = self._parse_single_page(page_num)
+            except Exception as e:
+                logger.warning(f"Страница {page_num} файла {self.path} пропущена: {e}")
+                self.skipped_pages.append({"page": page_num, "reason": f"error: {e}"})
+                continue
+
+            yield page_num, parsed_page
+
+    def parse_page(self, page_num: int) -> str:
+        """Текст одной страницы документа.
+
+        Args:
+            page_num: Номер страницы (с нуля).
+
+        Returns:
+            str: Текст страницы.
+        """
+
+        return ''.join(self._parse_single_page(page_num)[4])
+
+    def _parse_single_page(self, page_num: int) -> list:
+        """Разбор страницы в режиме ``parse_mode``.
+
+        В многоуровневом режиме сначала дёшево извлекается текстовый слой страницы; если на странице
+        нет изображений, а текст достаточно длинный и почти не содержит мусорных символов, страница
+        на этом разобрана. Остальные страницы (сканы, страницы с рисунками и схемами, страницы без
+        таблицы ToUnicode, почти пустые страницы), как и
+        все страницы в режиме ``full``, проходят полный разбор: анализ разметки, поиск таблиц и
+        распознавание изображений.
+
+        Args:
+            page_num: Номер страницы (с нуля).
+
+        Returns:
+            list: Результат ``_parse_page``.
+        """
+
+        if self.parse_mode == "tiered":
+            text = self._text_layer(page_num)
+
+            if text is not None:
+                self._release_page(page_num)
+                return [[text], [], [], [], [text]]
+
+        return self._parse_layout_page(page_num)
+
+    def _text_layer(self, page_num: int) -> Optional[str]:
+        """Текстовый слой страницы без анализа разметки.
+
+        Returns:
+            Текст страницы или None, если текстового слоя нет или он непригоден, либо на странице
+            есть изображения (их текст виден только распознаванию) и страницу нужно разобрать полностью.
+        """
+
+        try:
+            page = self.pdfReaded.pages[page_num]
+
+            if self._has_images(page.get('/Resources')):
+                return None
+
+            text = page.extract_text() or ''
+        except Exception:
+            return None
+
+        if len(text.strip()) < self.text_layer_min_chars or _garbage_ratio(text) > self.text_layer_max_garbage:
+            return None
+
+        return text if text.endswith('\n') else text + '\n'
+
+    @classmethod
+    def _has_images(cls, resources, depth: int = 0) -> bool:
+        """Есть ли среди XObject ресурсов страницы изображения, в том числе внутри форм.
+
+        Args:
+            resources: Словарь ``/Resources`` страницы или формы.
+            depth: Глубина вложенности форм; слишком глубокие формы считаются содержащими изображения.
+        """
+
+        if resources is None:
+            return False
+
+        if depth > 5:
+            return True
+
+        xobjects = resources.get_object().get('/XObject')
+
+        if xobjects is None:
+            return False
+
+        for xobject in xobjects.get_object().values():
+            xobject = xobject.get_object()
+            subtype = xobject.get('/Subtype')
+
+            if subtype == '/Image':
+                return True
+
+            if subtype == '/Form' and cls._has_images(xobject.get('/Resources'), depth + 1):
+                return True
+
+        return False
+
+    def _parse_layout_page(self, page_num: int) -> list:
+        """Полный разбор страницы по её разметке.
+
+        Разметка страницы строится один раз: из неё же ``page_tables`` ищет таблицы, а после разбора
+        все кэши страницы освобождаются.
+        """
+
+        try:
+            return self._parse_page(page_num, self.pdfplumber_obj.pages[page_num].layout)
+        finally:
+            self._release_page(page_num)
+
+    def _release_page(self, page_num: int):
+        """Освобождение кэшей разобранной страницы, чтобы память не росла с количеством страниц.
+
+        Сбрасываются таблицы и разметка страницы, а также кэши разобранных объектов PDF
+        (в основном распакованные потоки содержимого страниц): они снова читаются из файла
+        при обращении, а шрифты, общие для страниц, остаются в кэше менеджера ресурсов.
+        """
+
+        # Таблицы разобранной страницы больше не нужны
+        self.tables_per_page.pop(page_num, None)
+        self.pdfplumber_obj.pages[page_num].close()
+
+        # Приватные кэши библиотек (проверено на pdfminer.six 20260107, pdfplumber 0.11.10, PyPDF2 3.0.1):
+        # PDFDocument._cached_objs и PdfReader.resolved_objects. Если в другой версии их нет,
+        # сбрасывать нечего и разбор работает как раньше, только без освобождения памяти
+        cached_objs = getattr(self.pdfplumber_obj.doc, '_cached_objs', None)
+
+        if isinstance(cached_objs, dict):
+            cached_objs.clear()
+
+        resolved_objects = getattr(self.pdfReaded, 'resolved_objects', None)
+
+        if isinstance(resolved_objects, dict):
+            resolved_objects.clear()
+
+    def _iter_parallel(self, pages_count: int, workers: int) -> Iterator[Tuple[int, list]]:
+        """Параллельный разбор страниц документа в пуле процессов.
+
+        Страницы делятся на непрерывные шарды (по несколько на процесс для балансировки), каждый шард
+        разбирается отдельным экземпляром парсера в дочернем процессе. В работе одновременно не больше
+        ``2 * workers`` шардов, чтобы готовые, но ещё не отданные страницы не копились в памяти.
+
+        Args:
+            pages_count: Количество страниц в документе.
+            workers: Количество процессов.
+
+        Returns:
+            Iterator: Пары (номер страницы, результат ``_parse_page``) в порядке страниц.
+        """
+
+        shard_size = max(1, math.ceil(pages_count / (workers * 4)))
+        shards = [list(range(i, min(i + shard_size, pages_count))) for i in range(0, pages_count, shard_size)]
+        in_flight = deque()
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            for shard in shards:
+                in_flight.append(executor.submit(_parse_pages_shard, self.path, shard))
+
+                if len(in_flight) >= 2 * workers:
+                    yield from self._shard_pages(*in_flight.popleft().result())
+
+            while in_flight:
+                yield from self._shard_pages(*in_flight.popleft().result())
+
+    def _shard_pages(
+            self,
+            shard_pages: Dict[str, list],
+            skipped_pages: List[Dict[str, Any]],
+    ) -> Iterator[Tuple[int, list]]:
+        """Страницы шарда в исходном порядке; пропущенные страницы шарда добавляются в ``skipped_pages``."""
+
+        self.skipped_pages.extend(skipped_pages)
+
+        for key in sorted(shard_pages, key=_page_key):
+            yield _page_key(key), shard_pages[key]
+
+    def _parse_page(self, page_num: int, page: LTPage) -> list:
+        """Парсинг одной страницы документа.
+
+        Args:
+            page_num: Номер страницы (с нуля).
+            page: Разметка страницы pdfminer.
+
+        Returns:
+            list: [текст строк, форматы строк, текст изображений, текст таблиц, содержимое страницы].
+        """
+
+        # Инициализируем переменные, необходимые для извлечения текста со страницы
+        page_text = []
+        line_format = []
+        text_from_images = []
+        text_from_tables = []
+        page_content = []
+        # Таблицы страницы (извлекаются один раз и кэшируются) и уже добавленные таблицы
+        tables = self.page_tables(page_num)
+        extracted_tables = set()
+        # Изображения страницы и позиции их текста в содержимом страницы
+        figures = []
+
+        # Находим все элементы
+        page_elements = [(element.y1, element) for element in page._objs]
+        # Сортируем все элементы по порядку нахождения на странице
+        page_elements.sort(key=lambda a: a[0], reverse=True)
+
+        # Находим элементы, составляющие страницу
+        for _, element in page_elements:
+            # Проверяем, находится ли элемент в таблице
+            table_bbox = self._find_table_bbox(element, tables, page.bbox[3])
+
+            if table_bbox is not None:
+                # Таблица добавляется один раз, остальные её элементы пропускаются
+                if table_bbox not in extracted_tables:
+                    # Преобразуем информацию таблицы в формат структурированной строки
+                    table_string = self.table_converter(tables[table_bbox])
+                    # Добавляем строку таблицы в список
+                    text_from_tables.append(table_string)
+                    page_content.append(table_string)
+                    # Добавляем условное обозначение в списки текста и формата
+                    page_text.append('table')
+                    line_format.append('table')
+                    extracted_tables.add(table_bbox)
+
+                continue
+
+            # Проверяем, является ли элемент текстовым
+            if isinstance(element, LTTextContainer):
+                # Используем функцию извлечения текста и формата для каждого текстового элемента
+                line_text, format_per_line = self.text_extraction(element)
+                # Добавляем текст каждой строки к тексту страницы
+                page_text.append(line_text)
+                # Добавляем формат каждой строки, содержащей текст
+                line_format.append(format_per_line)
+                page_content.append(line_text)
+
+            # Проверяем элементы на наличие изображений
+            if isinstance(element, LTFigure):
+                # Текст изображений распознаётся после обхода страницы, здесь резервируем место
+                figures.append((len(page_content), element))
+                page_content.append('')
+                # Добавляем условное обозначение в списки текста и формата
+                page_text.append('image')
+                line_format.append('image')
+
+        if figures:
+            # Распознаём все изображения страницы за один рендер страницы
+            images_text = self.figures_to_text(page_num, [element for _, element in figures], page.bbox)
+
+            for (position, _), image_text in zip(figures, images_text):
+                text_from_images.append(image_text)
+                page_content[position] = image_text
+
+        return [page_text, line_format, text_from_images, text_from_tables, page_content]
+
+    @staticmethod
+    def _find_table_bbox(element, tables: Dict[Tuple[float, float, float, float], list], page_height: float):
+        """Поиск таблицы, в которую попадает элемент страницы.
+
+        Элемент относится к таблице, если его центр лежит внутри ограничивающего прямоугольника таблицы.
+        Координаты pdfplumber отсчитываются от верха страницы, pdfminer - от низа.
+
+        Args:
+            element: Элемент разметки pdfminer.
+            tables: Таблицы страницы из ``page_tables``.
+            page_height: Высота страницы.
+
+        Returns:
+            Ограничивающий прямоугольник таблицы или None, если элемент вне таблиц.
+        """
+
+        center_x = (element.x0 + element.x1) / 2
+        center_y = page_height - (element.y0 + element.y1) / 2
+
+        for bbox in tables:
+            x0, top, x1, bottom = bbox
+
+            if x0 <= center_x <= x1 and top <= center_y <= bottom:
+                return bbox
+
+        return None
 
     def text_extraction(self, _element):
         """Извлечение текста из вложенного текстового элемента."""
@@ -174,57 +515,82 @@ class PDFParser:
         # Возвращаем кортеж с текстом в каждой строке вместе с его форматом
         return line_text, format_per_line
 
-    def crop_image(self, _element, page_obj):
-        """Вырезка изображения из PDF."""
+    def figures_to_text(self, page_num: int, figures: List[LTFigure], page_bbox) -> List[str]:
+        """Распознавание текста изображений страницы.
 
-        # Получаем координаты для вырезания изображения из PDF
-        [image_left, image_top, image_right, image_bottom] = [_element.x0, _element.y0, _element.x1, _element.y1]
+        Страница рендерится в память один раз с разрешением ``ocr_dpi``, изображения вырезаются из
+        отрендеренной страницы по координатам, а распознавание выполняется пулом потоков tesseract.
 
-        # Обрезаем страницу по координатам (left, bottom, right, top)
-        page_obj.mediabox.lower_left = (image_left, image_bottom)
-        page_obj.mediabox.upper_right = (image_right, image_top)
+        Args:
+            page_num: Номер страницы (с нуля).
+            figures: Изображения страницы.
+            page_bbox: Ограничивающий прямоугольник страницы pdfminer (x0, y0, x1, y1).
 
-        # Сохраняем обрезанную страницу в новый PDF
-        cropped_pdf_writer = PyPDF2.PdfWriter()
-        cropped_pdf_writer.add_page(page_obj)
+        Returns:
+            List[str]: Текст каждого изображения в порядке ``figures``.
+        """
 
-        # Создаем временный файл для обрезанного PDF
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as cropped_pdf_file:
-            cropped_pdf_writer.write(cropped_pdf_file)
+        page_image = convert_from_path(
+            self.path,
+            dpi=self.ocr_dpi,
+            first_page=page_num + 1,
+            last_page=page_num + 1,
+        )[0]
 
-            return cropped_pdf_file.name
+        # Масштаб из координат PDF в пиксели; ось Y в PDF направлена вверх
+        page_x0, page_y0, page_x1, page_y1 = page_bbox
+        scale_x = page_image.width / (page_x1 - page_x0)
+        scale_y = page_image.height / (page_y1 - page_y0)
 
-    def convert_to_images(self, input_file):
-        """Конвертация изображения."""
+        crops = []
 
-        images = convert_from_path(input_file)
-        image = images[0]
+        for figure in figures:
+            box = (
+                max(0, int((figure.x0 - page_x0) * scale_x)),
+                max(0, int((page_y1 - figure.y1) * scale_y)),
+                min(page_image.width, int((figure.x1 - page_x0) * scale_x)),
+                min(page_image.height, int((page_y1 - figure.y0) * scale_y)),
+            )
+            crops.append(page_image.crop(box) if box[2] > box[0] and box[3] > box[1] else None)
 
-        # Создаем временный файл для изображения
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as output_file:
-            image.save(output_file, "PNG")
+        if self.ocr_executor is None:
+            self.ocr_executor = ThreadPoolExecutor(max_workers=self.ocr_workers)
 
-            return output_file.name
+        return list(self.ocr_executor.map(lambda crop: self.image_to_text(crop) if crop else '', crops))
 
-    def image_to_text(self, image_path):
-        """Приведение изображение к тексту."""
+    def image_to_text(self, image: Image.Image) -> str:
+        """Приведение изображения к тексту."""
 
-        # Считываем изображение
-        img = Image.open(image_path)
         # Извлекаем текст из изображения
-        text = pytesseract.image_to_string(img, lang='rus')
+        text = pytesseract.image_to_string(image, lang=self.ocr_lang)
 
         return text
 
-    def extract_table(self, page_num, table_num):
-        """Извлечение таблиц."""
+    def page_tables(self, page_num: int) -> Dict[Tuple[float, float, float, float], list]:
+        """Таблицы страницы, извлечённые за один проход поиска таблиц.
 
-        # Используем уже открытый объект pdfplumber
-        table_page = self.pdfplumber_obj.pages[page_num]
-        # Извлекаем соответствующую таблицу
-        table = table_page.extract_tables()[table_num]
+        Результат кэшируется, поэтому повторные обращения к таблицам той же страницы не запускают
+        поиск таблиц pdfplumber заново.
+
+        Args:
+            page_num: Номер страницы (с нуля).
+
+        Returns:
+            Dict: Строки таблиц по их ограничивающему прямоугольнику (x0, top, x1, bottom) в порядке
+            нахождения на странице.
+        """
+
+        if page_num not in self.tables_per_page:
+            # Поиск таблиц использует уже построенную разметку страницы
+            table_page = self.pdfplumber_obj.pages[page_num]
+            self.tables_per_page[page_num] = {table.bbox: table.extract() for table in table_page.find_tables()}
+
+        return self.tables_per_page[page_num]
+
+    def extract_table(self, page_num, table_num):
+        """Извлечение таблицы по её порядковому номеру на странице."""
 
-        return table
+        return list(self.page_tables(page_num).values())[table_num]
 
     def table_converter(self, table):
         """Конвертация таблиц."""
@@ -0,0 +1,64 @@
+import re
+import zlib
+
+from collections import Counter
+from typing import List
+
+from qdrant_client.models import SparseVector
+
+from src.helpers.configs_hub import qdrant_config
+
+
+# Слова, а также номера и коды с внутренними точками, дефисами и слешами (12.3, 77-01/2024)
+TOKEN_PATTERN = re.compile(r"\w+(?:[./\-]\w+)*")
+
+
+class SparseEncoder:
+    """Локальный BM25-кодировщик текста в разреженный вектор qdrant.
+
+    Индекс токена - crc32 его нормализованной формы, вес - насыщенная BM25-частота токена
+    в тексте. IDF по коллекции считает сам qdrant (модификатор IDF разреженного вектора),
+    поэтому кодировщику не нужна статистика корпуса.
+    """
+
+    def __init__(
+            self,
+            k1: float = qdrant_config.hybrid.k1,
+            b: float = qdrant_config.hybrid.b,
+            avg_length: float = qdrant_config.hybrid.avg_length,
+    ):
+        self.k1 = k1
+        self.b = b
+        self.avg_length = avg_length
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Разбиение текста на нормализованные токены."""
+
+        return [token.replace("ё", "е") for token in TOKEN_PATTERN.findall(text.lower())]
+
+    @staticmethod
+    def _index(token: str) -> int:
+        return zlib.crc32(token.encode('utf-8'))
+
+    def encode(self, text: str) -> SparseVector:
+        """Разреженный вектор чанка для индексации."""
+
+        tokens = self.tokenize(text)
+        counts = Counter(self._index(token) for token in tokens)
+        norm = self.k1 * (1 - self.b + self.b * len(tokens) / self.avg_length)
+
+        return SparseVector(
+            indices=list(counts),
+            values=[count * (self.k1 + 1) / (count + norm) for count in counts.values()],
+        )
+
+    def encode_query(self, query: str) -> SparseVector:
+        """Разреженный вектор запроса: каждый уникальный токен с весом 1."""
+
+        indices = list(dict.fromkeys(self._index(token) for token in self.tokenize(query)))
+
+        return SparseVector(indices=indices, values=[1.0] * len(indices))
+
+
+sparse_encoder = SparseEncoder()
@@ -0,0 +1,213 @@
+import multiprocessing
+import os
+import queue
+import signal
+import time
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.helpers.configs_hub import qdrant_config
+from src.processors.parsers import DocumentParseError, PDFParser
+
+
+def _supervised_parse(path, first_page: int, messages: "multiprocessing.Queue"):
+    """Разбор страниц документа в дочернем процессе под наблюдением ``SupervisedPDFParser``.
+
+    Процесс становится лидером своей группы, чтобы вместе с ним можно было остановить и запущенные
+    им tesseract и poppler. Перед разбором страницы отправляется сообщение о её начале, после -
+    текст страницы или ошибка.
+
+    Args:
+        path: Путь к PDF-файлу.
+        first_page: Номер страницы (с нуля), с которой начинается разбор.
+        messages: Очередь сообщений родительскому процессу.
+    """
+
+    if hasattr(os, "setsid"):
+        os.setsid()
+
+    parser = PDFParser(path)
+
+    try:
+        pages_count = len(parser.pdfReaded.pages)
+        messages.put(("pages", pages_count))
+
+        for page_num in range(first_page, pages_count):
+            messages.put(("start", page_num, time.time()))
+
+            try:
+                text = parser.parse_page(page_num)
+            except Exception as e:
+                messages.put(("error", page_num, str(e)))
+                continue
+
+            messages.put(("page", page_num, text))
+
+        messages.put(("done",))
+
+    finally:
+        parser.close()
+
+
+class SupervisedPDFParser:
+    """Разбор PDF в дочернем процессе с лимитами времени и памяти.
+
+    Страница, разбор которой дольше ``page_timeout`` секунд, упал или вывел дочерний процесс за
+    ``memory_mb`` мегабайт, пропускается: процесс останавливается, а разбор продолжается в новом
+    процессе со следующей страницы. Пропущенные страницы с причинами собираются в ``skipped_pages``.
+    Если разбор всего документа дольше ``document_timeout`` секунд (без учёта времени, пока текст
+    страниц обрабатывает вызывающий код), документ не открывается или не разобрана ни одна страница,
+    выбрасывается ``DocumentParseError``.
+    """
+
+    def __init__(
+            self,
+            path,
+            progress: Optional[Callable[[str, int, int], None]] = None,
+            page_timeout: float = qdrant_config.processing.pdf.supervisor.page_timeout,
+            document_timeout: float = qdrant_config.processing.pdf.supervisor.document_timeout,
+            memory_mb: int = qdrant_config.processing.pdf.supervisor.memory_mb,
+            poll_interval: float = qdrant_config.processing.pdf.supervisor.poll_interval,
+    ):
+        self.path = path
+        # Обратный вызов прогресса: (этап, обработано страниц, всего страниц)
+        self.progress = progress
+        self.page_timeout = page_timeout
+        self.document_timeout = document_timeout
+        self.memory_mb = memory_mb
+        self.poll_interval = poll_interval
+
+        # Пропущенные страницы: {"page": номер страницы с нуля, "reason": причина}
+        self.skipped_pages: List[Dict[str, Any]] = []
+
+    def iter_pages(self) -> Iterator[str]:
+        """Текст страниц в порядке следования; пропущенные страницы не отдаются.
+
+        Raises:
+            DocumentParseError: Если документ не удалось разобрать в пределах лимитов.
+        """
+
+        context = multiprocessing.get_context("spawn")
+        started_at = time.monotonic()
+        pages_count = None
+        parsed_count = 0
+        next_page = 0
+
+        while pages_count is None or next_page < pages_count:
+            messages = context.Queue()
+            process = context.Process(
+                target=_supervised_parse,
+                args=(self.path, next_page, messages),
+                name="pdf-parser",
+                daemon=True,
+            )
+            process.start()
+            # Разбираемая страница и время начала её разбора в дочернем процессе
+            current: Optional[Tuple[int, float]] = None
+            # Лимит засчитывается, если превышен при двух проверках подряд: сообщения процесса,
+            # отправленные прямо перед превышением, успевают дойти до очереди
+            strikes = 0
+
+            try:
+                while True:
+                    if time.monotonic() - started_at > self.document_timeout:
+                        raise DocumentParseError(
+                            f"Разбор файла {self.path} дольше {self.document_timeout} с, "
+                            f"разобрано страниц: {parsed_count}.",
+                        )
+
+                    message = None
+                    failure = None
+
+                    try:
+                        message = messages.get(timeout=self.poll_interval)
+                        strikes = 0
+                    except queue.Empty:
+                        # Лимиты проверяются, только когда процесс ничего не прислал:
+                        # иначе в очереди могут ждать уже разобранные страницы
+                        if not process.is_alive():
+                            failure = "crash"
+                        elif current is not None and time.time() - current[1] > self.page_timeout:
+                            failure = "timeout"
+                        elif self._memory_mb(process.pid) > self.memory_mb:
+                            failure = "memory"
+
+                        if failure in ("timeout", "memory"):
+                            strikes += 1
+
+                            if strikes < 2:
+                                failure = None
+
+                    if failure is not None:
+                        if pages_count is None:
+                            raise DocumentParseError(f"Не удалось открыть файл {self.path}: {failure}.")
+
+                        # Процесс мог остановиться и между страницами: тогда пропускается следующая
+                        failed_page = current[0] if current is not None else next_page
+                        self.skipped_pages.append({"page": failed_page, "reason": failure})
+                        next_page = failed_page + 1
+                        break
+
+                    if message is None:
+                        continue
+
+                    if message[0] == "pages":
+                        pages_count = message[1]
+
+                    elif message[0] == "start":
+                        current = (message[1], message[2])
+
+                    elif message[0] == "error":
+                        self.skipped_pages.append({"page": message[1], "reason": f"error: {message[2]}"})
+                        next_page = message[1] + 1
+                        current = None
+
+                    elif message[0] == "page":
+                        next_page = message[1] + 1
+                        parsed_count += 1
+                        current = None
+                        self._report_progress(next_page, pages_count)
+
+                        # Время обработки текста вызывающим кодом не входит в лимит документа
+                        paused_at = time.monotonic()
+                        yield message[2]
+                        started_at += time.monotonic() - paused_at
+
+                    elif message[0] == "done":
+                        next_page = pages_count
+                        break
+
+            finally:
+                self._stop(process, messages)
+
+        if pages_count and not parsed_count:
+            raise DocumentParseError(f"Ни одна страница файла {self.path} не разобрана: {self.skipped_pages}")
+
+    def _report_progress(self, pages_done: int, pages_count: int):
+        """Передача прогресса разбора страниц в обратный вызов ``progress``, если он задан."""
+
+        if self.progress is not None:
+            self.progress("pages", pages_done, pages_count)
+
+    @staticmethod
+    def _memory_mb(pid: int) -> float:
+        """Резидентная память процесса в мегабайтах; 0, если её нельзя узнать (не Linux)."""
+
+        try:
+            with open(f"/proc/{pid}/statm") as statm:
+                return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+        except (OSError, ValueError, IndexError):
+            return 0
+
+    @staticmethod
+    def _stop(process: multiprocessing.Process, messages: "multiprocessing.Queue"):
+        """Остановка дочернего процесса вместе с его группой (tesseract, poppler)."""
+
+        if process.is_alive():
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (AttributeError, OSError):
+                process.kill()
+
+        process.join()
+        messages.close()
@@ -1,7 +1,16 @@
+import time
+
 from pathlib import Path
+from typing import Callable, Optional
 
+from src.dataclasses.indexing import IndexResult
+from src.helpers.files_management import get_file_hash
 from src.logging.logger import logger
-from src.processors.document import DocumentProcessor
+from src.managers.execution import execution_manager
+from src.managers.qdrant import qdrant_manager
+from src.managers.quarantine import quarantine_manager
+from src.processors.document import DocumentProcessor, EmbeddingError
+from src.processors.supervisor import DocumentParseError
 
 
 class IndexerService:
@@ -10,19 +19,265 @@ class IndexerService:
     def __init__(self):
         self.document_processor: DocumentProcessor = DocumentProcessor()
 
-    async def index(self, path: Path, document_uuid: str = None):
-        """Индексация файла."""
+    async def index(
+            self,
+            path: Path,
+            document_uuid: str = None,
+            file_name: Optional[str] = None,
+            content_hash: Optional[str] = None,
+    ) -> IndexResult:
+        """Индексация файла в пуле исполнения ``ingest``, не блокируя цикл событий.
+
+        Args:
+            path: Путь к файлу.
+            document_uuid: UUID, присваиваемый документу при индексации.
+            file_name: Исходное имя файла для каталога документов. По умолчанию - имя файла ``path``.
+            content_hash: Хеш содержимого, посчитанный при сохранении файла. По умолчанию считается заново.
+
+        Returns:
+            IndexResult: UUID документа, ID его точек и статистика обработки.
+
+        Raises:
+            ExecutorSaturatedError: Если пул индексации перегружен.
+        """
+
+        return await execution_manager.run(
+            "ingest", self.index_sync, path, document_uuid, file_name=file_name, content_hash=content_hash,
+        )
+
+    def index_sync(
+            self,
+            path: Path,
+            document_uuid: str = None,
+            progress: Optional[Callable[[str, int, int], None]] = None,
+            upsert_wait: Optional[bool] = None,
+            file_name: Optional[str] = None,
+            content_hash: Optional[str] = None,
+    ) -> IndexResult:
+        """Индексация файла.
+
+        Файл, содержимое которого уже есть в коллекции, повторно не разбирается и не кодируется:
+        возвращаются UUID и точки ранее проиндексированного документа.
+
+        Args:
+            path: Путь к файлу.
+            document_uuid: UUID, присваиваемый документу при индексации.
+            progress: Обратный вызов прогресса (этап "pages" или "chunks", обработано, всего).
+            upsert_wait: Ждать ли индексации каждого батча в Qdrant. По умолчанию берётся из конфига.
+            file_name: Исходное имя файла для каталога документов. По умолчанию - имя файла ``path``.
+            content_hash: Хеш содержимого, посчитанный при сохранении файла. По умолчанию считается заново.
+
+        Returns:
+            IndexResult: UUID документа, ID его точек и статистика обработки.
+        """
 
         try:
             suffix = path.suffix.lower()
 
-            if suffix in self.document_processor.document_formats:
-                return self.document_processor.process_file(suffix, path, document_uuid)
-
-            else:
+            if suffix not in self.document_processor.document_formats:
                 logger.error("Неизвестный формат документа.")
-                return []
+                return IndexResult(document_uuid=document_uuid, point_ids=[])
+
+            content_hash = content_hash or get_file_hash(path)
+            indexed_document = qdrant_manager.find_document_by_hash(content_hash)
+
+            if indexed_document is not None:
+                indexed_uuid, point_ids = indexed_document
+                logger.info(f"Файл {path} уже проиндексирован как документ {indexed_uuid}, пропускаем.")
+
+                return IndexResult(
+                    document_uuid=indexed_uuid,
+                    point_ids=point_ids,
+                    content_hash=content_hash,
+                    skipped=True,
+                )
+
+            if quarantine_manager.is_quarantined(content_hash):
+                return self._quarantined(path, document_uuid, content_hash, file_name)
+
+            try:
+                point_ids = self.document_processor.process_file(
+                    suffix, path, document_uuid, content_hash, progress, upsert_wait,
+                )
+            except Exception as e:
+                # Точки, записанные до ошибки, удаляются вместе с недоиндексированным документом
+                if document_uuid:
+                    qdrant_manager.delete_document(document_uuid)
+
+                return self._index_failed(path, document_uuid, content_hash, file_name, e)
+
+            quarantine_manager.record_success(content_hash)
+            self._register_document(path, document_uuid, point_ids, content_hash, file_name)
+
+            return IndexResult(
+                document_uuid=document_uuid,
+                point_ids=point_ids,
+                content_hash=content_hash,
+                performance=self.document_processor.performance,
+            )
 
         except Exception as e:
             logger.error(f"Ошибка при индексации файла {path}: {e}")
-            return []
+            return IndexResult(document_uuid=document_uuid, point_ids=[], error=str(e))
+
+    async def update(
+            self,
+            path: Path,
+            document_uuid: str,
+            file_name: Optional[str] = None,
+            content_hash: Optional[str] = None,
+    ) -> IndexResult:
+        """Обновление документа в пуле исполнения ``ingest``, не блокируя цикл событий.
+
+        Raises:
+            ExecutorSaturatedError: Если пул индексации перегружен.
+        """
+
+        return await execution_manager.run(
+            "ingest", self.update_sync, path, document_uuid, file_name=file_name, content_hash=content_hash,
+        )
+
+    def update_sync(
+            self,
+            path: Path,
+            document_uuid: str,
+            progress: Optional[Callable[[str, int, int], None]] = None,
+            upsert_wait: Optional[bool] = None,
+            file_name: Optional[str] = None,
+            content_hash: Optional[str] = None,
+    ) -> IndexResult:
+        """Инкрементальное обновление проиндексированного документа новой версией файла.
+
+        Кодируются и записываются только новые и изменённые чанки, удаляются только чанки,
+        которых нет в новой версии. Документ без точек индексируется целиком.
+
+        Args:
+            path: Путь к новой версии файла.
+            document_uuid: UUID обновляемого документа.
+            progress: Обратный вызов прогресса (этап "pages" или "chunks", обработано, всего).
+            upsert_wait: Ждать ли индексации каждого батча в Qdrant. По умолчанию берётся из конфига.
+            file_name: Исходное имя файла для каталога документов. По умолчанию - имя файла ``path``.
+            content_hash: Хеш содержимого, посчитанный при сохранении файла. По умолчанию считается заново.
+
+        Returns:
+            IndexResult: UUID документа, ID его точек и статистика обработки.
+        """
+
+        try:
+            suffix = path.suffix.lower()
+
+            if suffix not in self.document_processor.document_formats:
+                logger.error("Неизвестный формат документа.")
+                return IndexResult(document_uuid=document_uuid, point_ids=[])
+
+            content_hash = content_hash or get_file_hash(path)
+            indexed_document = qdrant_manager.find_document_by_hash(content_hash, document_uuid=document_uuid)
+
+            if indexed_document is not None:
+                logger.info(f"Документ {document_uuid} не изменился, пропускаем.")
+
+                return IndexResult(
+                    document_uuid=document_uuid,
+                    point_ids=indexed_document[1],
+                    content_hash=content_hash,
+                    skipped=True,
+                )
+
+            if quarantine_manager.is_quarantined(content_hash):
+                return self._quarantined(path, document_uuid, content_hash, file_name)
+
+            existing_chunks = qdrant_manager.get_document_chunks(document_uuid)
+            existing_ids = {point_id for chunk_points in existing_chunks.values() for point_id, _ in chunk_points}
+
+            try:
+                point_ids = self.document_processor.process_file(
+                    suffix, path, document_uuid, content_hash, progress, upsert_wait, existing_chunks,
+                )
+            except Exception as e:
+                # Удаляем точки новой версии, записанные до ошибки: документ остаётся в прежней версии
+                qdrant_manager.delete_points([
+                    point_id for point_id in self.document_processor.written_point_ids if point_id not in existing_ids
+                ])
+
+                return self._index_failed(path, document_uuid, content_hash, file_name, e)
+
+            quarantine_manager.record_success(content_hash)
+            self._register_document(path, document_uuid, point_ids, content_hash, file_name)
+
+            return IndexResult(
+                document_uuid=document_uuid,
+                point_ids=point_ids,
+                content_hash=content_hash,
+                performance=self.document_processor.performance,
+            )
+
+        except Exception as e:
+            logger.error(f"Ошибка при обновлении документа {document_uuid} из файла {path}: {e}")
+            return IndexResult(document_uuid=document_uuid, point_ids=[], error=str(e))
+
+    @staticmethod
+    def _quarantined(
+            path: Path,
+            document_uuid: Optional[str],
+            content_hash: str,
+            file_name: Optional[str],
+    ) -> IndexResult:
+        """Результат для файла в карантине: такой файл не разбирается."""
+
+        error = f"Файл {file_name or path.name} в карантине: его разбор уже несколько раз не удался."
+        logger.warning(error)
+
+        return IndexResult(document_uuid=document_uuid, point_ids=[], content_hash=content_hash, error=error)
+
+    @staticmethod
+    def _index_failed(
+            path: Path,
+            document_uuid: Optional[str],
+            content_hash: str,
+            file_name: Optional[str],
+            error: Exception,
+    ) -> IndexResult:
+        """Результат неудачной обработки файла.
+
+        Неудачи разбора и кодирования чанков учитываются в карантине: после ``max_failures`` неудач
+        файл больше не обрабатывается. Остальные ошибки (запись в Qdrant) не зависят от файла и в
+        карантине не учитываются.
+        """
+
+        logger.error(f"Ошибка при обработке файла {path}: {error}")
+
+        if isinstance(error, (DocumentParseError, EmbeddingError)):
+            quarantine_manager.record_failure(content_hash, file_name or path.name, str(error))
+
+        return IndexResult(document_uuid=document_uuid, point_ids=[], content_hash=content_hash, error=str(error))
+
+    def _register_document(
+            self,
+            path: Path,
+            document_uuid: Optional[str],
+            point_ids: list,
+            content_hash: str,
+            file_name: Optional[str] = None,
+    ):
+        """Запись проиндексированного документа в каталог документов.
+
+        Ошибка каталога не отменяет индексацию: она только логируется.
+        """
+
+        if not document_uuid or not point_ids:
+            return
+
+        try:
+            qdrant_manager.upsert_catalog_record(
+                document_uuid,
+                {
+                    "document": file_name or path.name,
+                    "file_format": path.suffix.lower(),
+                    "file_size": path.stat().st_size,
+                    "content_hash": content_hash,
+                    "chunks": len(point_ids),
+                    "indexed_at": time.time(),
+                },
+            )
+        except Exception as e:
+            logger.error(f"Ошибка при записи документа {document_uuid} в каталог: {e}")
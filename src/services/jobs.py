@@ -0,0 +1,397 @@
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.helpers.configs_hub import fastapi_config
+from src.logging.logger import logger
+from src.managers.qdrant import qdrant_manager
+from src.services.indexer import IndexerService
+
+
+class JobStatus:
+    """Статусы заданий и файлов заданий."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class JobService:
+    """Фоновая обработка загруженных документов.
+
+    Задания и прогресс их файлов хранятся в SQLite, файлы заданий - на локальном диске, поэтому
+    после перезапуска приложения незавершённые задания продолжают обрабатываться.
+
+    Очередью служит сама таблица файлов заданий: воркеры опрашивают её и захватывают файл одним
+    условным UPDATE, поэтому один файл не достаётся двум воркерам, даже если базу разделяют
+    несколько процессов приложения. Захваченный файл помечается владельцем (процессом) и арендой,
+    которую владелец продлевает, пока обрабатывает файл. Файл с истёкшей арендой (владелец упал
+    или был остановлен) захватывается заново, а точки, записанные прежним владельцем, удаляются.
+    """
+
+    def __init__(
+            self,
+            db_path: str = fastapi_config.jobs.db_path,
+            files_dir: str = fastapi_config.jobs.files_dir,
+            workers: int = fastapi_config.jobs.workers,
+            upsert_wait: bool = fastapi_config.jobs.upsert_wait,
+            poll_interval: float = fastapi_config.jobs.poll_interval,
+            lease_timeout: float = fastapi_config.jobs.lease_timeout,
+    ):
+        self.db_path = Path(db_path)
+        self.files_dir = Path(files_dir)
+        self.workers_count = workers
+        self.upsert_wait = upsert_wait
+        self.poll_interval = poll_interval
+        self.lease_timeout = lease_timeout
+
+        # Владелец захваченных файлов: свой для каждого запуска, чтобы перезапущенный процесс
+        # не продолжал чужую (прерванную) обработку как свою
+        self.owner: Optional[str] = None
+        self.stop_event = threading.Event()
+        self.workers: List[threading.Thread] = []
+        self.lock = threading.Lock()
+        self.connection: Optional[sqlite3.Connection] = None
+
+    def start(self):
+        """Запуск воркеров и продления аренды захваченных ими файлов.
+
+        Прерванные задания возобновляются без отдельного шага: их файлы с истёкшей арендой
+        захватываются воркерами при опросе.
+        """
+
+        if self.workers:
+            return
+
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # Своё событие на каждый запуск: воркеры прошлого запуска, ещё доделывающие файл, не возобновляются
+        self.stop_event = threading.Event()
+
+        for i in range(self.workers_count):
+            worker = threading.Thread(
+                target=self._work,
+                args=(self.owner, self.stop_event),
+                name=f"jobs-worker-{i}",
+                daemon=True,
+            )
+            worker.start()
+            self.workers.append(worker)
+
+        threading.Thread(
+            target=self._heartbeat,
+            args=(self.owner, list(self.workers)),
+            name="jobs-heartbeat",
+            daemon=True,
+        ).start()
+
+    def stop(self):
+        """Сигнал воркерам не захватывать новые файлы; завершения текущих файлов не ждём.
+
+        Файлы, обработка которых не завершилась до остановки процесса, остаются захваченными
+        и после истечения аренды (``lease_timeout``) обрабатываются заново.
+        """
+
+        self.stop_event.set()
+        self.workers = []
+
+    def job_dir(self, job_id: str) -> Path:
+        """Директория файлов задания."""
+
+        return self.files_dir / job_id
+
+    def create_job(self, job_id: str, files: List[Tuple[str, Path, str]]) -> str:
+        """Создание задания и постановка его в очередь.
+
+        Args:
+            job_id: ID задания; файлы задания должны лежать в ``job_dir(job_id)``.
+            files: Имя файла, путь к сохранённому файлу и UUID документа для каждого файла.
+
+        Returns:
+            str: ID задания.
+        """
+
+        now = time.time()
+
+        with self._db() as connection:
+            connection.execute(
+                "INSERT INTO jobs (id, status, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (job_id, JobStatus.QUEUED, now, now),
+            )
+            connection.executemany(
+                "INSERT INTO job_files (job_id, file_index, filename, path, document_uuid, status) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (job_id, i, filename, str(path), document_uuid, JobStatus.QUEUED)
+                    for i, (filename, path, document_uuid) in enumerate(files)
+                ],
+            )
+
+        logger.info(f"Задание индексации {job_id} поставлено в очередь ({len(files)} файлов).")
+
+        return job_id
+
+    @staticmethod
+    def new_job_id() -> str:
+        """Генерация ID задания."""
+
+        return str(uuid.uuid4())
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Статус задания с прогрессом по каждому файлу или None, если задание не найдено."""
+
+        with self._db() as connection:
+            job = connection.execute(
+                "SELECT id, status, created_at, updated_at, error FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+
+            if job is None:
+                return None
+
+            files = connection.execute(
+                "SELECT filename, status, document_uuid, pages_done, pages_total, chunks_done, chunks_total, "
+                "points, performance, error FROM job_files WHERE job_id = ? ORDER BY file_index",
+                (job_id,),
+            ).fetchall()
+
+        return {
+            "job_id": job[0],
+            "status": job[1],
+            "created_at": job[2],
+            "updated_at": job[3],
+            "error": job[4],
+            "files": [
+                {
+                    "filename": row[0],
+                    "status": row[1],
+                    "document_uuid": row[2],
+                    "pages": {"done": row[3], "total": row[4]},
+                    "chunks": {"done": row[5], "total": row[6]},
+                    "points": row[7],
+                    "performance": json.loads(row[8]) if row[8] else None,
+                    "error": row[9],
+                }
+                for row in files
+            ],
+        }
+
+    def _work(self, owner: str, stop_event: threading.Event):
+        """Цикл воркера: захват и обработка файлов заданий до сигнала остановки."""
+
+        indexer = IndexerService()
+
+        while not stop_event.is_set():
+            try:
+                claimed = self._claim_file(owner)
+            except Exception as e:
+                logger.error(f"Ошибка при захвате файла задания: {e}", exc_info=True)
+                claimed = None
+
+            if claimed is None:
+                stop_event.wait(self.poll_interval)
+                continue
+
+            job_id, file_index = claimed[0], claimed[1]
+
+            try:
+                self._process_file(indexer, owner, *claimed)
+            except Exception as e:
+                logger.error(f"Ошибка при обработке файла {file_index} задания {job_id}: {e}", exc_info=True)
+                self._update_file(owner, job_id, file_index, status=JobStatus.FAILED, error=str(e))
+
+            self._finish_job(job_id)
+
+    def _claim_file(self, owner: str) -> Optional[Tuple[str, int, str, str, str, bool]]:
+        """Захват следующего файла: ожидающего в очереди или брошенного владельцем с истёкшей арендой.
+
+        Returns:
+            ID задания, индекс файла, имя файла, путь, UUID документа и признак того, что файл
+            уже обрабатывался (его точки нужно удалить), или None, если захватывать нечего.
+        """
+
+        while True:
+            now = time.time()
+            expired = now - self.lease_timeout
+
+            with self._db() as connection:
+                candidate = connection.execute(
+                    "SELECT f.job_id, f.file_index, f.filename, f.path, f.document_uuid, f.status "
+                    "FROM job_files f JOIN jobs j ON j.id = f.job_id "
+                    "WHERE f.status = ? OR (f.status = ? AND COALESCE(f.heartbeat_at, 0) < ?) "
+                    "ORDER BY j.created_at, f.file_index LIMIT 1",
+                    (JobStatus.QUEUED, JobStatus.RUNNING, expired),
+                ).fetchone()
+
+                if candidate is None:
+                    return None
+
+                job_id, file_index, filename, path, document_uuid, status = candidate
+
+                # Условие повторяется в UPDATE: если файл успел захватить другой воркер или процесс,
+                # строка не обновится и захват повторяется со следующим кандидатом
+                claimed = connection.execute(
+                    "UPDATE job_files SET status = ?, owner = ?, heartbeat_at = ? "
+                    "WHERE job_id = ? AND file_index = ? "
+                    "AND (status = ? OR (status = ? AND COALESCE(heartbeat_at, 0) < ?))",
+                    (JobStatus.RUNNING, owner, now, job_id, file_index, JobStatus.QUEUED, JobStatus.RUNNING, expired),
+                ).rowcount
+
+                if claimed:
+                    connection.execute(
+                        "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                        (JobStatus.RUNNING, now, job_id),
+                    )
+                    return job_id, file_index, filename, path, document_uuid, status == JobStatus.RUNNING
+
+    def _process_file(
+            self,
+            indexer: IndexerService,
+            owner: str,
+            job_id: str,
+            file_index: int,
+            filename: str,
+            path: str,
+            document_uuid: str,
+            interrupted: bool,
+    ):
+        """Индексация захваченного файла задания."""
+
+        if interrupted:
+            # Точки, записанные прерванной обработкой: файл теперь принадлежит этому воркеру,
+            # поэтому удаление не затрагивает обработку в других процессах
+            logger.info(f"Файл {file_index} задания {job_id} брошен прежним владельцем и обрабатывается заново.")
+            qdrant_manager.delete_document(document_uuid)
+
+        def progress(stage: str, done: int, total: int):
+            self._update_file(owner, job_id, file_index, **{f"{stage}_done": done, f"{stage}_total": total})
+
+        # Фоновая загрузка массовая: не ждём индексации каждого батча
+        result = indexer.index_sync(
+            Path(path), document_uuid, progress, upsert_wait=self.upsert_wait, file_name=filename,
+        )
+        updated = self._update_file(
+            owner,
+            job_id,
+            file_index,
+            status=JobStatus.DONE if result.point_ids else JobStatus.FAILED,
+            document_uuid=result.document_uuid,
+            points=len(result.point_ids),
+            performance=json.dumps(result.performance),
+            error=None if result.point_ids else result.error or "Не удалось проиндексировать файл.",
+        )
+
+        if not updated:
+            logger.warning(f"Аренда файла {file_index} задания {job_id} истекла до завершения обработки.")
+
+    def _finish_job(self, job_id: str):
+        """Завершение задания, если в нём не осталось ожидающих и обрабатываемых файлов."""
+
+        with self._db() as connection:
+            finished = connection.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status != ? "
+                "AND NOT EXISTS (SELECT 1 FROM job_files WHERE job_id = ? AND status IN (?, ?))",
+                (JobStatus.DONE, time.time(), job_id, JobStatus.DONE, job_id, JobStatus.QUEUED, JobStatus.RUNNING),
+            ).rowcount
+
+        if finished:
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+            logger.info(f"Задание индексации {job_id} завершено.")
+
+    def _heartbeat(self, owner: str, workers: List[threading.Thread]):
+        """Продление аренды файлов, захваченных воркерами ``owner``, пока воркеры работают."""
+
+        while any(worker.is_alive() for worker in workers):
+            time.sleep(self.lease_timeout / 3)
+
+            try:
+                with self._db() as connection:
+                    connection.execute(
+                        "UPDATE job_files SET heartbeat_at = ? WHERE owner = ? AND status = ?",
+                        (time.time(), owner, JobStatus.RUNNING),
+                    )
+            except Exception as e:
+                logger.error(f"Ошибка при продлении аренды файлов заданий: {e}")
+
+    def _update_file(self, owner: str, job_id: str, file_index: int, **fields) -> bool:
+        """Обновление полей файла задания (статус, прогресс, результат), пока файл захвачен ``owner``.
+
+        Returns:
+            bool: Обновлён ли файл; False, если файл уже захвачен другим владельцем.
+        """
+
+        columns = ", ".join(f"{column} = ?" for column in fields)
+
+        with self._db() as connection:
+            updated = connection.execute(
+                f"UPDATE job_files SET {columns} WHERE job_id = ? AND file_index = ? AND owner = ?",
+                (*fields.values(), job_id, file_index, owner),
+            ).rowcount
+            connection.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time(), job_id))
+
+        return updated > 0
+
+    def _db(self) -> "_Transaction":
+        """Транзакция над общим соединением с базой заданий."""
+
+        with self.lock:
+            if self.connection is None:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                self.connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+                self.connection.execute("PRAGMA journal_mode=WAL")
+                self.connection.executescript(
+                    "CREATE TABLE IF NOT EXISTS jobs ("
+                    "id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at REAL NOT NULL, "
+                    "updated_at REAL NOT NULL, error TEXT);"
+                    "CREATE TABLE IF NOT EXISTS job_files ("
+                    "job_id TEXT NOT NULL, file_index INTEGER NOT NULL, filename TEXT NOT NULL, "
+                    "path TEXT NOT NULL, document_uuid TEXT, status TEXT NOT NULL, "
+                    "pages_done INTEGER DEFAULT 0, pages_total INTEGER DEFAULT 0, "
+                    "chunks_done INTEGER DEFAULT 0, chunks_total INTEGER DEFAULT 0, "
+                    "points INTEGER DEFAULT 0, performance TEXT, error TEXT, "
+                    "owner TEXT, heartbeat_at REAL, "
+                    "PRIMARY KEY (job_id, file_index));"
+                )
+
+                # Базы, созданные до появления захвата файлов
+                columns = {row[1] for row in self.connection.execute("PRAGMA table_info(job_files)")}
+
+                for column, column_type in (("owner", "TEXT"), ("heartbeat_at", "REAL")):
+                    if column not in columns:
+                        self.connection.execute(f"ALTER TABLE job_files ADD COLUMN {column} {column_type}")
+
+                self.connection.commit()
+
+        return _Transaction(self.connection, self.lock)
+
+
+class _Transaction:
+    """Контекстный менеджер транзакции SQLite под общей блокировкой соединения."""
+
+    def __init__(self, connection: sqlite3.Connection, lock: threading.Lock):
+        self.connection = connection
+        self.lock = lock
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.lock.acquire()
+        return self.connection
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.connection.commit()
+            else:
+                self.connection.rollback()
+        finally:
+            self.lock.release()
+
+
+job_service = JobService()
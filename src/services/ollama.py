@@ -1,11 +1,44 @@
-import requests
 import json
+import aiohttp
+
+from typing import AsyncIterator, Optional
+
 from src.helpers.configs_hub import ollama_config
+from src.logging.logger import logger
 
 
 class OllamaService:
+    """Асинхронный клиент генерации ответов Ollama с общим пулом соединений."""
+
+    def __init__(self):
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Сессия aiohttp с пулом соединений, создаётся при первом запросе."""
+
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=ollama_config.ollama.pool_size),
+                timeout=aiohttp.ClientTimeout(total=ollama_config.ollama.timeout),
+                headers={"Content-Type": "application/json"},
+            )
+
+        return self.session
+
     @staticmethod
-    async def ask_model(query: str, context: str) -> dict:
+    def _build_request(query: str, context: str, stream: bool) -> str:
+        """Тело запроса генерации с промптом, сформированным с учетом контекста."""
+
+        prompt = ollama_config.ollama.prompt.format(query=query, context=context)
+
+        return json.dumps({
+            "model": ollama_config.ollama.models.llama3,
+            "prompt": prompt,
+            "stream": stream,
+            "use_gpu": True,
+        })
+
+    async def ask_model(self, query: str, context: str) -> dict:
         """Запрос к модели Ollama с учетом контекста.
          
         Args:
@@ -16,26 +49,63 @@ class OllamaService:
             dict: Ответ от модели или информация об ошибке.
         """
 
-        # Формирование промпта с учетом контекста
-        prompt = ollama_config.ollama.prompt.format(query=query, context=context)
+        session = self._get_session()
 
-        # Запрос к модели
-        response = requests.post(
+        async with session.post(
             ollama_config.ollama.generate_url,
-            data=json.dumps({
-                "model": ollama_config.ollama.models.llama3,
-                "prompt": prompt,
-                "stream": False,
-                "use_gpu": True,
-            }),
-            headers={"Content-Type": "application/json"}
-        )
-         
-        if response.status_code == requests.codes.ok:
-            result = response.json()
-            return {"response": result.get("response", "")}
-        else:
-            return {"error": f"Ошибка {response.status_code}: {response.text}"}
+            data=self._build_request(query, context, stream=False),
+        ) as response:
+            if response.status == 200:
+                result = await response.json(content_type=None)
+                return {"response": result.get("response", "")}
+            else:
+                return {"error": f"Ошибка {response.status}: {await response.text()}"}
+
+    async def stream_model(self, query: str, context: str) -> AsyncIterator[str]:
+        """Потоковый запрос к модели Ollama: фрагменты ответа отдаются по мере генерации.
+
+        Args:
+            query (str): Вопрос пользователя.
+            context (str): Контекст для формирования ответа.
+
+        Returns:
+            AsyncIterator[str]: Фрагменты ответа модели.
+
+        Raises:
+            RuntimeError: Если Ollama ответила ошибкой.
+        """
+
+        session = self._get_session()
+
+        async with session.post(
+            ollama_config.ollama.generate_url,
+            data=self._build_request(query, context, stream=True),
+        ) as response:
+            if response.status != 200:
+                raise RuntimeError(f"Ошибка {response.status}: {await response.text()}")
+
+            # Ollama отдаёт по одному JSON-объекту на строку
+            async for line in response.content:
+                if not line.strip():
+                    continue
+
+                chunk = json.loads(line)
+
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+
+                if chunk.get("response"):
+                    yield chunk["response"]
+
+                if chunk.get("done"):
+                    break
+
+    async def close(self):
+        """Закрытие пула соединений с Ollama."""
+
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+            logger.debug("Соединения с ollama закрыты.")
 
 
 ollama_service = OllamaService()
@@ -5,19 +5,35 @@ from sentence_transformers import SentenceTransformer
 from src.dataclasses.embedding import SearchResponse
 from src.helpers.models_management import get_embedding_model
 from src.logging.logger import logger
+from src.managers.embedding_cache import EmbeddingCache, embedding_cache
+from src.managers.execution import execution_manager
 from src.managers.qdrant import QdrantManager
 from src.helpers.configs_hub import querier_config
 from src.managers.qdrant import qdrant_manager as qm
+from src.processors.sparse import SparseEncoder, sparse_encoder
+from src.services.reranker import BaseReranker, get_reranker
 
 
 class QueryService:
     """Сервис поиска и запросов."""
 
-    def __init__(self, qdrant_manager: QdrantManager = qm):
+    def __init__(self, qdrant_manager: QdrantManager = qm, reranker: BaseReranker = None):
         self.qdrant_manager = qdrant_manager
+        self.reranker: BaseReranker = reranker or get_reranker()
         self.embedding_model: SentenceTransformer = get_embedding_model()
+        self.embedding_cache: EmbeddingCache = embedding_cache
+        self.sparse_encoder: SparseEncoder = sparse_encoder
 
     async def search(self, query: str, **kwargs) -> SearchResponse:
+        """Поиск по базе знаний в пуле исполнения ``query``, не блокируя цикл событий.
+
+        Raises:
+            ExecutorSaturatedError: Если пул запросов перегружен.
+        """
+
+        return await execution_manager.run("query", self.search_sync, query, **kwargs)
+
+    def search_sync(self, query: str, **kwargs) -> SearchResponse:
         """Поиск по базе знаний."""
 
         try:
@@ -29,15 +45,24 @@ class QueryService:
             score_threshold = kwargs.get('score_threshold', 0.7)
             file_types = kwargs.get('file_types')
             metadata_filter = kwargs.get('metadata_filter')
+            hnsw_ef = kwargs.get('hnsw_ef')
+            oversampling = kwargs.get('oversampling')
 
-            # Выполнение поиска
-            results = self.qdrant_manager.search_similar(
+            # Выполнение поиска с запасом кандидатов для реранкера
+            hits = self.qdrant_manager.search_hits(
                 query_embedding=query_embedding,
-                limit=limit,
+                limit=limit * querier_config.reranker.overfetch,
                 score_threshold=score_threshold,
                 file_types=file_types,
                 metadata_filter=metadata_filter,
+                sparse_query=self.sparse_encoder.encode_query(query),
+                hnsw_ef=hnsw_ef,
+                oversampling=oversampling,
             )
+            hits = self.reranker.rerank(query, hits, limit)
+
+            # Собираем контекст вокруг лучших чанков
+            results = self.qdrant_manager.expand_context(hits)
             return SearchResponse(
                 query=query,
                 results=results,
@@ -63,8 +88,17 @@ class QueryService:
             if not query.strip():
                 return [0.0] * 1024  # Пустой вектор
 
-            embedding = self.embedding_model.encode(query)
-            return embedding.tolist()
+            # Повторные вопросы берутся из общего с индексацией кэша
+            query_hash = self.embedding_cache.text_hash(query)
+            cached_embedding = self.embedding_cache.get(query_hash)
+
+            if cached_embedding is not None:
+                return cached_embedding
+
+            embedding = self.embedding_model.encode(query).tolist()
+            self.embedding_cache.set(query_hash, embedding)
+
+            return embedding
 
         except Exception as e:
             logger.error(f"Ошибка при создании эмбеддинга запроса: {e}", exc_info=True)
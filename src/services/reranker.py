@@ -0,0 +1,143 @@
+import hashlib
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from qdrant_client.models import ScoredPoint
+
+from src.helpers.configs_hub import querier_config
+from src.helpers.models_management import get_reranker_model
+from src.logging.logger import logger
+
+
+class BaseReranker(ABC):
+    """Базовый класс этапа переранжирования найденных чанков."""
+
+    @abstractmethod
+    def rerank(self, query: str, hits: List[ScoredPoint], top_k: int) -> List[ScoredPoint]:
+        """Переупорядочивание кандидатов по релевантности запросу.
+
+        Args:
+            query: Текст запроса.
+            hits: Кандидаты в порядке векторного поиска.
+            top_k: Количество возвращаемых кандидатов.
+
+        Returns:
+            Не больше ``top_k`` кандидатов в порядке убывания релевантности.
+        """
+
+
+class NoopReranker(BaseReranker):
+    """Реранкер-заглушка: сохраняет порядок векторного поиска."""
+
+    def rerank(self, query: str, hits: List[ScoredPoint], top_k: int) -> List[ScoredPoint]:
+        return hits[:top_k]
+
+
+class CrossEncoderReranker(BaseReranker):
+    """Переранжирование кросс-энкодером на CPU.
+
+    Пары (запрос, чанк) оцениваются батчами, пока не исчерпан бюджет времени: кандидаты,
+    до которых очередь не дошла, идут после оценённых в исходном порядке поиска. Оценки
+    кэшируются в памяти процесса по хешам запроса и текста чанка.
+    """
+
+    def __init__(
+            self,
+            batch_size: int = querier_config.reranker.batch_size,
+            budget_ms: int = querier_config.reranker.budget_ms,
+            cache_size: int = querier_config.reranker.cache_size,
+    ):
+        self.model = get_reranker_model()
+        self.batch_size = batch_size
+        self.budget = budget_ms / 1000
+        self.cache_size = cache_size
+
+        self.cache: OrderedDict[Tuple[str, str], float] = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+    def rerank(self, query: str, hits: List[ScoredPoint], top_k: int) -> List[ScoredPoint]:
+        if len(hits) <= 1:
+            return hits[:top_k]
+
+        started = time.perf_counter()
+        query_hash = self._hash(query)
+        keys = [(query_hash, self._hash(hit.payload.get("text", ""))) for hit in hits]
+        scores: Dict[int, float] = {}
+
+        with self.lock:
+            for i, key in enumerate(keys):
+                if key in self.cache:
+                    self.cache.move_to_end(key)
+                    scores[i] = self.cache[key]
+
+        missing = [i for i in range(len(hits)) if i not in scores]
+
+        # Оцениваем кандидатов в порядке поиска, пока укладываемся в бюджет
+        for start in range(0, len(missing), self.batch_size):
+            if time.perf_counter() - started > self.budget:
+                logger.warning(
+                    f"Бюджет реранкера исчерпан: не оценено {len(missing) - start} из {len(hits)} кандидатов.",
+                )
+                break
+
+            batch = missing[start:start + self.batch_size]
+            batch_scores = self.model.predict(
+                [(query, hits[i].payload.get("text", "")) for i in batch],
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+            )
+
+            for i, score in zip(batch, batch_scores):
+                scores[i] = float(score)
+
+            self._remember({keys[i]: scores[i] for i in batch})
+
+        scored = sorted(scores, key=lambda i: scores[i], reverse=True)
+        unscored = [i for i in range(len(hits)) if i not in scores]
+        reranked = []
+
+        for i in (scored + unscored)[:top_k]:
+            hit = hits[i]
+
+            if i in scores:
+                hit = hit.model_copy(update={"score": scores[i]})
+
+            reranked.append(hit)
+
+        return reranked
+
+    def _remember(self, scores: Dict[Tuple[str, str], float]):
+        """Добавление оценок в LRU-кэш с вытеснением самых старых записей."""
+
+        with self.lock:
+            for key, score in scores.items():
+                self.cache[key] = score
+                self.cache.move_to_end(key)
+
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+
+_reranker: Optional[BaseReranker] = None
+
+
+def get_reranker() -> BaseReranker:
+    """Реранкер, выбранный в конфиге запросов (singleton)."""
+
+    global _reranker
+
+    if _reranker is None:
+        if querier_config.reranker.type == "cross_encoder":
+            _reranker = CrossEncoderReranker()
+        else:
+            _reranker = NoopReranker()
+
+    return _reranker
@@ -1,4 +1,16 @@
 """Web application package for the DocQA project."""
 
-# Expose the FastAPI app instance at package level for ASGI servers
-from src.web.app import app  # noqa: F401
+
+def __getattr__(name):
+    """Экземпляр FastAPI на уровне пакета для ASGI-серверов (``src.web:app``).
+
+    Приложение импортируется лениво: модули, которые используют только ``src.web.models``
+    (например, менеджер qdrant), не должны загружать всё приложение и замыкать цикл импорта.
+    """
+
+    if name == "app":
+        from src.web.app import app
+
+        return app
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
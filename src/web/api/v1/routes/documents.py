@@ -1,16 +1,21 @@
+import asyncio
+import shutil
 import tempfile
 import uuid
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from pathlib import Path
-from chonkie import TokenChunker, OverlapRefinery
 
-from fastapi import APIRouter, UploadFile, File, Query
+from fastapi import APIRouter, UploadFile, File, Query, HTTPException
 from pydantic import BaseModel
 
+from src.dataclasses.indexing import IndexResult
+from src.helpers.configs_hub import fastapi_config
+from src.helpers.files_management import FileTooLargeError, save_upload
 from src.managers.qdrant import qdrant_manager
-from src.helpers.configs_hub import qdrant_config
+from src.managers.quarantine import quarantine_manager
 from src.services.indexer import IndexerService
+from src.services.jobs import job_service
 
 
 router = APIRouter()
@@ -21,137 +26,323 @@ class DocumentMetadata(BaseModel):
     tags: Optional[List[str]] = None
 
 
+class FileIngestResult(BaseModel):
+    filename: str
+    document_uuid: Optional[str] = None
+    points: int = 0
+    skipped: bool = False
+    error: Optional[str] = None
+    performance: Dict[str, Any] = {}
+
+
 class IngestResponse(BaseModel):
     document_ids: List[str]
-    document_uuid: str
+    document_uuid: Optional[str] = None
+    job_id: Optional[str] = None
     performance: Optional[Dict[str, Any]] = None
+    files: Optional[List[FileIngestResult]] = None
+    error: Optional[str] = None
+
+
+class DeleteRequest(BaseModel):
+    document_uuids: List[str]
 
 
 class DeleteResponse(BaseModel):
-    deleted_ids: List[str]
+    document_uuids: List[str]
+    deleted_points: int
+
+
+async def _save_upload(upload_file: UploadFile, path: Path) -> str:
+    """Потоковое сохранение загруженного файла с ограничением размера.
+
+    Returns:
+        str: Хеш содержимого файла.
+
+    Raises:
+        HTTPException: 413, если файл больше ``ingest.max_file_size_mb``.
+    """
+
+    try:
+        content_hash, _ = await save_upload(upload_file, path, fastapi_config.ingest.max_file_size_mb * 1024 * 1024)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    return content_hash
+
+
+async def _enqueue_ingest_job(files: List[UploadFile]) -> IngestResponse:
+    """Сохранение загруженных файлов на диск и постановка задания индексации в очередь.
+
+    Raises:
+        HTTPException: 400, если среди файлов нет PDF: задание без файлов никогда не завершится.
+    """
+
+    # Проверяем, что файл является PDF todo в будущем открыть другие типы
+    pdf_files = [(i, upload_file) for i, upload_file in enumerate(files) if upload_file.filename.lower().endswith('.pdf')]
+
+    if not pdf_files:
+        raise HTTPException(status_code=400, detail="Среди загруженных файлов нет PDF-файлов.")
+
+    job_id = job_service.new_job_id()
+    job_dir = job_service.job_dir(job_id)
+    job_dir.mkdir(parents=True, exist_ok=True)
+    job_files = []
+
+    for i, upload_file in pdf_files:
+        # Префикс с номером файла исключает перезапись файлов с одинаковыми именами
+        file_path = job_dir / f"{i}_{Path(upload_file.filename).name}"
+
+        try:
+            await _save_upload(upload_file, file_path)
+        except HTTPException:
+            # Задание не создаётся: удаляем уже сохранённые файлы
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+
+        job_files.append((upload_file.filename, file_path, str(uuid.uuid4())))
+
+    job_service.create_job(job_id, job_files)
+
+    return IngestResponse(
+        document_ids=[],
+        job_id=job_id,
+        performance={"total_files": len(files), "queued_files": len(job_files)},
+    )
 
 
 @router.post("/ingest", response_model=IngestResponse, summary="Ingest documents")
 async def ingest_documents(
     files: List[UploadFile] = File(..., description="Files to ingest"),
+    background: bool = Query(False, description="Process files in a background job and return its ID"),
 ) -> IngestResponse:
-    """Обработка загруженных документов и создание эмбеддингов."""
-    
-    indexer = IndexerService()
-    document_ids = []
+    """Обработка загруженных документов и создание эмбеддингов.
+
+    В фоновом режиме файлы сохраняются на диск, а ответ сразу содержит ID задания, прогресс
+    которого доступен по ``/documents/jobs/{job_id}``.
+    """
+
+    if background:
+        return await _enqueue_ingest_job(files)
+
     performance_stats = {
-        "total_files": 0,
+        "total_files": len(files),
         "processed_files": 0,
+        "skipped_files": 0,
+        "failed_files": 0,
         "total_points": 0,
+        "embedded_chunks": 0,
+        "embedding_time": 0.0,
+        "chunks_per_sec": 0.0,
     }
-    
+
     # Создаем временную директорию для сохранения файлов
     with tempfile.TemporaryDirectory() as temp_dir:
         temp_path = Path(temp_dir)
-        
-        for upload_file in files:
-            performance_stats["total_files"] += 1
-            
+        ingest_files = []
+
+        for i, upload_file in enumerate(files):
             # Проверяем, что файл является PDF todo в будущем открыть другие типы
             if not upload_file.filename.lower().endswith('.pdf'):
                 continue
-            
-            # Сохраняем файл во временную директорию
-            file_path = temp_path / upload_file.filename
-
-            with open(file_path, "wb") as buffer:
-                content = await upload_file.read()
-                buffer.write(content)
-            
+
+            # Префикс с номером файла исключает перезапись файлов с одинаковыми именами
+            file_path = temp_path / f"{i}_{Path(upload_file.filename).name}"
+
+            content_hash = await _save_upload(upload_file, file_path)
+
             # Генерируем уникальный идентификатор для документа.
-            document_uuid = str(uuid.uuid4())
-            
-            # Обрабатываем файл - ручной чанкинг
-            # try:
-            #     point_ids = await indexer.index(file_path, document_uuid)
-            #     # Добавляем все ID точек для этого документа
-            #     document_ids.extend(point_ids)
-            #     performance_stats["processed_files"] += 1
-            #     performance_stats["total_points"] += len(point_ids)
-            # except Exception as e:
-            #     # Логируем ошибку и продолжаем обработку следующих файлов todo
-            #     continue
-
-            # Обрабатываем файл - чанкинг с помощью chonkie.
-            ...
+            ingest_files.append((upload_file.filename, file_path, str(uuid.uuid4()), content_hash))
+
+        results = await _index_files(ingest_files)
+
+    document_ids = []
+
+    for file_result, index_result in results:
+        # Файл с ошибкой не проиндексирован: его точки откачены
+        if index_result.error:
+            performance_stats["failed_files"] += 1
+            continue
+
+        # Добавляем все ID точек для этого документа
+        document_ids.extend(index_result.point_ids)
+        performance_stats["processed_files"] += 1
+        performance_stats["total_points"] += len(index_result.point_ids)
+
+        if index_result.skipped:
+            performance_stats["skipped_files"] += 1
+
+        performance_stats["embedded_chunks"] += index_result.performance.get("chunks", 0)
+        performance_stats["embedding_time"] += index_result.performance.get("embedding_time", 0.0)
+
+    if performance_stats["embedding_time"] > 0:
+        performance_stats["chunks_per_sec"] = round(
+            performance_stats["embedded_chunks"] / performance_stats["embedding_time"], 2,
+        )
+
+    file_results = [file_result for file_result, _ in results]
+
     return IngestResponse(
         document_ids=document_ids,
-        document_uuid=document_uuid,
+        document_uuid=file_results[-1].document_uuid if file_results else None,
         performance=performance_stats,
+        files=file_results,
     )
 
 
-@router.get("/", summary="List documents")
-async def list_documents(
-    limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0)
-) -> dict:
-    """Получение списка документов из Qdrant."""
+async def _index_files(
+        ingest_files: List[Tuple[str, Path, str, str]],
+) -> List[Tuple[FileIngestResult, IndexResult]]:
+    """Одновременная индексация файлов запроса.
+
+    Файлы разбирают ``ingest.file_workers`` обработчиков, у каждого свой ``IndexerService``:
+    процессор документов хранит состояние обрабатываемого файла. Пока один файл кодируется
+    моделью эмбеддингов, следующий уже разбирается.
+
+    Args:
+        ingest_files: Исходное имя, путь к сохранённому файлу, UUID документа и хеш содержимого.
+
+    Returns:
+        Результат по каждому файлу в порядке ``ingest_files``; ошибка файла передаётся в его ``IndexResult.error``.
+
+    Raises:
+        ExecutorSaturatedError: Если пул индексации перегружен.
+    """
+
+    results: List[Optional[Tuple[FileIngestResult, IndexResult]]] = [None] * len(ingest_files)
+    files_queue: "asyncio.Queue[int]" = asyncio.Queue()
+
+    for i in range(len(ingest_files)):
+        files_queue.put_nowait(i)
+
+    async def work():
+        indexer = IndexerService()
+
+        while not files_queue.empty():
+            i = files_queue.get_nowait()
+            filename, file_path, document_uuid, content_hash = ingest_files[i]
+
+            # Ошибка файла возвращается в результате и не останавливает обработку остальных файлов;
+            # перегрузка пула (ExecutorSaturatedError) отдаётся клиенту как 503
+            index_result = await indexer.index(file_path, document_uuid, filename, content_hash)
+
+            results[i] = (
+                FileIngestResult(
+                    filename=filename,
+                    # Уже проиндексированный файл сохраняет свой прежний UUID
+                    document_uuid=index_result.document_uuid,
+                    points=len(index_result.point_ids),
+                    skipped=index_result.skipped,
+                    error=index_result.error,
+                    performance=index_result.performance,
+                ),
+                index_result,
+            )
+
+    workers_count = min(fastapi_config.ingest.file_workers, len(ingest_files))
+    outcomes = await asyncio.gather(*(work() for _ in range(workers_count)), return_exceptions=True)
+
+    # Ошибки обработчиков пробрасываются только после завершения всех файлов в работе
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            raise outcome
+
+    return results
+
+
+@router.get("/jobs/{job_id}", summary="Get ingest job status")
+async def get_job_status(job_id: str) -> dict:
+    """Статус фонового задания индексации с прогрессом по файлам, страницам и чанкам."""
+
+    job = job_service.get_job(job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Задание {job_id} не найдено.")
+
+    return job
+
+
+@router.get("/quarantine", summary="List quarantined files")
+async def list_quarantine() -> dict:
+    """Файлы в карантине: их разбор несколько раз не уложился в лимиты, и они больше не разбираются."""
+
+    return {"items": quarantine_manager.list_files()}
+
 
-    collection_name = qdrant_config.defaults.default_collection
+@router.delete("/quarantine/{content_hash}", summary="Release a file from quarantine")
+async def release_quarantine(content_hash: str) -> dict:
+    """Снятие файла с карантина: следующая загрузка файла снова будет разобрана."""
 
-    # Получаем все точки из коллекции
-    points = qdrant_manager.client.scroll(
-        collection_name=collection_name,
-        limit=limit,
-        offset=offset,
-        with_payload=True,
-        with_vectors=False,
+    if not quarantine_manager.release(content_hash):
+        raise HTTPException(status_code=404, detail=f"Файл {content_hash} не найден в карантине.")
+
+    return {"content_hash": content_hash, "released": True}
+
+
+@router.put("/{document_uuid}", response_model=IngestResponse, summary="Update document incrementally")
+async def update_document(
+    document_uuid: str,
+    file: UploadFile = File(..., description="New version of the document"),
+) -> IngestResponse:
+    """Обновление документа новой версией файла.
+
+    Заново кодируются только новые и изменённые чанки, устаревшие чанки удаляются,
+    остальные точки документа сохраняются.
+    """
+
+    # Проверяем, что файл является PDF todo в будущем открыть другие типы
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Поддерживаются только PDF-файлы.")
+
+    indexer = IndexerService()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / Path(file.filename).name
+
+        content_hash = await _save_upload(file, file_path)
+        index_result = await indexer.update(file_path, document_uuid, file.filename, content_hash)
+
+    return IngestResponse(
+        document_ids=index_result.point_ids,
+        document_uuid=document_uuid,
+        performance={"skipped": index_result.skipped, **index_result.performance},
+        error=index_result.error,
     )
 
-    # Формируем список документов
-    items = []
 
-    for point in points[0]:
-        payload = point.payload
-        info = { # todo как-то тупо выглядит
-            "document": point.payload['file_path'].split('/')[-1],
-            "document_uuid": payload['document_uuid'],
-        }
+@router.get("/", summary="List documents")
+async def list_documents(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor of the page from the previous response"),
+) -> dict:
+    """Постраничный список документов из каталога документов.
 
-        if info in items:
-            continue
-        else:
-            items.append(info)
+    Стоимость страницы не зависит от количества чанков в документах.
+    """
 
-    return {"items": items, "limit": limit, "offset": offset}
+    items, next_cursor = qdrant_manager.list_catalog(limit, cursor)
+
+    return {
+        "items": items,
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "total": qdrant_manager.count_catalog(),
+    }
 
 
 @router.delete("/", response_model=DeleteResponse, summary="Delete documents by UUID")
 async def delete_documents(document_uuid: str = Query(..., description="Document UUID to delete all related points")) -> DeleteResponse:
     """Удаление всех точек, связанных с конкретным документом по UUID."""
 
-    from qdrant_client.models import Filter, FieldCondition, MatchValue
+    deleted_points = qdrant_manager.delete_document(document_uuid)
 
-    collection_name = qdrant_config.defaults.default_collection
+    return DeleteResponse(document_uuids=[document_uuid], deleted_points=deleted_points)
 
-    # Находим все точки, связанные с данным UUID
-    points = qdrant_manager.client.scroll(
-        collection_name=collection_name,
-        scroll_filter=Filter(
-            must=[
-                FieldCondition(
-                    key="document_uuid",
-                    match=MatchValue(value=document_uuid),
-                ),
-            ],
-        ),
-        with_payload=False,
-        limit=10000,  # Большой лимит, чтобы получить все точки
-    )
 
-    # Получаем ID точек для удаления
-    points_to_delete = [point.id for point in points[0]]
+@router.post("/delete", response_model=DeleteResponse, summary="Delete many documents by UUID")
+async def delete_documents_batch(request: DeleteRequest) -> DeleteResponse:
+    """Удаление всех точек нескольких документов одним запросом."""
 
-    # Удаляем точки из коллекции
-    if points_to_delete:
-        qdrant_manager.client.delete(
-            collection_name=collection_name,
-            points_selector=points_to_delete,
-        )
+    deleted_points = qdrant_manager.delete_documents(request.document_uuids)
 
-    return DeleteResponse(deleted_ids=points_to_delete)
+    return DeleteResponse(document_uuids=request.document_uuids, deleted_points=deleted_points)
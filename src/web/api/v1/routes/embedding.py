@@ -3,6 +3,7 @@ from src.helpers.models_management import (
     check_embedding_model,
     get_embedding_model,
 )
+from src.managers.execution import ExecutorSaturatedError
 from src.services.query import query_service
 from src.web.models.query_models import SearchResponseModel, SearchRequest
 
@@ -32,11 +33,13 @@ async def search(request: SearchRequest):
             # file_types = [FileType(ft) for ft in request.file_types if ft in [t.value for t in FileType]]
 
         # Выполнение поиска
-        response = query_service.search(
+        response = await query_service.search(
             query=request.query,
             file_types=file_types,
             limit=request.limit or 1,
             score_threshold=request.score_threshold,
+            hnsw_ef=request.hnsw_ef,
+            oversampling=request.oversampling,
         )
 
         # Преобразование результатов
@@ -59,5 +62,7 @@ async def search(request: SearchRequest):
             processing_time=response.processing_time,
         )
 
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -5,7 +5,7 @@ from src.helpers.models_management import (
     check_ollama_models,
 )
 
-from src.services.ollama import OllamaService
+from src.services.ollama import ollama_service
 
 router = APIRouter()
 
@@ -36,4 +36,4 @@ async def ask_model(query: str, context: str) -> dict:
      Returns:
          dict: Ответ от модели или информация об ошибке.
     """
-    return await OllamaService.ask_model(query, context)
+    return await ollama_service.ask_model(query, context)
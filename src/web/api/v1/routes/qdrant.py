@@ -1,5 +1,9 @@
 from fastapi import APIRouter
-from src.helpers.qdrant_management import create_collections, check_collections as check_qdrant_collections
+from src.helpers.qdrant_management import (
+    create_collections,
+    check_collections as check_qdrant_collections,
+    rebuild_catalog as rebuild_documents_catalog,
+)
 
 router = APIRouter()
 
@@ -12,3 +16,9 @@ async def check_collections() -> dict:
 @router.get("/create_collections", summary="Create collections that are missing")
 async def create_all() -> dict:
     return await create_collections()
+
+
+
+@router.post("/rebuild_catalog", summary="Fill the documents catalog from indexed points")
+async def rebuild_catalog() -> dict:
+    return await rebuild_documents_catalog()
@@ -1,8 +1,12 @@
+import json
+
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from src.logging.logger import logger
 from src.services.query import query_service
 from src.services.ollama import ollama_service
 
@@ -14,6 +18,8 @@ class QueryRequest(BaseModel):
     question: str = Field(..., description="User question to query over the knowledge base")
     top_k: int = Field(5, ge=1, le=50, description="Number of candidate passages to retrieve")
     filters: Optional[Dict[str, Any]] = Field(default=None, description="Optional metadata filters")
+    hnsw_ef: Optional[int] = Field(default=None, ge=1, description="HNSW search beam size: higher is more accurate and slower")
+    oversampling: Optional[float] = Field(default=None, ge=1.0, description="Quantized candidates multiplier rescored with original vectors")
 
 
 class Passage(BaseModel):
@@ -28,27 +34,18 @@ class QueryResponse(BaseModel):
     passages: List[Passage] = []
 
 
-@router.post("/", response_model=QueryResponse, summary="Query RAG pipeline")
-async def query_rag(request: QueryRequest) -> QueryResponse:
-    # Получение эмбеддингов с использованием query_service
-    response = await query_service.search(
-        query=request.question,
-        limit=request.top_k,
-    )
+def _build_context(results) -> str:
+    """Формирование контекста для LLM из результатов поиска."""
 
-    # Формирование контекста из результатов поиска
-    context = "\n".join([result.texts for result in response.results if result.texts])
+    return "\n".join([result.texts for result in results if result.texts])
 
-    # Получение ответа от LLM-модели
-    llm_response = await ollama_service.ask_model(
-        query=request.question,
-        context=context,
-    )
 
-    # Формирование списка пассажей
+def _build_passages(results) -> List[Passage]:
+    """Формирование списка пассажей из результатов поиска."""
+
     passages = []
 
-    for idx, result in enumerate(response.results):
+    for idx, result in enumerate(results):
         if result.texts:
             passages.append(
                 Passage(
@@ -59,7 +56,66 @@ async def query_rag(request: QueryRequest) -> QueryResponse:
                 ),
             )
 
+    return passages
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Сериализация события Server-Sent Events."""
+
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/", response_model=QueryResponse, summary="Query RAG pipeline")
+async def query_rag(request: QueryRequest) -> QueryResponse:
+    # Получение эмбеддингов с использованием query_service
+    response = await query_service.search(
+        query=request.question,
+        limit=request.top_k,
+        hnsw_ef=request.hnsw_ef,
+        oversampling=request.oversampling,
+    )
+
+    # Получение ответа от LLM-модели
+    llm_response = await ollama_service.ask_model(
+        query=request.question,
+        context=_build_context(response.results),
+    )
+
     return QueryResponse(
         answer=llm_response.get("response", "No answer from LLM."),
-        passages=passages,
+        passages=_build_passages(response.results),
     )
+
+
+@router.post("/stream", summary="Query RAG pipeline with streaming answer")
+async def query_rag_stream(request: QueryRequest) -> StreamingResponse:
+    """Запрос к RAG с потоковым ответом (Server-Sent Events).
+
+    Сначала отдаётся событие ``passages`` с найденными пассажами, затем события ``token`` с
+    фрагментами ответа по мере их генерации моделью и завершающее событие ``done``.
+    При ошибке генерации отдаётся событие ``error``.
+    """
+
+    response = await query_service.search(
+        query=request.question,
+        limit=request.top_k,
+        hnsw_ef=request.hnsw_ef,
+        oversampling=request.oversampling,
+    )
+    context = _build_context(response.results)
+    passages = _build_passages(response.results)
+
+    async def events():
+        yield _sse_event("passages", {"passages": [passage.model_dump() for passage in passages]})
+
+        try:
+            async for token in ollama_service.stream_model(query=request.question, context=context):
+                yield _sse_event("token", {"token": token})
+        except Exception as e:
+            logger.error(f"Ошибка при потоковой генерации ответа: {e}")
+            yield _sse_event("error", {"error": str(e)})
+            return
+
+        yield _sse_event("done", {})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
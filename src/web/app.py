@@ -1,9 +1,30 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from src.helpers.configs_hub import fastapi_config
 from src.web.api.router import api_router
-from src.web.middlewares.error_handler import ErrorHandlerMiddleware, http_error_handler
+from src.web.middlewares.error_handler import ErrorHandlerMiddleware, http_error_handler, saturated_error_handler
+from src.web.middlewares.request_size import RequestSizeLimitMiddleware
 from src.logging.logger import configure_logging
+from src.managers.execution import ExecutorSaturatedError
+from src.services.jobs import job_service
+from src.services.ollama import ollama_service
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Жизненный цикл приложения: запуск фоновых воркеров и освобождение ресурсов при остановке."""
+
+    # Запускаем воркеры фоновой индексации и возобновляем прерванные задания
+    job_service.start()
+
+    yield
+
+    job_service.stop()
+
+    # Закрываем пул соединений с Ollama
+    await ollama_service.close()
 
 
 def create_app() -> FastAPI:
@@ -19,14 +40,21 @@ def create_app() -> FastAPI:
         docs_url="/docs",
         redoc_url="/redoc",
         openapi_url="/openapi.json",
+        lifespan=lifespan,
     )
     
     # Добавляем middleware для обработки ошибок
     _app.add_middleware(ErrorHandlerMiddleware)
+
+    # Слишком большие запросы отклоняются до разбора формы и сохранения файлов во временный каталог
+    _app.add_middleware(RequestSizeLimitMiddleware)
     
     # Добавляем обработчик HTTP ошибок
     _app.add_exception_handler(Exception, http_error_handler)
 
+    # Перегрузка пулов исполнения отдаётся как 503, а не как внутренняя ошибка
+    _app.add_exception_handler(ExecutorSaturatedError, saturated_error_handler)
+
     _app.include_router(api_router)
 
     return _app
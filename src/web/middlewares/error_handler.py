@@ -5,6 +5,9 @@ from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from loguru import logger
 
+from src.helpers.configs_hub import fastapi_config
+from src.managers.execution import ExecutorSaturatedError
+
 
 class ErrorHandlerMiddleware(BaseHTTPMiddleware):
     """Middleware для обработки ошибок и логирования."""
@@ -28,4 +31,14 @@ async def http_error_handler(request: Request, exc):
     return JSONResponse(
         status_code=exc.status_code,
         content={"error": exc.detail},
-    )
\ No newline at end of file
+    )
+
+
+async def saturated_error_handler(request: Request, exc: ExecutorSaturatedError):
+    """Обработчик перегрузки пулов исполнения: 503 с рекомендацией повторить запрос."""
+    logger.warning(f"Пул {exc.pool_name} перегружен, запрос {request.url} отклонён.")
+    return JSONResponse(
+        status_code=503,
+        content={"error": str(exc)},
+        headers={"Retry-After": str(fastapi_config.web.retry_after)},
+    )
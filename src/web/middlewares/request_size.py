@@ -0,0 +1,83 @@
+"""Middleware для ограничения размера тела запроса."""
+
+from fastapi.responses import JSONResponse
+from loguru import logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.helpers.configs_hub import fastapi_config
+
+
+class RequestTooLargeError(Exception):
+    """Тело запроса больше допустимого."""
+
+
+class RequestSizeLimitMiddleware:
+    """Отклонение запросов с телом больше ``max_size`` байт кодом 413 до разбора формы.
+
+    Запрос с заголовком Content-Length больше лимита отклоняется сразу, тело не читается.
+    Для запросов без заголовка (chunked) считаются прочитанные байты: разбор тела прерывается
+    на превышении лимита, а ответ приложения заменяется на 413.
+
+    Реализован как чистое ASGI-middleware: ``BaseHTTPMiddleware`` не даёт подменить чтение тела.
+    """
+
+    def __init__(self, app: ASGIApp, max_size: int = fastapi_config.ingest.max_request_size_mb * 1024 * 1024):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_size:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        response_replaced = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+
+            message = await receive()
+
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+
+                if received > self.max_size:
+                    exceeded = True
+                    raise RequestTooLargeError(f"Тело запроса больше допустимых {self.max_size} байт.")
+
+            return message
+
+        async def limited_send(message: Message):
+            nonlocal response_replaced
+
+            # Ошибка разбора тела превращается приложением в 400 или 500: отдаём вместо неё 413
+            if exceeded:
+                if not response_replaced:
+                    response_replaced = True
+                    await self._reject(scope, receive, send)
+                return
+
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, limited_send)
+        except RequestTooLargeError:
+            if not response_replaced:
+                await self._reject(scope, receive, send)
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send):
+        """Ответ 413 на слишком большой запрос."""
+
+        logger.warning(f"Запрос {scope['method']} {scope['path']} отклонён: тело больше {self.max_size} байт.")
+        response = JSONResponse(
+            status_code=413,
+            content={"error": f"Тело запроса больше допустимых {self.max_size} байт."},
+        )
+        await response(scope, receive, send)
@@ -8,6 +8,8 @@ class SearchRequest(BaseModel):
     file_types: Optional[List[str]] = None
     limit: int = 1
     score_threshold: float = 0.7
+    hnsw_ef: Optional[int] = None
+    oversampling: Optional[float] = None
 
 
 class SearchResponseModel(BaseModel):
@@ -1,15 +1,72 @@
 """Фикстуры для тестирования."""
 
+import hashlib
+import re
+
+import numpy as np
 import pytest
 
 from fastapi.testclient import TestClient
-from src.web.app import create_app
 
 
 @pytest.fixture(scope="module")
 def client():
     """Создает тестовый клиент для FastAPI."""
+    # Приложение загружает модели, поэтому импортируется только в тестах API
+    from src.web.app import create_app
+
     app = create_app()
 
     with TestClient(app) as client:
         yield client
+
+
+class WordTokenizer:
+    """Токенизатор, в котором каждое слово - один токен."""
+
+    def __call__(self, texts, add_special_tokens=False, return_offsets_mapping=False, truncation=False,
+                 max_length=None):
+        offsets = [[match.span() for match in re.finditer(r"\S+", text)] for text in texts]
+
+        if truncation:
+            offsets = [spans[:max_length] for spans in offsets]
+
+        return {"offset_mapping": offsets, "input_ids": [list(range(len(spans))) for spans in offsets]}
+
+
+class StubEmbeddingModel:
+    """Модель эмбеддингов со словным токенизатором и детерминированными векторами по хешу текста."""
+
+    def __init__(self, dimension=1024, max_seq_length=512):
+        self.tokenizer = WordTokenizer()
+        self.dimension = dimension
+        self.max_seq_length = max_seq_length
+        self.encoded = []
+
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+
+    def encode(self, texts, batch_size=None, show_progress_bar=False):
+        self.encoded.append(list(texts))
+        seeds = [int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16) for text in texts]
+        return np.array([np.random.default_rng(seed).random(self.dimension) for seed in seeds])
+
+
+@pytest.fixture
+def embedding_model(monkeypatch):
+    """Заглушка модели эмбеддингов вместо загружаемой модели."""
+    model = StubEmbeddingModel()
+    monkeypatch.setattr("src.processors.document.get_embedding_model", lambda: model)
+    return model
+
+
+@pytest.fixture
+def processor(embedding_model, tmp_path):
+    """Обработчик документов с заглушкой модели и кэшем эмбеддингов во временной базе."""
+    from src.managers.embedding_cache import EmbeddingCache
+    from src.processors.document import DocumentProcessor
+
+    processor = DocumentProcessor()
+    processor.embedding_cache = EmbeddingCache(path=tmp_path / "cache.sqlite3", model_name="stub",
+                                               memory_size=100, disk_size=1000)
+    return processor
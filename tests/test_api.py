@@ -26,3 +26,15 @@ def test_qdrant_check_collections(client):
     """Тест для эндпоинта qdrant check collections."""
     response = client.get("/v1/qdrant/check_collections")
     assert response.status_code == 200
+
+
+def test_ingest_job_not_found(client):
+    """Тест для эндпоинта статуса несуществующего задания индексации."""
+    response = client.get("/v1/documents/jobs/unknown-job")
+    assert response.status_code == 404
+
+
+def test_quarantine_release_not_found(client):
+    """Тест для эндпоинта снятия с карантина файла, которого нет в карантине."""
+    response = client.delete("/v1/documents/quarantine/unknown-hash")
+    assert response.status_code == 404
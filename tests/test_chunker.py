@@ -0,0 +1,75 @@
+"""Тесты для разбиения текста на чанки по токенам."""
+
+import re
+
+import pytest
+
+from src.processors.chunker import TokenChunker
+
+
+class WhitespaceTokenizer:
+    """Токенизатор, в котором каждое слово - один токен."""
+
+    def __call__(self, texts, add_special_tokens=False, return_offsets_mapping=True):
+        return {"offset_mapping": [[match.span() for match in re.finditer(r"\S+", text)] for text in texts]}
+
+
+def _sentences(count, words=5):
+    """Предложения из уникальных слов ``w<номер>``."""
+    return [" ".join(f"w{i * words + j}" for j in range(words)) + "." for i in range(count)]
+
+
+def test_short_text_is_single_chunk():
+    """Короткий текст целиком попадает в один чанк."""
+    chunks = TokenChunker(WhitespaceTokenizer(), 20, 5).chunk("Первое предложение. Второе предложение.")
+    assert chunks == ["Первое предложение. Второе предложение."]
+
+
+def test_chunks_fit_limit_and_overlap():
+    """Чанки не длиннее лимита, каждый следующий начинается с конца предыдущего."""
+    chunks = TokenChunker(WhitespaceTokenizer(), 20, 5).chunk(" ".join(_sentences(40)))
+
+    assert len(chunks) > 1
+    assert all(len(chunk.split()) <= 20 for chunk in chunks)
+
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.split()[0] in previous.split()
+
+    words = {word.rstrip(".") for chunk in chunks for word in chunk.split()}
+    assert words == {f"w{i}" for i in range(200)}
+
+
+def test_long_sentence_is_split_by_words():
+    """Предложение длиннее чанка режется по словам без потери текста."""
+    text = " ".join(f"слово{i}" for i in range(1000))
+    chunks = TokenChunker(WhitespaceTokenizer(), 100, 20).chunk(text)
+
+    assert all(len(chunk.split()) <= 100 for chunk in chunks)
+    assert {word for chunk in chunks for word in chunk.split()} == set(text.split())
+
+
+def test_sentence_continues_on_next_page():
+    """Предложение, перенесённое на следующую страницу, не разрывается."""
+    chunks = list(TokenChunker(WhitespaceTokenizer(), 20, 5).iter_chunks(["Начало предложения", "и его конец."]))
+    assert chunks == ["Начало предложения и его конец."]
+
+
+def test_text_without_terminators_is_streamed():
+    """Текст без знаков конца предложения отдаётся чанками до конца документа."""
+    consumed = []
+
+    def pages():
+        for i in range(500):
+            consumed.append(i)
+            yield " ".join(f"p{i}w{j}" for j in range(30))
+
+    first_chunk = next(TokenChunker(WhitespaceTokenizer(), 20, 5).iter_chunks(pages()))
+
+    assert len(first_chunk.split()) <= 20
+    assert len(consumed) < 500
+
+
+def test_overlap_must_be_less_than_chunk():
+    """Перекрытие не меньше размера чанка запрещено."""
+    with pytest.raises(ValueError):
+        TokenChunker(WhitespaceTokenizer(), 10, 10)
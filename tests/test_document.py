@@ -0,0 +1,37 @@
+"""Тесты для обработки документов."""
+
+
+def _chunk(words):
+    return " ".join(f"w{i}" for i in range(words))
+
+
+def test_token_batches_respect_budget(processor):
+    """Батч с учётом паддинга до самого длинного чанка укладывается в бюджет токенов, порядок сохраняется."""
+    processor.embedding_batch_tokens = 12
+    lengths = [2, 3, 1, 4, 2, 3, 3, 1]
+    chunks = list(enumerate(_chunk(length) for length in lengths))
+
+    batches = list(processor._iter_token_batches([chunks[:3], [], chunks[3:]]))
+
+    assert [item for batch in batches for item in batch] == chunks
+    assert [[i for i, _ in batch] for batch in batches] == [[0, 1, 2], [3, 4, 5], [6, 7]]
+    assert all(max(lengths[i] for i, _ in batch) * len(batch) <= 12 for batch in batches)
+
+
+def test_oversized_chunk_gets_own_batch(processor):
+    """Чанк длиннее бюджета не теряется, а идёт отдельным батчем."""
+    processor.embedding_batch_tokens = 10
+    chunks = [(0, _chunk(2)), (1, _chunk(50)), (2, _chunk(2))]
+
+    batches = list(processor._iter_token_batches([chunks]))
+
+    assert batches == [[chunks[0]], [chunks[1]], [chunks[2]]]
+
+
+def test_token_length_is_truncated_to_model_limit(processor):
+    """Длина чанка считается с усечением до ``max_seq_length`` модели, как при кодировании."""
+    processor.embedding_batch_tokens = 10
+    processor.embedding_model.max_seq_length = 5
+    chunks = [(0, _chunk(50)), (1, _chunk(50))]
+
+    assert list(processor._iter_token_batches([chunks])) == [chunks]
@@ -0,0 +1,52 @@
+"""Тесты для двухуровневого кэша эмбеддингов."""
+
+import itertools
+import types
+
+import pytest
+
+from src.managers import embedding_cache as embedding_cache_module
+from src.managers.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Монотонные часы кэша: у каждой записи и чтения своё время использования."""
+    monkeypatch.setattr(embedding_cache_module, "time", types.SimpleNamespace(time=itertools.count().__next__))
+
+
+def test_memory_lru_eviction(tmp_path, clock):
+    """В памяти остаются последние использованные эмбеддинги, вытесненные читаются с диска."""
+    cache = EmbeddingCache(path=tmp_path / "cache.sqlite3", model_name="model", memory_size=2, disk_size=100)
+
+    cache.set("a", [1.0])
+    cache.set("b", [2.0])
+    cache.get("a")
+    cache.set("c", [3.0])
+
+    assert list(cache.memory) == ["a", "c"]
+    assert cache.get("b") == [2.0]
+
+
+def test_disk_eviction_removes_least_recently_used(tmp_path, clock):
+    """При переполнении диска удаляются давно не использованные записи."""
+    cache = EmbeddingCache(path=tmp_path / "cache.sqlite3", model_name="model", memory_size=0, disk_size=3)
+
+    cache.set("a", [1.0])
+    cache.set("b", [2.0])
+    cache.set("c", [3.0])
+    cache.get("a")
+    cache.set("d", [4.0])
+
+    count = cache._get_connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    assert count == 3
+    assert cache.get_many(["a", "b", "c", "d"]) == {"a": [1.0], "c": [3.0], "d": [4.0]}
+
+
+def test_cache_is_scoped_by_model(tmp_path, clock):
+    """Эмбеддинги другой модели из общей базы не возвращаются."""
+    path = tmp_path / "cache.sqlite3"
+    EmbeddingCache(path=path, model_name="old", memory_size=0, disk_size=100).set("a", [1.0])
+
+    assert EmbeddingCache(path=path, model_name="new", memory_size=0, disk_size=100).get("a") is None
@@ -0,0 +1,43 @@
+"""Тесты для сохранения загруженных файлов."""
+
+import asyncio
+import io
+
+import pytest
+
+from fastapi import UploadFile
+
+from src.helpers.files_management import FileTooLargeError, get_file_hash, save_upload
+
+
+def test_save_upload_returns_hash_and_size(tmp_path):
+    """Сохранённый файл совпадает с загруженным, хеш считается как в ``get_file_hash``."""
+    data = b"x" * (3 * 1024 * 1024 + 5)
+    path = tmp_path / "a.pdf"
+
+    content_hash, size = asyncio.run(save_upload(UploadFile(io.BytesIO(data), filename="a.pdf"), path, len(data)))
+
+    assert size == len(data)
+    assert path.read_bytes() == data
+    assert content_hash == get_file_hash(path)
+
+
+def test_save_upload_rejects_large_stream(tmp_path):
+    """Файл неизвестного размера прерывается на превышении лимита, частичный файл удаляется."""
+    path = tmp_path / "a.pdf"
+
+    with pytest.raises(FileTooLargeError):
+        asyncio.run(save_upload(UploadFile(io.BytesIO(b"x" * (2 * 1024 * 1024)), filename="a.pdf"), path, 1024 * 1024))
+
+    assert not path.exists()
+
+
+def test_save_upload_rejects_known_size(tmp_path):
+    """Файл известного размера больше лимита отклоняется без копирования."""
+    path = tmp_path / "a.pdf"
+    upload_file = UploadFile(io.BytesIO(b"x" * 10), filename="a.pdf", size=10)
+
+    with pytest.raises(FileTooLargeError):
+        asyncio.run(save_upload(upload_file, path, 5))
+
+    assert not path.exists()
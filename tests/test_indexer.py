@@ -0,0 +1,149 @@
+"""Тесты для инкрементального обновления проиндексированных документов."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from qdrant_client import QdrantClient
+
+from src.helpers.configs_hub import qdrant_config
+from src.helpers.qdrant_management import create_collections
+from src.managers.embedding_cache import EmbeddingCache
+from src.managers.qdrant import qdrant_manager
+from src.managers.quarantine import quarantine_manager
+from src.processors.chunker import TokenChunker
+from src.processors.document import DocumentProcessor
+from src.services.indexer import IndexerService
+
+
+@pytest.fixture
+def qdrant(monkeypatch):
+    """Коллекции из конфига в qdrant в памяти процесса."""
+    monkeypatch.setattr(qdrant_manager, "client", QdrantClient(":memory:"))
+    monkeypatch.setattr(qdrant_manager, "hybrid_collections", {})
+    monkeypatch.setattr(qdrant_manager, "catalog_ready", False)
+    asyncio.run(create_collections())
+    return qdrant_manager
+
+
+@pytest.fixture
+def indexer(monkeypatch, tmp_path, qdrant, embedding_model):
+    """Индексатор текстовых файлов с маленькими чанками, кэшем и карантином во временных базах."""
+    monkeypatch.setattr(DocumentProcessor, "_extract_txt_text", lambda self, path: Path(path).read_text())
+    monkeypatch.setattr(quarantine_manager, "db_path", tmp_path / "quarantine.sqlite3")
+    monkeypatch.setattr(quarantine_manager, "connection", None)
+    monkeypatch.setattr(qdrant_config.processing.upsert, "retries", 0)
+
+    indexer = IndexerService()
+    indexer.document_processor.chunker = TokenChunker(embedding_model.tokenizer, 12, 0)
+    indexer.document_processor.embedding_cache = EmbeddingCache(
+        path=tmp_path / "cache.sqlite3", model_name="stub", memory_size=0, disk_size=1000,
+    )
+    return indexer
+
+
+def _sentences(numbers):
+    return " ".join(f"Sentence {i} has unique words w{i}a w{i}b w{i}c." for i in numbers)
+
+
+def _points(document_uuid):
+    """Точки документа: ID -> (индекс чанка, текст)."""
+    points, _ = qdrant_manager.client.scroll(
+        collection_name=qdrant_config.defaults.default_collection,
+        scroll_filter=None,
+        limit=1000,
+        with_payload=True,
+    )
+    return {
+        point.id: (point.payload["chunk_index"], point.payload["text"])
+        for point in points
+        if point.payload.get("document_uuid") == document_uuid
+    }
+
+
+@pytest.fixture
+def versions(tmp_path, indexer):
+    """Проиндексированная первая версия документа и вторая версия: новое начало, без последних предложений."""
+    first = tmp_path / "v1" / "doc.txt"
+    first.parent.mkdir()
+    first.write_text(_sentences(range(40)))
+
+    second = tmp_path / "v2" / "doc.txt"
+    second.parent.mkdir()
+    second.write_text(_sentences(range(100, 104)) + " " + _sentences(range(30)))
+
+    assert indexer.index_sync(first, "doc").point_ids
+
+    return first, second
+
+
+def test_update_reuses_unchanged_chunks(indexer, embedding_model, versions):
+    """Неизменные чанки сохраняют точки и сдвигают индексы, новые кодируются, устаревшие удаляются."""
+    _, second = versions
+    chunker = indexer.document_processor.chunker
+    old_points = _points("doc")
+    old_ids = {text: point_id for point_id, (_, text) in old_points.items()}
+    new_chunks = chunker.chunk(second.read_text())
+
+    reused = [text for text in new_chunks if text in old_ids]
+    moved = [text for i, text in enumerate(new_chunks) if text in old_ids and old_points[old_ids[text]][0] != i]
+    added = [text for text in new_chunks if text not in old_ids]
+    stale = [text for text in old_ids if text not in new_chunks]
+
+    assert reused and moved and added and stale
+
+    embedding_model.encoded.clear()
+    result = indexer.update_sync(second, "doc")
+    points = _points("doc")
+
+    assert result.error is None
+    assert sorted(points.values()) == sorted(enumerate(new_chunks))
+    assert sorted(result.point_ids) == sorted(points)
+    assert all(old_ids[text] in points for text in reused)
+    assert all(point_id not in points for point_id, (_, text) in old_points.items() if text in stale)
+    assert sorted(text for batch in embedding_model.encoded for text in batch) == sorted(added)
+    assert result.performance["reused_chunks"] == len(reused)
+    assert result.performance["deleted_chunks"] == len(stale)
+
+
+def test_unchanged_file_is_skipped(indexer, embedding_model, versions):
+    """Обновление той же версией файла не разбирает и не кодирует документ."""
+    first, _ = versions
+    old_points = _points("doc")
+    embedding_model.encoded.clear()
+
+    result = indexer.update_sync(first, "doc")
+
+    assert result.skipped
+    assert sorted(result.point_ids) == sorted(old_points)
+    assert embedding_model.encoded == []
+    assert _points("doc") == old_points
+
+
+def test_failed_upsert_keeps_previous_version(indexer, monkeypatch, versions):
+    """Ошибка записи новых чанков откатывает обновление: документ остаётся в прежней версии."""
+    _, second = versions
+    old_points = _points("doc")
+    client_upsert = qdrant_manager.client.upsert
+    upserts = []
+
+    def upsert(**kwargs):
+        # Первый батч новых чанков записывается, второй падает
+        upserts.append(kwargs["points"])
+
+        if len(upserts) > 1:
+            raise RuntimeError("qdrant недоступен")
+
+        return client_upsert(**kwargs)
+
+    monkeypatch.setattr(qdrant_manager.client, "upsert", upsert)
+    monkeypatch.setattr(qdrant_config.processing.upsert, "mode", "sync")
+    indexer.document_processor.batch_size = 1
+
+    result = indexer.update_sync(second, "doc")
+
+    assert len(upserts) == 2
+    assert result.point_ids == []
+    assert "qdrant недоступен" in result.error
+    assert _points("doc") == old_points
@@ -0,0 +1,176 @@
+"""Тесты для фоновых заданий индексации."""
+
+import threading
+import time
+import types
+
+import pytest
+
+from src.services import jobs as jobs_module
+from src.services.jobs import JobService, JobStatus
+
+
+class StubIndexer:
+    """Индексатор, записывающий одну точку на файл и запоминающий обработанные документы."""
+
+    processed = []
+
+    def index_sync(self, path, document_uuid, progress, upsert_wait=True, file_name=None):
+        self.processed.append(document_uuid)
+        progress("pages", 1, 1)
+        return types.SimpleNamespace(point_ids=["point"], document_uuid=document_uuid, performance={}, error=None)
+
+
+@pytest.fixture
+def deleted(monkeypatch):
+    """Документы, точки которых удалены из qdrant."""
+    deleted = []
+    monkeypatch.setattr(jobs_module.qdrant_manager, "delete_document", lambda document_uuid: deleted.append(document_uuid))
+    return deleted
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Часы заданий, которые двигает только тест."""
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(jobs_module, "time", types.SimpleNamespace(time=lambda: clock.now, sleep=lambda seconds: None))
+    return clock
+
+
+@pytest.fixture
+def services(tmp_path):
+    """Фабрика сервисов заданий над общей временной базой, как у нескольких процессов приложения."""
+    created = []
+
+    def services(count=1, **kwargs):
+        for _ in range(count):
+            created.append(JobService(db_path=tmp_path / "jobs.sqlite3", files_dir=tmp_path / "files",
+                                      workers=2, poll_interval=0.01, lease_timeout=10, **kwargs))
+        return created[-count:]
+
+    yield services
+
+    for service in created:
+        service.stop()
+
+
+def _files(count):
+    return [(f"{i}.pdf", f"/files/{i}.pdf", f"doc-{i}") for i in range(count)]
+
+
+def _owners(service, job_id):
+    with service._db() as connection:
+        return connection.execute(
+            "SELECT owner, heartbeat_at FROM job_files WHERE job_id = ? ORDER BY file_index", (job_id,),
+        ).fetchall()
+
+
+def test_claim_is_exclusive(services):
+    """Одновременные захваты из разных сервисов не достаются одному файлу дважды."""
+    first, second = services(2)
+    first.create_job("job", _files(50))
+    claimed = []
+
+    def claim(service, owner):
+        while (file := service._claim_file(owner)) is not None:
+            claimed.append(file[4])
+
+    threads = [
+        threading.Thread(target=claim, args=(service, f"owner-{i}"))
+        for i, service in enumerate([first, second] * 4)
+    ]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(document_uuid for _, _, document_uuid in _files(50))
+    assert first.get_job("job")["status"] == JobStatus.RUNNING
+
+
+def test_expired_lease_is_reclaimed(services, clock, deleted):
+    """Файл с истёкшей арендой захватывается заново, точки прежнего владельца удаляются."""
+    first, second = services(2)
+    first.create_job("job", _files(1))
+
+    assert first._claim_file("crashed")[5] is False
+
+    clock.now += 9
+    assert second._claim_file("second") is None
+
+    clock.now += 2
+    claimed = second._claim_file("second")
+
+    assert claimed[5] is True
+
+    second._process_file(StubIndexer(), "second", *claimed)
+
+    assert deleted == ["doc-0"]
+    assert first._update_file("crashed", "job", 0, status=JobStatus.FAILED) is False
+    assert second.get_job("job")["files"][0]["status"] == JobStatus.DONE
+
+
+def test_heartbeat_renews_only_own_files(services, clock):
+    """Продление аренды обновляет только файлы своего владельца, пока его воркеры работают."""
+    service, = services()
+    service.create_job("job", _files(2))
+    service._claim_file("owner")
+    service._claim_file("sibling")
+
+    clock.now += 8
+    worker = types.SimpleNamespace(is_alive=iter([True, False]).__next__)
+    service._heartbeat("owner", [worker])
+
+    assert _owners(service, "job") == [("owner", 1008.0), ("sibling", 1000.0)]
+
+    clock.now += 3
+    claimed = service._claim_file("other")
+
+    assert claimed[:2] == ("job", 1)
+    assert service._claim_file("other") is None
+
+
+def test_live_sibling_file_is_not_touched(services, clock, deleted):
+    """Файл, который обрабатывает живой соседний процесс, не захватывается и не удаляется."""
+    first, second = services(2)
+    first.create_job("job", _files(1))
+    first._claim_file("sibling")
+
+    for _ in range(3):
+        clock.now += 5
+
+        with first._db() as connection:
+            connection.execute("UPDATE job_files SET heartbeat_at = ? WHERE owner = ?", (clock.now, "sibling"))
+
+        assert second._claim_file("second") is None
+
+    assert deleted == []
+    assert _owners(first, "job") == [("sibling", clock.now)]
+
+
+def test_workers_process_each_file_once(services, monkeypatch, deleted):
+    """Воркеры двух сервисов обрабатывают каждый файл задания ровно один раз и завершают задание."""
+    monkeypatch.setattr(jobs_module, "IndexerService", StubIndexer)
+    monkeypatch.setattr(StubIndexer, "processed", [])
+    first, second = services(2)
+    first.job_dir("job").mkdir(parents=True)
+    first.create_job("job", _files(20))
+
+    first.start()
+    second.start()
+
+    deadline = time.time() + 10
+
+    # Директория удаляется после того, как задание отмечено завершённым
+    while (first.get_job("job")["status"] != JobStatus.DONE or first.job_dir("job").exists()) and time.time() < deadline:
+        time.sleep(0.01)
+
+    job = first.get_job("job")
+
+    assert job["status"] == JobStatus.DONE
+    assert [file["status"] for file in job["files"]] == [JobStatus.DONE] * 20
+    assert sorted(StubIndexer.processed) == sorted(document_uuid for _, _, document_uuid in _files(20))
+    assert not first.job_dir("job").exists()
+    assert deleted == []
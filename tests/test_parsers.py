@@ -0,0 +1,166 @@
+"""Тесты для разбора PDF-файлов."""
+
+import types
+
+import pytest
+
+from src.processors.parsers import PDFParser, _garbage_ratio
+
+
+def _write_pdf(path, pages):
+    """Минимальный PDF со шрифтом Helvetica.
+
+    Args:
+        path: Путь к создаваемому файлу.
+        pages: Пары (поток содержимого страницы, есть ли в ресурсах страницы изображение ``/Im1``).
+    """
+
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(None)
+    pages_id = add(None)
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    image = add(b"<< /Type /XObject /Subtype /Image /Width 1 /Height 1 /ColorSpace /DeviceGray "
+                b"/BitsPerComponent 8 /Length 1 >>\nstream\n\x80\nendstream")
+
+    kids = []
+
+    for content, with_image in pages:
+        data = content.encode("latin-1")
+        stream = add(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        xobject = b" /XObject << /Im1 %d 0 R >>" % image if with_image else b""
+        kids.append(add(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+                        b"/Resources << /Font << /F1 %d 0 R >>%s >> /Contents %d 0 R >>"
+                        % (pages_id, font, xobject, stream)))
+
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(kids))
+
+    data = bytearray(b"%PDF-1.4\n")
+    offsets = []
+
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+
+    path.write_bytes(bytes(data))
+
+
+def _text(lines, x=72, y=700, size=12, step=20):
+    """Поток содержимого со строками текста, идущими сверху вниз."""
+    return "\n".join(f"BT /F1 {size} Tf {x} {y - step * i} Td ({line}) Tj ET" for i, line in enumerate(lines))
+
+
+CLEAN_TEXT = _text(["This page has a clean text layer with enough characters.", "Second line of text."])
+GARBAGE_TEXT = _text(["\x01\x02\x03\x04\x05\x06\x07\x08\x0e\x0f" * 8])
+IMAGE = "q 100 0 0 100 72 300 cm /Im1 Do Q"
+
+
+def _table(xs=(72, 172, 272, 372), ys=(560, 580, 600)):
+    """Поток содержимого с таблицей-сеткой из линий и текстом ``r<строка>c<столбец>`` в ячейках."""
+    grid = [f"{xs[0]} {y} m {xs[-1]} {y} l S" for y in ys] + [f"{x} {ys[0]} m {x} {ys[-1]} l S" for x in xs]
+    cells = [
+        _text([f"r{row}c{column}"], x=xs[column] + 5, y=ys[-1] - 15 - 20 * row, size=10)
+        for row in range(len(ys) - 1)
+        for column in range(len(xs) - 1)
+    ]
+    return "\n".join(grid + cells)
+
+
+@pytest.fixture
+def open_pdf(tmp_path):
+    """Фабрика парсеров над сгенерированными PDF, парсеры закрываются после теста."""
+    parsers = []
+
+    def open_pdf(pages):
+        path = tmp_path / f"{len(parsers)}.pdf"
+        _write_pdf(path, pages)
+        parser = PDFParser(path)
+        parser.text_layer_min_chars = 20
+        parser.text_layer_max_garbage = 0.1
+        parsers.append(parser)
+        return parser
+
+    yield open_pdf
+
+    for parser in parsers:
+        parser.close()
+
+
+def test_garbage_ratio():
+    """Доля мусора считается по непробельным символам, пустой текст целиком мусорный."""
+    assert _garbage_ratio("Обычный текст") == 0.0
+    assert _garbage_ratio("ab�") == 0.5
+    assert _garbage_ratio(" \n") == 1.0
+
+
+def test_clean_text_layer_skips_layout(open_pdf, monkeypatch):
+    """Страница с чистым текстовым слоем разбирается без анализа разметки."""
+    parser = open_pdf([(CLEAN_TEXT, False)])
+    parser.parse_mode = "tiered"
+    monkeypatch.setattr(parser, "_parse_layout_page", lambda page_num: pytest.fail("разбор разметки"))
+
+    text = parser.parse_page(0)
+
+    assert text.startswith("This page has a clean text layer")
+    assert "Second line of text." in text
+    assert text.endswith("\n")
+
+
+def test_garbage_text_layer_is_rejected(open_pdf):
+    """Текстовый слой из управляющих символов отбрасывается, страница идёт на полный разбор."""
+    parser = open_pdf([(GARBAGE_TEXT, False)])
+
+    assert parser._text_layer(0) is None
+
+
+def test_image_page_is_rejected(open_pdf):
+    """Страница с изображением идёт на полный разбор, даже если у неё есть чистый текстовый слой."""
+    parser = open_pdf([(IMAGE, True), (CLEAN_TEXT + "\n" + IMAGE, True)])
+
+    for page_num in range(2):
+        assert parser._has_images(parser.pdfReaded.pages[page_num].get("/Resources")) is True
+        assert parser._text_layer(page_num) is None
+
+
+def test_full_mode_ignores_text_layer(open_pdf, monkeypatch):
+    """В режиме ``full`` текстовый слой не используется."""
+    parser = open_pdf([(CLEAN_TEXT, False)])
+    parser.parse_mode = "full"
+    monkeypatch.setattr(parser, "_text_layer", lambda page_num: pytest.fail("текстовый слой"))
+
+    assert "clean text layer" in parser.parse_page(0)
+
+
+def test_table_is_excluded_from_page_text(open_pdf):
+    """Текст ячеек таблицы не дублируется строками страницы, таблица добавляется один раз на своё место."""
+    parser = open_pdf([("\n".join([_text(["Paragraph above."]), _table(), _text(["Paragraph below."], y=500)]), False)])
+    table = "|r0c0|r0c1|r0c2|\n|r1c0|r1c1|r1c2|"
+
+    page_text, line_format, _, text_from_tables, page_content = parser._parse_page(
+        0, parser.pdfplumber_obj.pages[0].layout)
+
+    assert text_from_tables == [table]
+    assert page_content == ["Paragraph above.\n", table, "Paragraph below.\n"]
+    assert page_text[1] == line_format[1] == "table"
+
+
+def test_find_table_bbox_by_element_center():
+    """Элемент относится к таблице, если его центр лежит внутри таблицы (ось y pdfminer перевёрнута)."""
+    tables = {(72, 192, 372, 232): []}
+
+    inside = types.SimpleNamespace(x0=80, x1=100, y0=570, y1=590)
+    crossing = types.SimpleNamespace(x0=80, x1=100, y0=590, y1=630)
+
+    assert PDFParser._find_table_bbox(inside, tables, 792) == (72, 192, 372, 232)
+    assert PDFParser._find_table_bbox(crossing, tables, 792) is None
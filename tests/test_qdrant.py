@@ -0,0 +1,75 @@
+"""Тесты для расширения найденных чанков контекстом."""
+
+import pytest
+
+from qdrant_client.models import Record, ScoredPoint
+
+from src.helpers.configs_hub import qdrant_config
+from src.managers.qdrant import qdrant_manager
+
+
+class ScrollClient:
+    """Клиент qdrant, отдающий из ``scroll`` точки, попавшие в окна фильтра."""
+
+    def __init__(self, points):
+        self.points = points
+        self.calls = []
+
+    def scroll(self, collection_name, scroll_filter, limit, with_payload, with_vectors):
+        windows = [
+            (window.must[0].key, window.must[0].match.value, window.must[1].range.gte, window.must[1].range.lte)
+            for window in scroll_filter.should
+        ]
+        self.calls.append(windows)
+
+        points = [
+            point for point in self.points
+            if any(
+                point.payload.get(key) == value and start <= point.payload["chunk_index"] <= end
+                for key, value, start, end in windows
+            )
+        ]
+
+        return points[:limit], None
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    """Менеджер qdrant с клиентом над документами ``a`` и ``b`` по 30 чанков и окном +-1 чанк."""
+    monkeypatch.setattr(qdrant_config.defaults, "shift", 1)
+
+    monkeypatch.setattr(qdrant_manager, "client", ScrollClient([
+        Record(id=f"{document}-{i}", payload={"document_uuid": document, "chunk_index": i, "text": f"{document}{i}"})
+        for document in ("a", "b")
+        for i in range(30)
+    ]))
+
+    return qdrant_manager
+
+
+def _hit(document, chunk_index, score):
+    return ScoredPoint(id=f"{document}-{chunk_index}", version=0, score=score,
+                       payload={"document_uuid": document, "chunk_index": chunk_index})
+
+
+def test_overlapping_windows_are_merged(manager):
+    """Пересекающиеся и смежные окна одного документа объединяются, окна запрашиваются одним scroll."""
+    results = manager.expand_context([_hit("a", 5, 0.9), _hit("b", 10, 0.8), _hit("a", 7, 0.7), _hit("a", 10, 0.6)])
+
+    assert len(manager.client.calls) == 1
+    assert [result.chunks for result in results] == [[4, 5, 6, 7, 8, 9, 10, 11], [9, 10, 11]]
+    assert [result.score for result in results] == [0.9, 0.8]
+    assert results[1].texts == "b9, b10, b11"
+
+
+def test_distant_windows_stay_separate(manager):
+    """Далёкие окна одного документа остаются отдельными результатами в порядке релевантности."""
+    results = manager.expand_context([_hit("a", 20, 0.9), _hit("a", 2, 0.8)])
+
+    assert [result.chunks for result in results] == [[19, 20, 21], [1, 2, 3]]
+
+
+def test_no_hits(manager):
+    """Без попаданий qdrant не запрашивается."""
+    assert manager.expand_context([]) == []
+    assert manager.client.calls == []
@@ -0,0 +1,42 @@
+"""Тесты для карантина неразбираемых файлов."""
+
+import pytest
+
+from src.managers.quarantine import QuarantineManager
+
+
+@pytest.fixture
+def quarantine(tmp_path):
+    """Карантин во временной базе: файл попадает в него после двух неудач."""
+    return QuarantineManager(db_path=tmp_path / "quarantine.sqlite3", max_failures=2)
+
+
+def test_file_quarantined_after_max_failures(quarantine):
+    """Файл попадает в карантин только после ``max_failures`` неудач."""
+    assert quarantine.record_failure("hash", "a.pdf", "timeout") is False
+    assert quarantine.is_quarantined("hash") is False
+    assert quarantine.list_files() == []
+
+    assert quarantine.record_failure("hash", "a.pdf", "memory") is True
+    assert quarantine.is_quarantined("hash") is True
+
+    files = quarantine.list_files()
+    assert [(file["content_hash"], file["failures"], file["error"]) for file in files] == [("hash", 2, "memory")]
+
+
+def test_success_resets_failures(quarantine):
+    """Успешная индексация сбрасывает счётчик неудач."""
+    quarantine.record_failure("hash", "a.pdf", "timeout")
+    quarantine.record_success("hash")
+
+    assert quarantine.record_failure("hash", "a.pdf", "timeout") is False
+
+
+def test_release(quarantine):
+    """Снять с карантина можно только файл, который в нём находится."""
+    quarantine.record_failure("hash", "a.pdf", "timeout")
+    assert quarantine.release("hash") is False
+
+    quarantine.record_failure("hash", "a.pdf", "timeout")
+    assert quarantine.release("hash") is True
+    assert quarantine.is_quarantined("hash") is False
@@ -0,0 +1,133 @@
+"""Тесты для переранжирования найденных чанков кросс-энкодером."""
+
+import types
+
+import pytest
+
+from qdrant_client.models import ScoredPoint
+
+from src.helpers.configs_hub import querier_config
+from src.services import query as query_module
+from src.services import reranker as reranker_module
+from src.services.query import QueryService
+from src.services.reranker import CrossEncoderReranker
+
+
+class StubCrossEncoder:
+    """Кросс-энкодер, оценивающий пару числом из текста чанка; каждый вызов занимает секунду."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+
+    def predict(self, pairs, batch_size, show_progress_bar):
+        self.calls.append([text for _, text in pairs])
+        self.clock.now += 1.0
+        return [float(text) for _, text in pairs]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Часы реранкера, которые двигает только модель."""
+    clock = types.SimpleNamespace(now=0.0)
+    monkeypatch.setattr(reranker_module, "time", types.SimpleNamespace(perf_counter=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def model(monkeypatch, clock):
+    """Заглушка кросс-энкодера вместо загружаемой модели."""
+    model = StubCrossEncoder(clock)
+    monkeypatch.setattr(reranker_module, "get_reranker_model", lambda: model)
+    return model
+
+
+def _hits(*texts):
+    """Кандидаты в порядке векторного поиска с убывающей оценкой."""
+    return [
+        ScoredPoint(id=i, version=0, score=1.0 - i / 100, payload={"text": text})
+        for i, text in enumerate(texts)
+    ]
+
+
+def _texts(hits):
+    return [hit.payload["text"] for hit in hits]
+
+
+def test_hits_sorted_by_model_score(model):
+    """Кандидаты упорядочиваются по оценке модели, возвращается не больше ``top_k``."""
+    reranker = CrossEncoderReranker(batch_size=2, budget_ms=10_000, cache_size=100)
+
+    hits = reranker.rerank("query", _hits("1", "5", "3", "4", "2"), top_k=3)
+
+    assert _texts(hits) == ["5", "4", "3"]
+    assert [hit.score for hit in hits] == [5.0, 4.0, 3.0]
+    assert model.calls == [["1", "5"], ["3", "4"], ["2"]]
+
+
+def test_budget_leaves_unscored_hits_in_search_order(model):
+    """После исчерпания бюджета неоценённые кандидаты идут за оценёнными в порядке поиска."""
+    reranker = CrossEncoderReranker(batch_size=2, budget_ms=500, cache_size=100)
+    hits = _hits("1", "2", "9", "8", "7")
+
+    reranked = reranker.rerank("query", hits, top_k=5)
+
+    assert model.calls == [["1", "2"]]
+    assert _texts(reranked) == ["2", "1", "9", "8", "7"]
+    assert [hit.score for hit in reranked[2:]] == [hit.score for hit in hits[2:]]
+
+
+def test_cached_scores_are_not_recomputed(model):
+    """Оценки пар из кэша не пересчитываются и не расходуют бюджет."""
+    reranker = CrossEncoderReranker(batch_size=2, budget_ms=500, cache_size=100)
+
+    reranker.rerank("query", _hits("1", "2"), top_k=2)
+    reranked = reranker.rerank("query", _hits("3", "1", "2"), top_k=3)
+
+    assert model.calls == [["1", "2"], ["3"]]
+    assert _texts(reranked) == ["3", "2", "1"]
+
+    reranker.rerank("other", _hits("1", "2"), top_k=2)
+
+    assert model.calls[-1] == ["1", "2"]
+
+
+def test_cache_evicts_least_recently_used(model):
+    """При переполнении кэша вытесняются давно не использованные оценки."""
+    reranker = CrossEncoderReranker(batch_size=10, budget_ms=10_000, cache_size=4)
+
+    reranker.rerank("query", _hits("1", "2"), top_k=2)
+    reranker.rerank("query", _hits("1", "3"), top_k=2)
+    reranker.rerank("query", _hits("4", "5"), top_k=2)
+
+    cached = {key[1] for key in reranker.cache}
+    assert cached == {reranker._hash(text) for text in ("1", "3", "4", "5")}
+
+
+def test_query_overfetches_candidates(monkeypatch):
+    """Сервис запросов берёт у qdrant ``overfetch`` кандидатов на каждый результат и отдаёт их реранкеру."""
+    calls = {}
+
+    class StubQdrant:
+        def search_hits(self, limit, **kwargs):
+            calls["limit"] = limit
+            return _hits("1", "2")
+
+        def expand_context(self, hits):
+            calls["expanded"] = _texts(hits)
+            return []
+
+    class StubReranker:
+        def rerank(self, query, hits, top_k):
+            calls["top_k"] = top_k
+            return hits[::-1][:top_k]
+
+    monkeypatch.setattr(query_module, "get_embedding_model", lambda: None)
+    monkeypatch.setattr(querier_config.reranker, "overfetch", 4)
+
+    service = QueryService(qdrant_manager=StubQdrant(), reranker=StubReranker())
+    monkeypatch.setattr(service, "_create_query_embedding", lambda query: [0.0])
+
+    service.search_sync("query", limit=2)
+
+    assert calls == {"limit": 8, "top_k": 2, "expanded": ["2", "1"]}
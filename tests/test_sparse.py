@@ -0,0 +1,42 @@
+"""Тесты для BM25-кодировщика разреженных векторов."""
+
+from src.processors.sparse import SparseEncoder
+
+
+def test_tokenize_keeps_codes():
+    """Номера и коды с точками, дефисами и слешами остаются одним токеном."""
+    tokens = SparseEncoder.tokenize("Приказ № 77-01/2024 от 12.03.2024, версия v2.1")
+
+    assert "77-01/2024" in tokens
+    assert "12.03.2024" in tokens
+    assert "v2.1" in tokens
+    assert "приказ" in tokens
+
+
+def test_tokenize_normalizes_text():
+    """Токены приводятся к нижнему регистру, ё заменяется на е, пунктуация отбрасывается."""
+    assert SparseEncoder.tokenize("Ёлка, ЁЖ. Тест!") == ["елка", "еж", "тест"]
+
+
+def test_query_matches_document_code():
+    """Код из запроса и из текста кодируется в один индекс разреженного вектора."""
+    encoder = SparseEncoder(k1=1.2, b=0.75, avg_length=100)
+
+    document = encoder.encode("Договор 77-01/2024 подписан.")
+    query = encoder.encode_query("договор 77-01/2024")
+
+    assert set(query.indices) <= set(document.indices)
+    assert query.values == [1.0] * len(query.indices)
+
+
+def test_encode_weights_repeated_tokens():
+    """Повторяющийся токен весит больше однократного, веса насыщаются до k1 + 1."""
+    encoder = SparseEncoder(k1=1.2, b=0.75, avg_length=100)
+    vector = encoder.encode("налог налог налог ставка")
+    weights = dict(zip(vector.indices, vector.values))
+
+    tax = weights[SparseEncoder._index("налог")]
+    rate = weights[SparseEncoder._index("ставка")]
+
+    assert tax > rate
+    assert tax < encoder.k1 + 1